@@ -0,0 +1,231 @@
+"""
+카탈로그 규모별 벤치마크
+합성 카탈로그(기본 1천/1만/10만 상점)를 만들어 services.py, pass_generator.py 의
+카탈로그 관련 함수 실행 시간을 측정하고, 기준 결과와 비교해 성능 저하를 보고합니다.
+
+사용법:
+  python benchmarks/bench_catalog_scale.py [--sizes 1000,10000,100000]
+      [--baseline benchmarks/catalog_scale_baseline.json] [--save-baseline] [--threshold 0.25]
+
+규모마다 CATALOG_DATA_DIR 을 지정한 별도 프로세스에서 측정합니다 (카탈로그는 프로세스 전역).
+성능 저하가 있으면 종료 코드 1을 반환합니다.
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'scripts'))
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catalog_scale_baseline.json')
+
+# 측정 시간이 이보다 짧은 항목은 비율 비교에서 제외 (타이머 잡음)
+NOISE_FLOOR_MS = 0.05
+
+
+def _measure(fn, min_time: float = 0.2, min_repeat: int = 3, max_repeat: int = 200):
+    """워밍업 1회 후 min_time 초 또는 max_repeat 회까지 반복 측정 -> (중앙값 ms, 최소 ms, 반복 수)"""
+    fn()
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < min_repeat or (time.perf_counter() - started < min_time
+                                        and len(samples) < max_repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), min(samples), len(samples)
+
+
+def _workloads(data_dir: str):
+    """(이름, 함수) 목록 - CATALOG_DATA_DIR 이 지정된 워커 프로세스 안에서만 호출"""
+    from flask import Flask, session
+    import services
+    from catalog import StoreCatalog, get_catalog
+    from models import PassType, Theme, UserPrefs
+    from pass_generator import MAX_PROMPT_STORES, PassGenerator
+    from search_index import StoreSearchIndex
+
+    catalog = get_catalog()
+    rng = random.Random(7)
+    generator = PassGenerator()
+    stores = generator.load_stores()
+    benefits = generator.load_benefits()
+    names = [s.name for s in rng.sample(stores, min(5, len(stores)))]
+    codes = [b.redemption_code for b in rng.sample(benefits, min(20, len(benefits)))]
+    prefs = UserPrefs(budget='보통', interests=['맛집', '문화'], dietary_restrictions=[],
+                      group_size=2, duration='반나절', transportation='도보')
+
+    picked_stores, picked_benefits = generator.match_stores_and_benefits(names, stores, benefits)
+    pass_obj = generator.create_pass_object(prefs, PassType.LIGHT, Theme.FOOD, picked_stores, picked_benefits)
+    center = (37.4745, 126.6253)
+
+    # get_all_passes 측정용: 세션에 최대 보관 개수(50개)만큼 패스를 채운 요청 컨텍스트
+    app = Flask(__name__)
+    app.secret_key = 'bench'
+    session_passes = [{
+        'pass_id': f"bench_{i:03d}",
+        'pass_type': PassType.LIGHT.value,
+        'theme': Theme.FOOD.value,
+        'stores': [store.__dict__ for store in pass_obj.stores],
+        'benefits': [benefit.__dict__ for benefit in pass_obj.benefits],
+        'created_at': pass_obj.created_at,
+        'user_prefs': prefs.__dict__,
+    } for i in range(50)]
+
+    def get_all_passes():
+        with app.test_request_context('/api/user/passes'):
+            session['saved_passes'] = session_passes
+            services.get_all_passes()
+
+    workloads = [
+        ('catalog.from_json_files', lambda: StoreCatalog.from_json_files(data_dir)),
+        ('catalog.nearby_stores(k=10)', lambda: catalog.nearby_stores(*center, k=10)),
+        ('catalog.nearby_stores(r=300m)', lambda: catalog.nearby_stores(*center, radius_m=300)),
+        ('catalog.search_index 생성', lambda: StoreSearchIndex(catalog.stores_raw)),
+        ('catalog.search_stores(만두)', lambda: catalog.search_stores('만두')),
+        ('catalog.search_stores(월미 커피)', lambda: catalog.search_stores('월미 커피')),
+        ('services.load_stores', services.load_stores),
+        ('services.load_stores_raw', services.load_stores_raw),
+        ('services.load_benefits', services.load_benefits),
+        ('services.load_benefits_raw', services.load_benefits_raw),
+        ('services.load_themes', services.load_themes),
+        ('services.validate_redemption_code x20',
+         lambda: [services.validate_redemption_code(code) for code in codes]),
+        ('services.calculate_total_eco_value', lambda: services.calculate_total_eco_value(pass_obj.benefits)),
+        ('services.calculate_average_synergy_score',
+         lambda: services.calculate_average_synergy_score(pass_obj.stores)),
+        ('services.filter_candidate_stores',
+         lambda: services.filter_candidate_stores(areas=['골목상권', '제물포시장'], exclude_franchise=True,
+                                                  min_synergy=70)),
+        ('services.validate_pass_quality', lambda: services.validate_pass_quality(pass_obj, 7900)),
+        ('services.validate_pass_quality_batch x20',
+         lambda: services.validate_pass_quality_batch([(pass_obj, 7900)] * 20)),
+        ('services.get_all_passes (세션 50개)', get_all_passes),
+        ('pass_generator.load_stores', generator.load_stores),
+        ('pass_generator.load_stores_raw', generator.load_stores_raw),
+        ('pass_generator.load_benefits', generator.load_benefits),
+        ('pass_generator.match_stores_and_benefits',
+         lambda: generator.match_stores_and_benefits(names, stores, benefits)),
+        ('pass_generator.create_pass_object',
+         lambda: generator.create_pass_object(prefs, PassType.LIGHT, Theme.FOOD,
+                                              picked_stores, picked_benefits)),
+    ]
+    for theme in Theme:
+        workloads.append((f"pass_generator.filter_stores_by_theme[{theme.name}]",
+                          lambda theme=theme: generator.filter_stores_by_theme(stores, theme)))
+    # generate_pass 와 같이 순위 상위 상점만 프롬프트에 포함 (대표 테마 하나만 측정)
+    food_stores = generator.filter_stores_by_theme(stores, Theme.FOOD)[:MAX_PROMPT_STORES]
+    workloads.append(('pass_generator.generate_ai_prompt[FOOD]',
+                      lambda: generator.generate_ai_prompt(prefs, PassType.LIGHT, Theme.FOOD, food_stores)))
+    return workloads
+
+
+def run_worker(data_dir: str, result_file: str, min_time: float) -> None:
+    """워커 프로세스: 모든 항목을 측정해 result_file 에 JSON으로 기록 (함수 로그는 버림)"""
+    results = {}
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for name, fn in _workloads(data_dir):
+            median_ms, min_ms, repeat = _measure(fn, min_time=min_time)
+            results[name] = {'median_ms': median_ms, 'min_ms': min_ms, 'repeat': repeat}
+    with open(result_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+def _run_size(size: int, seed: int, min_time: float) -> dict:
+    """합성 카탈로그를 만들고 별도 프로세스에서 측정"""
+    from generate_synthetic_catalog import generate_catalog, write_catalog
+
+    with tempfile.TemporaryDirectory(prefix=f"catalog_{size}_") as tmp_dir:
+        data_dir = os.path.join(tmp_dir, 'data')
+        stores, benefits = generate_catalog(size, seed=seed)
+        write_catalog(data_dir, stores, benefits)
+        result_file = os.path.join(tmp_dir, 'result.json')
+        env = dict(os.environ, CATALOG_DATA_DIR=data_dir, CATALOG_CHECK_INTERVAL='3600')
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', data_dir,
+                        '--result-file', result_file, '--min-time', str(min_time)],
+                       env=env, check=True)
+        with open(result_file, 'r', encoding='utf-8') as f:
+            return {'stores': len(stores), 'benefits': len(benefits), 'results': json.load(f)}
+
+
+def _compare(current: dict, baseline: dict, threshold: float):
+    """기준 대비 (1 + threshold)배 이상 느려진 항목 목록 [(규모, 항목, 기준 ms, 현재 ms)]"""
+    regressions = []
+    for size, entry in current.items():
+        base_results = baseline.get(size, {}).get('results', {})
+        for name, result in entry['results'].items():
+            base = base_results.get(name)
+            if not base:
+                continue
+            if result['median_ms'] < NOISE_FLOOR_MS and base['median_ms'] < NOISE_FLOOR_MS:
+                continue
+            if result['median_ms'] > base['median_ms'] * (1 + threshold):
+                regressions.append((size, name, base['median_ms'], result['median_ms']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='카탈로그 규모별 벤치마크')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='쉼표로 구분한 상점 수 목록')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--min-time', type=float, default=0.2, help='항목당 최소 측정 시간(초)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='비교할 기준 결과 JSON')
+    parser.add_argument('--save-baseline', action='store_true', help='이번 결과를 기준으로 저장')
+    parser.add_argument('--threshold', type=float, default=0.25, help='성능 저하 판정 비율 (0.25 = 25%% 느려짐)')
+    parser.add_argument('--output', help='이번 결과를 저장할 JSON 경로')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.result_file, args.min_time)
+        return 0
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    current = {}
+    for size in sizes:
+        print(f"[벤치마크] 상점 {size:,}개 카탈로그 측정 중...")
+        entry = _run_size(size, args.seed, args.min_time)
+        current[str(size)] = entry
+        print(f"상점 {entry['stores']:,}개 / 혜택 {entry['benefits']:,}개")
+        print(f"  {'항목':<52}{'중앙값(ms)':>14}{'최소(ms)':>12}")
+        for name, result in entry['results'].items():
+            print(f"  {name:<52}{result['median_ms']:>14.3f}{result['min_ms']:>12.3f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+
+    exit_code = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = _compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n[벤치마크] ❌ 성능 저하 {len(regressions)}건 (기준 대비 {args.threshold:.0%} 초과)")
+            for size, name, base_ms, now_ms in regressions:
+                print(f"  상점 {int(size):,}개 {name}: {base_ms:.3f}ms -> {now_ms:.3f}ms "
+                      f"({now_ms / base_ms:.2f}배)")
+            exit_code = 1
+        else:
+            print(f"\n[벤치마크] ✅ 기준 대비 성능 저하 없음 ({args.baseline})")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"[벤치마크] 기준 결과 저장: {args.baseline}")
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
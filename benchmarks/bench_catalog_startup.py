@@ -0,0 +1,51 @@
+"""
+카탈로그 콜드 스타트 비교: JSON 파싱 vs 바이너리 스냅샷
+사용법:  python benchmarks/bench_catalog_startup.py [--data-dir DIR] [--repeat N]
+스냅샷이 없거나 오래된 경우 임시로 빌드해서 비교합니다.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from catalog import DATA_DIR, StoreCatalog
+from catalog_snapshot import build_snapshot, load_snapshot
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), min(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='카탈로그 시작 시간 비교 (JSON vs 스냅샷)')
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    if load_snapshot(args.data_dir) is None:
+        print("[벤치마크] 최신 스냅샷 없음 - 빌드합니다")
+        build_snapshot(args.data_dir)
+
+    json_median, json_min = _time(lambda: StoreCatalog.from_json_files(args.data_dir), args.repeat)
+    snap_median, snap_min = _time(lambda: StoreCatalog.from_files(args.data_dir), args.repeat)
+    catalog = StoreCatalog.from_files(args.data_dir)
+    assert catalog.source == 'snapshot', '스냅샷이 사용되지 않았습니다'
+
+    print(f"상점 {len(catalog.stores):,}개 / 혜택 {len(catalog.benefits):,}개 (반복 {args.repeat}회)")
+    print(f"{'방식':<10}{'중앙값(ms)':>14}{'최소(ms)':>14}")
+    print(f"{'JSON':<10}{json_median:>14.2f}{json_min:>14.2f}")
+    print(f"{'스냅샷':<10}{snap_median:>14.2f}{snap_min:>14.2f}")
+    if snap_median > 0:
+        print(f"속도 향상: {json_median / snap_median:.2f}배")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Datastore 클라이언트 생성 비용 비교: 호출마다 datastore.Client() vs 프로세스별 캐시 재사용
+사용법:  python benchmarks/bench_datastore_client.py [--calls N] [--anonymous] [--project ID]
+--anonymous 는 인증 정보 탐색 없이 익명 자격 증명으로 생성합니다 (로컬에서 채널 설정 비용만 측정).
+RPC 는 보내지 않으므로 실제 Datastore 연결 없이 실행할 수 있습니다 (google-cloud-datastore 필요).
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from datastore_client import DatastoreClientCache
+
+
+def _time_calls(fn, calls):
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), sum(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Datastore 클라이언트 생성/재사용 비용 비교')
+    parser.add_argument('--calls', type=int, default=50)
+    parser.add_argument('--anonymous', action='store_true', help='익명 자격 증명 사용')
+    parser.add_argument('--project', default=os.getenv('GOOGLE_CLOUD_PROJECT', 'bench-project'))
+    args = parser.parse_args()
+
+    try:
+        from google.cloud import datastore
+    except ImportError:
+        print("google-cloud-datastore 라이브러리가 설치되지 않았습니다.")
+        return 1
+
+    if args.anonymous:
+        from google.auth.credentials import AnonymousCredentials
+
+        def factory():
+            return datastore.Client(project=args.project, credentials=AnonymousCredentials())
+    else:
+        def factory():
+            return datastore.Client(project=args.project)
+
+    per_call_median, per_call_total = _time_calls(factory, args.calls)
+    # 상태 확인은 RPC 를 보내므로 끄고 생성/재사용만 측정
+    cache = DatastoreClientCache(factory=factory, health_interval=0)
+    cached_median, cached_total = _time_calls(cache.get, args.calls)
+
+    print(f"호출 {args.calls}회")
+    print(f"  매번 생성:   중앙값 {per_call_median:.3f}ms, 합계 {per_call_total:.1f}ms")
+    print(f"  캐시 재사용: 중앙값 {cached_median:.4f}ms, 합계 {cached_total:.1f}ms")
+    print(f"  호출당 절감: {(per_call_total - cached_total) / args.calls:.3f}ms")
+    print(f"  캐시 통계: {cache.stats()}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+혜택 코드 동시 사용 처리 스트레스 벤치마크
+여러 프로세스 x 스레드가 같은 코드 집합을 동시에 사용 처리하면서
+처리량, 지연 시간(p50/p99), 중복 사용(같은 코드가 두 번 이상 "처음 사용"으로 성공),
+유실(성공 응답을 받았는데 원장에 남지 않은 사용 기록)을 백엔드별로 측정합니다.
+
+사용법:
+  python benchmarks/bench_redemption_concurrency.py [--backends json,sqlite] [--modes service,route]
+      [--processes 4] [--threads 8] [--stores 300] [--output result.json]
+
+- service: services.redeem_code 직접 호출
+- route:   Flask 테스트 클라이언트로 POST /api/benefits/redeem 호출
+규모/백엔드마다 임시 STORAGE_DIR 과 합성 카탈로그(CATALOG_DATA_DIR)를 사용하므로 storage/ 는 건드리지 않습니다.
+중복 사용이나 유실이 있으면 종료 코드 1을 반환합니다 (json 백엔드는 --allow-unsafe 로 비교용 허용).
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'scripts'))
+
+DEFAULT_BACKENDS = ('json', 'sqlite')
+DEFAULT_MODES = ('service', 'route')
+BENCH_USER_EMAIL = 'bench@example.com'
+
+
+def _percentile(samples, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _redeem_fn(mode: str):
+    """모드별 사용 처리 함수 (코드 -> 이번 호출로 처음 사용 처리됐는지) - 스레드마다 하나씩 생성"""
+    if mode == 'service':
+        import services
+        return lambda code: (lambda r: r.get('success') and not r.get('already_used'))(
+            services.redeem_code(code, 'bench_pass', BENCH_USER_EMAIL))
+
+    from flask.sessions import SecureCookieSessionInterface
+    from app import create_app
+    app = create_app()
+    # 파일시스템 세션 대신 쿠키 세션 사용 (벤치마크가 flask_session/ 에 파일을 남기지 않도록)
+    app.session_interface = SecureCookieSessionInterface()
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_logged_in'] = True
+        sess['user_email'] = BENCH_USER_EMAIL
+
+    def redeem(code):
+        response = client.post('/api/benefits/redeem', json={'code': code, 'pass_id': 'bench_pass'})
+        body = response.get_json() or {}
+        return response.status_code == 200 and body.get('success') and not body.get('already_used')
+    return redeem
+
+
+def run_worker(mode: str, threads: int, seed: int, codes_file: str, result_file: str,
+               start_at: float) -> None:
+    """워커 프로세스: 스레드마다 전체 코드를 섞은 순서로 사용 처리하고 결과를 JSON으로 기록"""
+    with open(codes_file, 'r', encoding='utf-8') as f:
+        codes = json.load(f)
+    latencies = []
+    redeemed = []
+    errors = []
+    lock = threading.Lock()
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        from redemption_ledger import get_ledger
+        get_ledger()  # 원장 생성/스키마 준비는 측정에서 제외
+        fns = [_redeem_fn(mode) for _ in range(threads)]
+
+        def run(index: int):
+            order = list(codes)
+            random.Random(seed * 1000 + index).shuffle(order)
+            local_latencies, local_redeemed, local_errors = [], [], []
+            for code in order:
+                t0 = time.perf_counter()
+                try:
+                    if fns[index](code):
+                        local_redeemed.append(code)
+                except Exception as e:
+                    local_errors.append(f"{type(e).__name__}: {e}")
+                local_latencies.append((time.perf_counter() - t0) * 1000)
+            with lock:
+                latencies.extend(local_latencies)
+                redeemed.extend(local_redeemed)
+                errors.extend(local_errors)
+
+        workers = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+        # 모든 프로세스가 준비된 뒤 같은 시각에 시작
+        time.sleep(max(0.0, start_at - time.time()))
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+    with open(result_file, 'w', encoding='utf-8') as f:
+        json.dump({'latencies_ms': latencies, 'redeemed': redeemed, 'errors': errors[:20],
+                   'error_count': len(errors), 'elapsed_s': elapsed}, f)
+
+
+def _run_case(backend: str, mode: str, processes: int, threads: int, data_dir: str,
+              codes: list, start_delay: float) -> dict:
+    """백엔드/모드 하나를 새 임시 저장소에서 실행하고 결과 집계"""
+    from redemption_ledger import create_ledger
+
+    with tempfile.TemporaryDirectory(prefix=f"redeem_{backend}_{mode}_") as tmp_dir:
+        storage_dir = os.path.join(tmp_dir, 'storage')
+        os.makedirs(storage_dir)
+        codes_file = os.path.join(tmp_dir, 'codes.json')
+        with open(codes_file, 'w', encoding='utf-8') as f:
+            json.dump(codes, f)
+        env = dict(os.environ, CATALOG_DATA_DIR=data_dir, CATALOG_CHECK_INTERVAL='3600',
+                   STORAGE_DIR=storage_dir, REDEMPTION_BACKEND=backend)
+        start_at = time.time() + start_delay
+        result_files = [os.path.join(tmp_dir, f"result_{i}.json") for i in range(processes)]
+        procs = [subprocess.Popen([sys.executable, os.path.abspath(__file__), '--worker', mode,
+                                   '--threads', str(threads), '--seed', str(i), '--codes-file', codes_file,
+                                   '--result-file', result_files[i], '--start-at', repr(start_at)],
+                                  env=env)
+                 for i in range(processes)]
+        for proc in procs:
+            if proc.wait() != 0:
+                raise RuntimeError(f"워커 실패 (종료 코드 {proc.returncode})")
+
+        latencies, redeemed, errors, error_count, elapsed = [], [], [], 0, 0.0
+        for path in result_files:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            latencies.extend(result['latencies_ms'])
+            redeemed.extend(result['redeemed'])
+            errors.extend(result['errors'])
+            error_count += result['error_count']
+            elapsed = max(elapsed, result['elapsed_s'])
+
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            stored = create_ledger(backend, storage_dir).get_many(codes)
+
+    fresh_counts = {}
+    for code in redeemed:
+        fresh_counts[code] = fresh_counts.get(code, 0) + 1
+    return {
+        'backend': backend,
+        'mode': mode,
+        'processes': processes,
+        'threads': threads,
+        'codes': len(codes),
+        'calls': len(latencies),
+        'elapsed_s': elapsed,
+        'throughput_per_s': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': statistics.median(latencies) if latencies else 0.0,
+        'p99_ms': _percentile(latencies, 99),
+        # 같은 코드가 두 번 이상 "처음 사용"으로 성공한 횟수
+        'double_redemptions': sum(count - 1 for count in fresh_counts.values() if count > 1),
+        # 처음 사용 성공 응답을 받았지만 원장에 기록이 없는 코드 수
+        'lost_updates': sum(1 for code in fresh_counts if code not in stored),
+        # 어떤 요청도 성공하지 못한 코드 수 (오류로 처리되지 못한 코드)
+        'unredeemed': sum(1 for code in codes if code not in fresh_counts),
+        'errors': error_count,
+        'error_samples': errors[:5],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='혜택 코드 동시 사용 처리 스트레스 벤치마크')
+    parser.add_argument('--backends', default=','.join(DEFAULT_BACKENDS), help='쉼표로 구분한 원장 백엔드')
+    parser.add_argument('--modes', default=','.join(DEFAULT_MODES), help='service, route 중 선택')
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8, help='프로세스당 스레드 수')
+    parser.add_argument('--stores', type=int, default=300, help='합성 카탈로그 상점 수 (코드 수 ≈ 상점 수 x 2)')
+    parser.add_argument('--max-codes', type=int, default=500, help='사용 처리할 최대 코드 수')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--allow-unsafe', default='json', help='중복/유실이 있어도 실패로 보지 않을 백엔드')
+    parser.add_argument('--output', help='결과를 저장할 JSON 경로')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--codes-file', help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    parser.add_argument('--start-at', type=float, default=0.0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.threads, args.seed, args.codes_file, args.result_file, args.start_at)
+        return 0
+
+    from generate_synthetic_catalog import generate_catalog, write_catalog
+    from catalog import StoreCatalog
+
+    backends = [b.strip() for b in args.backends.split(',') if b.strip()]
+    modes = [m.strip() for m in args.modes.split(',') if m.strip()]
+    allow_unsafe = {b.strip() for b in args.allow_unsafe.split(',') if b.strip()}
+    results = []
+    with tempfile.TemporaryDirectory(prefix='redeem_catalog_') as tmp_dir:
+        data_dir = os.path.join(tmp_dir, 'data')
+        stores, benefits = generate_catalog(args.stores, seed=args.seed)
+        write_catalog(data_dir, stores, benefits)
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            codes = [b.redemption_code for b in StoreCatalog.from_json_files(data_dir).benefits]
+        codes = random.Random(args.seed).sample(codes, min(args.max_codes, len(codes)))
+        # 프로세스 시작/앱 생성 시간을 감안한 동시 시작 지연
+        start_delay = 2.0 + 0.3 * args.processes + (1.0 if 'route' in modes else 0.0)
+
+        print(f"[벤치마크] 코드 {len(codes)}개 x 스레드 {args.processes * args.threads}개 "
+              f"(프로세스 {args.processes} x 스레드 {args.threads})")
+        for backend in backends:
+            for mode in modes:
+                print(f"[벤치마크] {backend} / {mode} 측정 중...")
+                results.append(_run_case(backend, mode, args.processes, args.threads, data_dir,
+                                         codes, start_delay))
+
+    print(f"\n  {'백엔드':<8}{'모드':<9}{'요청/초':>10}{'p50(ms)':>10}{'p99(ms)':>10}"
+          f"{'중복 사용':>10}{'유실':>7}{'미처리':>8}{'오류':>7}")
+    for r in results:
+        print(f"  {r['backend']:<8}{r['mode']:<9}{r['throughput_per_s']:>10.0f}{r['p50_ms']:>10.2f}"
+              f"{r['p99_ms']:>10.2f}{r['double_redemptions']:>10}{r['lost_updates']:>7}"
+              f"{r['unredeemed']:>8}{r['errors']:>7}")
+        for sample in r['error_samples']:
+            print(f"    오류 예: {sample}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    failed = [r for r in results if r['backend'] not in allow_unsafe
+              and (r['double_redemptions'] or r['lost_updates'] or r['unredeemed'] or r['errors'])]
+    if failed:
+        names = ', '.join(f"{r['backend']}/{r['mode']}" for r in failed)
+        print(f"\n[벤치마크] ❌ 정합성 실패: {names}")
+        return 1
+    print("\n[벤치마크] ✅ 안전 백엔드에서 중복 사용/유실 없음")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""
+카탈로그 바이너리 스냅샷 빌드 스크립트
+data/stores.json, benefits.json, themes.json 을 data/catalog.snapshot 으로 컴파일합니다.
+배포 전에 실행하세요:  python scripts/build_catalog_snapshot.py
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from catalog import DATA_DIR
+from catalog_snapshot import build_snapshot, load_snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description='카탈로그 바이너리 스냅샷 빌드')
+    parser.add_argument('--data-dir', default=DATA_DIR, help='원본 JSON 디렉토리 (기본: data/)')
+    parser.add_argument('--output', default=None, help='출력 경로 (기본: <data-dir>/catalog.snapshot)')
+    args = parser.parse_args()
+
+    path = build_snapshot(args.data_dir, args.output)
+    size = os.path.getsize(path)
+    print(f"[스냅샷 빌드] 완료: {path} ({size:,} 바이트)")
+
+    if args.output is None and load_snapshot(args.data_dir) is None:
+        print("[스냅샷 빌드] ❌ 생성된 스냅샷을 다시 읽을 수 없습니다")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+패스 목록 인덱스 재생성: storage/saved_passes (평면 + 날짜 샤드) -> storage/pass_index.db
+사용법:  python scripts/build_pass_index.py [--dir PATH] [--db PATH] [--since YYYYMMDD] [--until YYYYMMDD]
+--since/--until 을 주면 해당 날짜 샤드만 읽어 다시 색인합니다.
+이미 있는 요약은 파일 내용으로 덮어쓰므로 여러 번 실행해도 안전합니다.
+(새 인덱스를 처음 열 때도 같은 색인이 자동으로 한 번 실행됩니다.)
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pass_index import SAVED_PASSES_DIR, PassIndex, pass_index_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='저장된 패스 파일로 패스 목록 인덱스 채우기')
+    parser.add_argument('--dir', default=SAVED_PASSES_DIR, help='패스 파일 디렉토리')
+    parser.add_argument('--db', default=pass_index_path(), help='패스 인덱스 경로')
+    parser.add_argument('--since', help='이 날짜(YYYYMMDD) 이후 샤드만 색인')
+    parser.add_argument('--until', help='이 날짜(YYYYMMDD) 까지의 샤드만 색인')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dir):
+        print(f"[패스 인덱스] 디렉토리가 없습니다: {args.dir}")
+        return 1
+
+    index = PassIndex(args.db)
+    indexed = index.rebuild_from_dir(args.dir, since=args.since, until=args.until)
+    print(f"[패스 인덱스] 파일 {indexed}개 색인 (인덱스 총 {index.count()}개) -> {args.db}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
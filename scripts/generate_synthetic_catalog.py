@@ -0,0 +1,220 @@
+"""
+합성 카탈로그 생성기
+동인천 일대 좌표와 한국어 상점명/지역/테마로 원하는 규모의 stores.json, benefits.json 을 만듭니다.
+사용법:  python scripts/generate_synthetic_catalog.py --stores 10000 --out /tmp/catalog_10k [--seed 42]
+themes.json 은 원본 data/ 에서 그대로 복사합니다.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+from typing import Dict, List, Tuple
+
+DEFAULT_SOURCE_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+# 지역별 중심 좌표(위도, 경도)와 상점 분포 가중치 (원본 데이터 평균 좌표 기준)
+AREAS: Dict[str, Tuple[float, float, float]] = {
+    '골목상권': (37.47344, 126.63540, 0.25),
+    '개항로': (37.47331, 126.62262, 0.14),
+    '동인천': (37.47542, 126.63346, 0.13),
+    '월미도': (37.47447, 126.59772, 0.12),
+    '차이나타운': (37.47526, 126.61994, 0.10),
+    '신포시장': (37.47270, 126.62620, 0.08),
+    '제물포시장': (37.46680, 126.65690, 0.07),
+    '배다리': (37.47600, 126.63900, 0.05),
+    '인천역': (37.47582, 126.61731, 0.04),
+    '자유공원': (37.47540, 126.62671, 0.02),
+}
+# 지역 중심에서 퍼지는 정도 (미터, 표준편차)
+AREA_SPREAD_M = 250.0
+
+NAME_PREFIXES = ['월미', '개항', '차이나', '신포', '배다리', '자유', '송월', '북성', '화평', '답동',
+                 '인현', '경동', '내동', '전동', '율목', '도원', '만석', '화수', '송현', '제물포']
+NAME_SUFFIXES = ['', '', '', '집', '당', '상회', '하우스', '본점', '골목', '1번지']
+
+# 업종별 (상호 어간, 테마 후보, 혜택 템플릿[(설명, 할인값, 경제적 가치)])
+CATEGORIES: Dict[str, Dict] = {
+    '음식점': {
+        'weight': 0.30,
+        'stems': ['만두', '국밥', '칼국수', '냉면', '짜장면', '순대', '족발', '횟집', '통닭', '분식',
+                  '불고기', '해장국', '쫄면', '닭강정', '우동'],
+        'themes': ['로컬', '전통', '길거리음식', '해산물', '레트로', '가족'],
+        'benefits': [('{stem} 세트 {pct}% 할인', None, None), ('{stem} 주문 시 음료 무료', 30, 2000),
+                     ('곱빼기 무료 업그레이드', 40, 3000), ('2인 이상 주문 시 사이드 무료', 50, 5000)],
+    },
+    '카페': {
+        'weight': 0.18,
+        'stems': ['커피', '로스터리', '다방', '티하우스', '디저트카페', '브루잉', '찻집'],
+        'themes': ['카페', '조용함', '디저트', '모던', '로맨틱', '핸드드립'],
+        'benefits': [('아메리카노 {pct}% 할인', None, None), ('음료 2+1 이벤트', 60, 4500),
+                     ('디저트 주문 시 음료 사이즈업', 35, 1000)],
+    },
+    '베이커리': {
+        'weight': 0.06,
+        'stems': ['빵집', '베이커리', '떡집', '방앗간', '제과'],
+        'themes': ['디저트', '전통', '로컬'],
+        'benefits': [('식빵 1개 무료 증정', 55, 3500), ('인절미 1봉지 무료증정', 50, 3000),
+                     ('빵 구매 시 {pct}% 할인', None, None)],
+    },
+    '주점': {
+        'weight': 0.06,
+        'stems': ['포차', '호프', '막걸리집', '이자카야', '펍'],
+        'themes': ['레트로', '로컬', '특별함'],
+        'benefits': [('안주 주문 시 {pct}% 할인', None, None), ('생맥주 1잔 무료', 45, 4000)],
+    },
+    '체험': {
+        'weight': 0.08,
+        'stems': ['공방', '도자기공방', '가죽공방', '향수공방', '원데이클래스', '사진관'],
+        'themes': ['체험', '특별함', '문화', '가족'],
+        'benefits': [('원데이 클래스 {pct}% 할인', None, None), ('공예 체험 + 완성품 가져가기', 70, 12000),
+                     ('4컷 사진 1회 무료', 60, 4000)],
+    },
+    '박물관': {
+        'weight': 0.04,
+        'stems': ['박물관', '전시관', '기념관', '역사관'],
+        'themes': ['문화', '역사', '가족', '레트로'],
+        'benefits': [('입장료 {pct}% 할인', None, None), ('기념품 제공', 40, 3000)],
+    },
+    '서점': {
+        'weight': 0.04,
+        'stems': ['서점', '헌책방', '북카페', '책방'],
+        'themes': ['문화', '조용함', '레트로'],
+        'benefits': [('15000원 이하 책 {pct}% 할인', None, None), ('책 구매 시 북마크 제작 서비스', 35, 1500)],
+    },
+    '소매점': {
+        'weight': 0.10,
+        'stems': ['상회', '잡화점', '빈티지샵', '꽃집', '선물가게', '기념품점', '한약방'],
+        'themes': ['쇼핑', '레트로', '로컬', '특별함'],
+        'benefits': [('구매 시 {pct}% 할인', None, None), ('빈티지 액세서리 무료 증정', 45, 5000),
+                     ('미니 화분 증정', 30, 2500)],
+    },
+    '숙박': {
+        'weight': 0.04,
+        'stems': ['호텔', '게스트하우스', '모텔', '한옥스테이'],
+        'themes': ['바다전망', '특별함', '로맨틱'],
+        'benefits': [('숙박 시 조식 무료 제공', 80, 11000), ('객실 {pct}% 할인', None, None)],
+    },
+    '놀이방': {
+        'weight': 0.04,
+        'stems': ['코인노래방', '보드게임카페', '키즈랜드', 'PC방', '오락실'],
+        'themes': ['가족', '레트로', '특별함'],
+        'benefits': [('1시간 무료 연장', 50, 5000), ('이용료 {pct}% 할인', None, None)],
+    },
+    '시장': {
+        'weight': 0.06,
+        'stems': ['닭강정', '어묵', '건어물', '반찬가게', '과일가게', '떡볶이'],
+        'themes': ['길거리음식', '로컬', '전통', '시장'],
+        'benefits': [('시장 투어 가이드 + 시식권', 60, 6000), ('{stem} {pct}% 할인', None, None)],
+    },
+}
+FRANCHISE_BRANDS = {
+    '카페': ['컴포즈커피', '메가커피', '빽다방', '이디야커피', '스타벅스'],
+    '음식점': ['맥도날드', '김밥천국', '롯데리아', '본죽', '교촌치킨'],
+    '소매점': ['CU', 'GS25', '세븐일레븐', '다이소'],
+    '베이커리': ['파리바게뜨', '뚜레쥬르'],
+}
+DESC_ADJECTIVES = ['오래된', '숨은', '정겨운', '새로 생긴', '현지인이 아끼는', '조용한', '활기찬', '소박한']
+PERCENTS = [10, 15, 20, 30, 40, 50]
+
+
+def _jitter(rng: random.Random, center: Tuple[float, float]) -> Tuple[float, float]:
+    """지역 중심 주변 정규분포 좌표 (미터 단위 표준편차를 도 단위로 변환)"""
+    lat, lng = center
+    d_lat = rng.gauss(0, AREA_SPREAD_M) / 111320.0
+    d_lng = rng.gauss(0, AREA_SPREAD_M) / 88300.0  # 위도 37.5도 부근 경도 1도 ≈ 88.3km
+    return lat + d_lat, lng + d_lng
+
+
+def _weighted_choice(rng: random.Random, items: Dict, weight_of) -> str:
+    keys = list(items)
+    return rng.choices(keys, weights=[weight_of(items[k]) for k in keys], k=1)[0]
+
+
+def generate_catalog(n_stores: int, seed: int = 42, max_benefits_per_store: int = 3,
+                     franchise_ratio: float = 0.2) -> Tuple[List[Dict], List[Dict]]:
+    """(stores, benefits) 원본 딕셔너리 목록 생성 - 같은 seed면 항상 같은 결과"""
+    rng = random.Random(seed)
+    id_width = max(3, len(str(n_stores)))
+    stores: List[Dict] = []
+    benefits: List[Dict] = []
+    used_names: Dict[str, int] = {}
+
+    for i in range(1, n_stores + 1):
+        area = _weighted_choice(rng, AREAS, lambda a: a[2])
+        category = _weighted_choice(rng, CATEGORIES, lambda c: c['weight'])
+        spec = CATEGORIES[category]
+        stem = rng.choice(spec['stems'])
+        prefix = rng.choice(NAME_PREFIXES)
+
+        is_franchise = category in FRANCHISE_BRANDS and rng.random() < franchise_ratio
+        if is_franchise:
+            name = f"{rng.choice(FRANCHISE_BRANDS[category])} {prefix}점"
+        else:
+            name = f"{prefix}{stem}{rng.choice(NAME_SUFFIXES)}"
+        # 상점명은 카탈로그 안에서 유일해야 함 (이름 기반 조회)
+        count = used_names.get(name, 0) + 1
+        used_names[name] = count
+        if count > 1:
+            name = f"{name} {count}호점"
+
+        lat, lng = _jitter(rng, AREAS[area][:2])
+        reviews = int(rng.expovariate(1 / 40)) if not is_franchise else int(rng.expovariate(1 / 400))
+        themes = rng.sample(spec['themes'], k=rng.randint(1, min(3, len(spec['themes']))))
+        store_id = f"S{i:0{id_width}d}"
+        stores.append({
+            'id': store_id,
+            'name': name,
+            'category': category,
+            'area': area,
+            'themes': themes,
+            'desc': f"{area}의 {rng.choice(DESC_ADJECTIVES)} {stem} {category}",
+            'reviews': reviews,
+            'is_franchise': is_franchise,
+            'latitude': lat,
+            'longitude': lng,
+        })
+
+        templates = rng.sample(spec['benefits'], k=rng.randint(1, min(max_benefits_per_store,
+                                                                       len(spec['benefits']))))
+        for template, value, eco_value in templates:
+            pct = rng.choice(PERCENTS)
+            benefits.append({
+                'id': f"B{len(benefits) + 1:0{id_width + 1}d}",
+                'store_id': store_id,
+                'desc': template.format(stem=stem, pct=pct),
+                'value': value if value is not None else min(95, pct + rng.randint(10, 40)),
+                'eco_value': eco_value if eco_value is not None else rng.choice([500, 1000, 2000, 3000, 5000]),
+            })
+
+    return stores, benefits
+
+
+def write_catalog(out_dir: str, stores: List[Dict], benefits: List[Dict],
+                  source_dir: str = DEFAULT_SOURCE_DIR) -> None:
+    """원본과 같은 {"stores": [...]} / {"benefits": [...]} 구조로 저장하고 themes.json 복사"""
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, 'stores.json'), 'w', encoding='utf-8') as f:
+        json.dump({'stores': stores}, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(out_dir, 'benefits.json'), 'w', encoding='utf-8') as f:
+        json.dump({'benefits': benefits}, f, ensure_ascii=False, indent=2)
+    shutil.copyfile(os.path.join(source_dir, 'themes.json'), os.path.join(out_dir, 'themes.json'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='합성 상점/혜택 카탈로그 생성')
+    parser.add_argument('--stores', type=int, default=10000, help='상점 수')
+    parser.add_argument('--out', required=True, help='출력 디렉토리 (CATALOG_DATA_DIR 로 지정 가능)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--max-benefits', type=int, default=3, help='상점당 최대 혜택 수')
+    args = parser.parse_args()
+
+    stores, benefits = generate_catalog(args.stores, seed=args.seed,
+                                        max_benefits_per_store=args.max_benefits)
+    write_catalog(args.out, stores, benefits)
+    print(f"[합성 카탈로그] 상점 {len(stores):,}개, 혜택 {len(benefits):,}개 -> {args.out}")
+    print(f"[합성 카탈로그] 사용 예: CATALOG_DATA_DIR={args.out} python src/app.py")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+저장된 패스 파일 배치 마이그레이션: storage/saved_passes/pass_<id>.json -> saved_passes/YYYY/MM/DD/pass_<id>.json
+사용법:  python scripts/migrate_pass_layout.py [--dir PATH] [--dry-run]
+샤드에 이미 같은 패스가 있으면 평면 파일만 지우므로 여러 번 실행해도 안전합니다.
+이동 중에도 패스 로드는 샤드 경로와 평면 경로를 모두 확인하므로 서비스를 멈출 필요가 없습니다.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pass_storage import SAVED_PASSES_DIR, migrate_flat_layout
+
+
+def main():
+    parser = argparse.ArgumentParser(description='saved_passes 평면 배치를 날짜 샤드 배치로 옮기기')
+    parser.add_argument('--dir', default=SAVED_PASSES_DIR, help='패스 파일 디렉토리')
+    parser.add_argument('--dry-run', action='store_true', help='파일을 옮기지 않고 개수만 출력')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dir):
+        print(f"[마이그레이션] 디렉토리가 없습니다: {args.dir}")
+        return 1
+
+    moved, skipped = migrate_flat_layout(args.dir, dry_run=args.dry_run)
+    prefix = '(dry-run) ' if args.dry_run else ''
+    print(f"[마이그레이션] {prefix}샤드로 이동 {moved}개, 샤드에 이미 있어 평면 파일 정리 {skipped}개 -> {args.dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+혜택 코드 사용 내역 마이그레이션: storage/redemptions.json -> storage/redemptions.db (SQLite)
+사용법:  python scripts/migrate_redemptions.py [--json PATH] [--db PATH] [--rebuild-stats]
+이미 원장에 있는 코드는 건너뛰므로 여러 번 실행해도 안전합니다.
+(새 SQLite 원장을 처음 열 때도 같은 가져오기가 자동으로 한 번 실행됩니다.)
+--rebuild-stats 는 원장 전체로 상점/혜택/시간대별 집계를 다시 계산합니다 (집계 도입 이전 원장용).
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from redemption_ledger import (JsonRedemptionLedger, SqliteRedemptionLedger, catalog_store_id_for,
+                               legacy_json_path, sqlite_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='redemptions.json 을 SQLite 원장으로 가져오기')
+    parser.add_argument('--json', default=legacy_json_path(), help='기존 JSON 사용 내역 경로')
+    parser.add_argument('--db', default=sqlite_path(), help='SQLite 원장 경로')
+    parser.add_argument('--rebuild-stats', action='store_true', help='원장 전체로 사용 집계 재계산')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.json) and not args.rebuild_stats:
+        print(f"[마이그레이션] JSON 파일이 없습니다: {args.json}")
+        return 1
+
+    ledger = SqliteRedemptionLedger(args.db)
+    if os.path.exists(args.json):
+        total = len(JsonRedemptionLedger(args.json).load().get('used', {}))
+        imported = ledger.import_json(args.json, catalog_store_id_for)
+        print(f"[마이그레이션] JSON {total}건 중 {imported}건 추가, 건너뜀 {total - imported}건 "
+              f"(원장 총 {ledger.count()}건) -> {args.db}")
+    if args.rebuild_stats:
+        rebuilt = ledger.rebuild_stats(catalog_store_id_for)
+        print(f"[마이그레이션] 사용 집계 재계산: {rebuilt}건")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,34 @@
+"""
+만료 패스 콜드 아카이브 정리: storage/saved_passes -> storage/pass_archive/passes-YYYY-MM.zip
+사용법:  python scripts/sweep_expired_passes.py [--dry-run] [--limit N] [--now ISO시각]
+배포 환경에서는 cron.yaml 이 /api/cron/sweep-expired-passes 를 매일 호출합니다.
+이미 아카이브된 패스는 건너뛰므로 여러 번 실행해도 안전합니다.
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pass_archive import SWEEP_BATCH_LIMIT, sweep_expired_passes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='만료된 패스를 월별 콜드 아카이브로 옮기기')
+    parser.add_argument('--dry-run', action='store_true', help='옮기지 않고 대상 수만 확인')
+    parser.add_argument('--limit', type=int, default=SWEEP_BATCH_LIMIT, help='한 번에 옮길 최대 패스 수')
+    parser.add_argument('--now', help='만료 판정 기준 시각 (ISO, 기본: 현재)')
+    args = parser.parse_args()
+
+    now = datetime.fromisoformat(args.now) if args.now else None
+    result = sweep_expired_passes(now=now, limit=args.limit, dry_run=args.dry_run)
+    if result['skipped']:
+        return 1
+    label = '대상' if args.dry_run else '아카이브'
+    print(f"[패스 아카이브] 만료 {result['expired']}개 {label} (월: {', '.join(result['months']) or '-'})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
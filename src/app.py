@@ -7,7 +7,7 @@ from flask_session import Session
 import os
 import secrets
 from routes import register_routes
-from services import load_stores, load_benefits
+from catalog import get_catalog
 from dotenv import load_dotenv
 
 # 환경 변수 로드
@@ -80,10 +80,11 @@ def create_app():
     return app
 
 def initialize_data():
-    """애플리케이션 시작 시 데이터 로드"""
+    """애플리케이션 시작 시 데이터 로드 (프로세스 공유 카탈로그를 미리 생성)"""
     try:
-        stores_data = load_stores()
-        benefits_data = load_benefits()
+        catalog = get_catalog()
+        stores_data = list(catalog.stores)
+        benefits_data = list(catalog.benefits)
         
         if not stores_data or not benefits_data:
             print("[경고] 일부 데이터 로드 실패")
@@ -91,6 +92,9 @@ def initialize_data():
         else:
             print(f"[완료] {len(stores_data)}개 상점, {len(benefits_data)}개 혜택 로드됨")
         
+        # 검색 인덱스도 미리 생성 (첫 검색 요청 지연 방지)
+        catalog.search_index
+        
         return stores_data, benefits_data
     except Exception as e:
         print(f"[오류] 데이터 초기화 실패: {str(e)}")
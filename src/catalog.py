@@ -0,0 +1,379 @@
+"""
+상점/혜택/테마 카탈로그
+data/*.json 을 프로세스당 한 번만 파싱해 모든 호출부가 공유합니다.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import List, Dict, Optional, Any, Callable, FrozenSet, Iterable, Mapping, Tuple
+from models import Store, Benefit, Theme
+from spatial_index import GridSpatialIndex
+from store_table import StoreTable, np, synergy_score
+from http_payload import PrecompressedPayload, build_json_payload
+from catalog_snapshot import load_snapshot
+from search_index import StoreSearchIndex
+
+DATA_DIR = os.getenv('CATALOG_DATA_DIR') or os.path.join(os.path.dirname(__file__), '..', 'data')
+CATALOG_FILES = ('stores.json', 'benefits.json', 'themes.json')
+
+# 데이터 파일 변경 여부를 확인하는 최소 간격(초)
+CATALOG_CHECK_INTERVAL = float(os.getenv('CATALOG_CHECK_INTERVAL', '2'))
+
+# 테마별로 매칭되는 상점 테마/카테고리 토큰 (stores.json 의 themes, category 값 기준)
+THEME_TOKENS: Dict[Theme, Tuple[str, ...]] = {
+    Theme.FOOD: ('음식', '음식점', '맛집', '한식', '중식', '일식', '양식', '분식', '디저트', '카페',
+                 '베이커리', '제과점', '짜장면', '치킨', '족발', '냉면', '순대국', '김밥', '떡볶이',
+                 '간식', '서민음식', '해물찜', '불고기', '햄버거', '패스트푸드', '야식', '길거리음식'),
+    Theme.CULTURE: ('문화', '문화시설', '관광지', '박물관', '역사', '예술', '갤러리', '전시', '미술',
+                    '건축', '개항기', '영화', '서점', '독립서점', '책', '체험', '수공예'),
+    Theme.SHOPPING: ('쇼핑', '쇼핑몰', '마트', '의류', '잡화', '패션', '빈티지', '선물', '기념품',
+                     '꽃집', '꽃', '문구점', '문구', '편의점', '소매점', '시장'),
+    Theme.ENTERTAINMENT: ('엔터테인먼트', '레저', '스포츠', '게임', '오락', '노래방', '놀이방', '영화',
+                          '타로', '점술', '사진', '주점', '체험'),
+    Theme.SEAFOOD: ('해산물', '횟집', '회', '해물찜', '바다전망'),
+    Theme.CAFE: ('카페', '커피', '핸드드립', '디저트', '차', '음료', '베이커리', '빵'),
+    Theme.TRADITIONAL: ('전통', '한옥', '떡', '한약', '역사', '개항기', '시장', '도자기', '성냥', '고서'),
+    Theme.RETRO: ('레트로', '빈티지', '추억', '개항기', '고서', '희귀본', '성냥', '문구'),
+    Theme.QUIET: ('조용함', '휴식', '독립서점', '서점', '책', '핸드드립', '갤러리', '펜션'),
+}
+
+
+def stable_redemption_code(source: str) -> str:
+    """입력 문자열 기반으로 안정적인 8자 코드 생성(대문자+숫자), XXXX-XXXX 형식"""
+    digest = hashlib.sha1(source.encode('utf-8')).hexdigest().upper()
+    # 영숫자만 사용, 앞 8자
+    code = ''.join(ch for ch in digest if ch.isalnum())[:8]
+    return f"{code[:4]}-{code[4:8]}"
+
+
+def normalize_redemption_code(code: str) -> str:
+    """코드 비교용 정규화 (대소문자, 하이픈, 공백 무시)"""
+    return ''.join(ch for ch in (code or '').upper() if ch.isalnum())
+
+
+def _source_signature(data_dir: str = DATA_DIR) -> Tuple[Tuple[str, int, int], ...]:
+    """데이터 파일들의 (이름, 수정시각, 크기) 서명"""
+    signature = []
+    for filename in CATALOG_FILES:
+        try:
+            st = os.stat(os.path.join(data_dir, filename))
+            signature.append((filename, st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append((filename, 0, 0))
+    return tuple(signature)
+
+
+def _read_json(filename: str, default: Any, data_dir: str = DATA_DIR) -> Any:
+    """data 디렉토리의 JSON 파일 읽기 (없거나 깨진 경우 기본값)"""
+    path = os.path.join(data_dir, filename)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        print(f"[카탈로그] {filename} 파일을 찾을 수 없습니다.")
+        return default
+    except Exception as e:
+        print(f"[카탈로그] {filename} 로드 중 오류: {e}")
+        return default
+
+
+def normalize_token(token: str) -> str:
+    """테마/카테고리 토큰 비교용 정규화 (앞뒤 공백, 대소문자 무시)"""
+    return (token or '').strip().lower()
+
+
+def _store_tokens(store_data: Dict) -> FrozenSet[str]:
+    """상점의 색인 토큰: themes 목록 + category"""
+    tokens = {normalize_token(t) for t in store_data.get('themes') or () if isinstance(t, str)}
+    tokens.add(normalize_token(store_data.get('category', '')))
+    tokens.discard('')
+    return frozenset(tokens)
+
+
+def _unwrap(data: Any, key: str) -> List[Dict]:
+    """{"stores": [...]} / [...] 두 가지 JSON 구조 모두 지원"""
+    if isinstance(data, dict) and key in data:
+        return data[key]
+    if isinstance(data, list):
+        return data
+    return []
+
+
+def _store_from_raw(store_data: Dict) -> Store:
+    """JSON 필드를 Store 모델에 맞게 변환"""
+    return Store(
+        name=store_data.get('name', ''),
+        category=store_data.get('category', ''),
+        address=store_data.get('address', ''),
+        phone=store_data.get('phone', ''),
+        description=store_data.get('desc', store_data.get('description', '')),
+        rating=float(store_data.get('rating', 0)),
+        price_range=store_data.get('price_range', '보통'),
+        opening_hours=store_data.get('opening_hours', '09:00-21:00'),
+        menu_highlights=store_data.get('menu_highlights', []),
+        location=store_data.get('area', store_data.get('location', '')),
+        latitude=store_data.get('latitude'),
+        longitude=store_data.get('longitude'),
+        image_url=store_data.get('image_url', '')
+    )
+
+
+def _benefit_from_raw(benefit_data: Dict) -> Benefit:
+    """JSON 필드를 Benefit 모델에 맞게 변환"""
+    return Benefit(
+        store_name=benefit_data.get('store_id', ''),  # store_id를 store_name으로 사용
+        benefit_type=benefit_data.get('benefit_type', '할인'),
+        description=benefit_data.get('desc', benefit_data.get('description', '')),
+        discount_rate=benefit_data.get('discount_rate'),
+        valid_until=benefit_data.get('valid_until'),
+        terms=benefit_data.get('terms')
+    )
+
+
+class StoreCatalog:
+    """
+    읽기 전용 카탈로그
+    타입이 지정된 Store/Benefit 객체와 원본 딕셔너리를 나란히 보관합니다.
+    공유 객체이므로 호출부에서 수정하지 말고 필요하면 복사해서 사용하세요.
+    """
+
+    def __init__(self, stores_raw: List[Dict], benefits_raw: List[Dict], themes: Dict[str, Any],
+                 signature: Tuple = (), precomputed: Optional[Dict[str, Any]] = None,
+                 source: str = 'json'):
+        self.signature = signature
+        self.source = source
+        mtimes = [mtime_ns for _, mtime_ns, _ in signature if mtime_ns]
+        self.last_modified = (datetime.fromtimestamp(max(mtimes) / 1e9, tz=timezone.utc)
+                              if mtimes else datetime.now(timezone.utc))
+        self._memo: Dict[str, Any] = {}
+        self._memo_lock = threading.Lock()
+        self.stores_raw: Tuple[Dict, ...] = tuple(stores_raw)
+        self.benefits_raw: Tuple[Dict, ...] = tuple(benefits_raw)
+        self.themes: Mapping[str, Any] = MappingProxyType(themes)
+
+        self.stores: Tuple[Store, ...] = tuple(_store_from_raw(s) for s in self.stores_raw)
+        self.benefits: Tuple[Benefit, ...] = tuple(_benefit_from_raw(b) for b in self.benefits_raw)
+
+        # 자주 쓰이는 조회 맵
+        self.store_by_name: Mapping[str, Store] = MappingProxyType(
+            {store.name: store for store in self.stores})
+        self.store_raw_by_name: Mapping[str, Dict] = MappingProxyType(
+            {s.get('name'): s for s in self.stores_raw})
+        self.store_raw_by_id: Mapping[str, Dict] = MappingProxyType(
+            {s.get('id'): s for s in self.stores_raw if s.get('id')})
+        self.store_id_by_name: Mapping[str, str] = MappingProxyType(
+            {s.get('name'): s.get('id') for s in self.stores_raw if s.get('id')})
+        self.store_name_by_id: Mapping[str, str] = MappingProxyType(
+            {s.get('id'): s.get('name') for s in self.stores_raw if s.get('id')})
+        self.store_row_by_id: Mapping[str, int] = MappingProxyType(
+            {s.get('id'): i for i, s in enumerate(self.stores_raw) if s.get('id')})
+
+        # 테마/카테고리 토큰 -> 상점 ID 역색인
+        store_ids_by_token: Dict[str, set] = {}
+        for store_data in self.stores_raw:
+            store_id = store_data.get('id')
+            if not store_id:
+                continue
+            for token in _store_tokens(store_data):
+                store_ids_by_token.setdefault(token, set()).add(store_id)
+        self.store_ids_by_token: Mapping[str, FrozenSet[str]] = MappingProxyType(
+            {token: frozenset(ids) for token, ids in store_ids_by_token.items()})
+
+        # 혜택별 전역 고정 특수코드를 미리 부여하고 코드 -> 혜택 인덱스 생성
+        # (스냅샷에서 로드한 경우 미리 계산된 코드 사용)
+        precomputed = precomputed or {}
+        codes = precomputed.get('redemption_codes')
+        if codes is None or len(codes) != len(self.benefits):
+            codes = [stable_redemption_code(f"{b.store_name}|{b.benefit_type}|{b.description}")
+                     for b in self.benefits]
+        benefit_by_code: Dict[str, Benefit] = {}
+        for benefit, code in zip(self.benefits, codes):
+            benefit.redemption_code = code
+            benefit_by_code[normalize_redemption_code(code)] = benefit
+        self.benefit_by_code: Mapping[str, Benefit] = MappingProxyType(benefit_by_code)
+
+        # 좌표 공간 인덱스 (키 = stores_raw 내 위치)
+        self.spatial_index = GridSpatialIndex(
+            (i, s.get('latitude'), s.get('longitude')) for i, s in enumerate(self.stores_raw))
+
+        # 컬럼형 상점 테이블 (numpy 미설치 시 None - 호출부는 스칼라 계산으로 대체)
+        self.table: Optional[StoreTable] = (
+            StoreTable(self.stores_raw, self.benefits_raw) if np is not None else None)
+
+        # 파생 지표 미리 계산: 상점별 상생 점수, 혜택별 경제적 가치
+        store_scores = precomputed.get('synergy')
+        if store_scores is None or len(store_scores) != len(self.stores_raw):
+            if self.table is not None:
+                store_scores = [int(score) for score in self.table.synergy]
+            else:
+                store_scores = [synergy_score(s) for s in self.stores_raw]
+        synergy_by_store_name: Dict[str, int] = {}
+        for store_data, score in zip(self.stores_raw, store_scores):
+            synergy_by_store_name[store_data.get('name', '')] = score
+        self.synergy_by_store_name: Mapping[str, int] = MappingProxyType(synergy_by_store_name)
+        self.eco_value_by_benefit: Mapping[Tuple[str, str], int] = MappingProxyType({
+            (b.get('store_id', ''), b.get('desc', '')): b.get('eco_value', 0) for b in self.benefits_raw})
+
+        benefits_by_store: Dict[str, List[Benefit]] = {}
+        for benefit in self.benefits:
+            benefits_by_store.setdefault(benefit.store_name, []).append(benefit)
+        self.benefits_by_store_id: Mapping[str, Tuple[Benefit, ...]] = MappingProxyType(
+            {store_id: tuple(items) for store_id, items in benefits_by_store.items()})
+
+    @classmethod
+    def from_json_files(cls, data_dir: str = DATA_DIR) -> 'StoreCatalog':
+        """data/*.json 을 직접 파싱해 카탈로그 생성"""
+        signature = _source_signature(data_dir)
+        stores_raw = _unwrap(_read_json('stores.json', [], data_dir), 'stores')
+        benefits_raw = _unwrap(_read_json('benefits.json', [], data_dir), 'benefits')
+        themes = _read_json('themes.json', {}, data_dir)
+        return cls(stores_raw, benefits_raw, themes if isinstance(themes, dict) else {},
+                   signature=signature)
+
+    @classmethod
+    def from_files(cls, data_dir: str = DATA_DIR) -> 'StoreCatalog':
+        """최신 바이너리 스냅샷이 있으면 사용하고, 없거나 오래됐으면 JSON에서 생성"""
+        signature = _source_signature(data_dir)
+        document = load_snapshot(data_dir)
+        if document is None:
+            return cls.from_json_files(data_dir)
+        return cls(document['stores_raw'], document['benefits_raw'], document['themes'],
+                   signature=signature, precomputed=document.get('precomputed'),
+                   source='snapshot')
+
+    def precomputed(self) -> Dict[str, Any]:
+        """스냅샷에 함께 저장할 미리 계산된 인덱스 (원본 순서와 동일한 목록)"""
+        return {
+            'redemption_codes': [b.redemption_code for b in self.benefits],
+            'synergy': [self.synergy_by_store_name.get(s.get('name', ''), 0) for s in self.stores_raw],
+        }
+
+    def memo(self, name: str, factory: Callable[[], Any]) -> Any:
+        """카탈로그 버전당 한 번만 계산되는 파생 데이터"""
+        value = self._memo.get(name)
+        if value is None:
+            with self._memo_lock:
+                value = self._memo.get(name)
+                if value is None:
+                    value = factory()
+                    self._memo[name] = value
+        return value
+
+    def stores_payload(self) -> PrecompressedPayload:
+        """/api/stores 응답 본문 (직렬화 + gzip/br 압축을 한 번만 수행)"""
+        return self.memo('stores_payload', lambda: build_json_payload({
+            'success': True,
+            'stores': list(self.stores_raw),
+            'count': len(self.stores_raw)
+        }, self.last_modified))
+
+    def stores_for_tokens(self, tokens: Iterable[str]) -> Tuple[Store, ...]:
+        """
+        토큰 중 하나 이상과 일치하는 상점 (역색인 합집합)
+        일치 토큰 수가 많은 순, 같으면 상생 점수가 높은 순, 그다음 카탈로그 순서로 정렬합니다.
+        """
+        match_count: Dict[str, int] = {}
+        for token in {normalize_token(t) for t in tokens}:
+            for store_id in self.store_ids_by_token.get(token, ()):
+                match_count[store_id] = match_count.get(store_id, 0) + 1
+
+        def rank(store_id: str):
+            row = self.store_row_by_id[store_id]
+            synergy = self.synergy_by_store_name.get(self.stores_raw[row].get('name', ''), 0)
+            return (-match_count[store_id], -synergy, row)
+
+        return tuple(self.stores[self.store_row_by_id[store_id]]
+                     for store_id in sorted(match_count, key=rank))
+
+    def stores_for_theme(self, theme: Theme) -> Tuple[Store, ...]:
+        """테마에 맞는 상점 순위 목록 (카탈로그 버전당 테마별 한 번만 계산)"""
+        tokens = THEME_TOKENS.get(theme, (theme.value,))
+        return self.memo(f"theme:{theme.name}", lambda: self.stores_for_tokens(tokens))
+
+    @property
+    def search_index(self) -> StoreSearchIndex:
+        """상점명/설명/지역 n-gram 검색 인덱스 (첫 검색 때 한 번만 생성)"""
+        return self.memo('search_index', lambda: StoreSearchIndex(self.stores_raw))
+
+    def search_stores(self, query: str, limit: int = 20) -> List[Tuple[int, Dict]]:
+        """검색어와 일치하는 상점을 관련도순으로 반환 [(점수, 원본 상점 딕셔너리)]"""
+        return [(score, self.stores_raw[i]) for score, i in self.search_index.search(query, limit)]
+
+    def find_benefit_by_code(self, code: str) -> Optional[Benefit]:
+        """특수코드로 혜택 조회 (O(1))"""
+        return self.benefit_by_code.get(normalize_redemption_code(code))
+
+    def nearby_stores(self, lat: float, lng: float, k: Optional[int] = None,
+                      radius_m: Optional[float] = None) -> List[Tuple[float, Dict]]:
+        """
+        좌표 주변 상점을 하버사인 거리순으로 반환 [(거리(m), 원본 상점 딕셔너리)]
+        - k만 주면 최근접 k개, radius_m만 주면 반경 내 전체, 둘 다 주면 반경 내 최근접 k개
+        """
+        if k is None:
+            hits = self.spatial_index.within_radius(lat, lng, radius_m if radius_m is not None else 0)
+        else:
+            hits = self.spatial_index.nearest(lat, lng, k, max_radius_m=radius_m)
+        return [(distance, self.stores_raw[i]) for distance, i in hits]
+
+    def eco_value_for(self, store_id: str, description: str, default: int = 3000) -> int:
+        """혜택의 경제적 가치 (카탈로그에 없는 혜택은 기본값 3000원)"""
+        return self.eco_value_by_benefit.get((store_id, description), default)
+
+    def store_name_for(self, store_id: str) -> str:
+        """store_id를 실제 상점명으로 변환 (없으면 그대로 반환)"""
+        return self.store_name_by_id.get(store_id, store_id)
+
+
+# 프로세스 전역 카탈로그 인스턴스
+_catalog_instance: Optional[StoreCatalog] = None
+_catalog_checked_at = 0.0
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> StoreCatalog:
+    """
+    프로세스당 한 번만 생성되는 카탈로그 반환
+    데이터 파일이 바뀐 경우에만 (최대 CATALOG_CHECK_INTERVAL 초마다 확인) 다시 생성합니다.
+    """
+    global _catalog_instance, _catalog_checked_at
+    catalog = _catalog_instance
+    now = time.monotonic()
+    if catalog is not None and now - _catalog_checked_at < CATALOG_CHECK_INTERVAL:
+        return catalog
+    with _catalog_lock:
+        _catalog_checked_at = now
+        if _catalog_instance is None:
+            _catalog_instance = StoreCatalog.from_files()
+            print(f"[카탈로그] {len(_catalog_instance.stores)}개 상점, "
+                  f"{len(_catalog_instance.benefits)}개 혜택 로드됨 ({_catalog_instance.source})")
+        elif _source_signature() != _catalog_instance.signature:
+            _catalog_instance = StoreCatalog.from_files()
+            print(f"[카탈로그] 데이터 파일 변경 감지 - 다시 로드됨: "
+                  f"{len(_catalog_instance.stores)}개 상점, {len(_catalog_instance.benefits)}개 혜택")
+        return _catalog_instance
+
+
+def peek_stores_payload() -> Optional[PrecompressedPayload]:
+    """
+    이미 만들어 둔 /api/stores 페이로드 (카탈로그를 생성/확인하지 않음)
+    카탈로그가 아직 없거나, 데이터 파일 변경 확인 주기가 지났거나, 페이로드를 아직 만들지 않았으면 None.
+    """
+    catalog = _catalog_instance
+    if catalog is None or time.monotonic() - _catalog_checked_at >= CATALOG_CHECK_INTERVAL:
+        return None
+    return catalog._memo.get('stores_payload')
+
+
+def reload_catalog() -> StoreCatalog:
+    """카탈로그를 강제로 다시 생성"""
+    global _catalog_instance, _catalog_checked_at
+    with _catalog_lock:
+        _catalog_checked_at = time.monotonic()
+        _catalog_instance = StoreCatalog.from_files()
+        print(f"[카탈로그] 다시 로드됨: {len(_catalog_instance.stores)}개 상점, "
+              f"{len(_catalog_instance.benefits)}개 혜택")
+        return _catalog_instance
@@ -0,0 +1,88 @@
+"""
+카탈로그 바이너리 스냅샷
+data/*.json 을 msgpack 스냅샷으로 미리 컴파일해 콜드 스타트 시 JSON 파싱과 인덱스 계산을 줄입니다.
+원본 JSON 내용(SHA-1)이 바뀌면 스냅샷은 자동으로 무시됩니다.
+"""
+import hashlib
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_MAGIC = b'JMPGCAT'
+SNAPSHOT_FILENAME = 'catalog.snapshot'
+SOURCE_FILES = ('stores.json', 'benefits.json', 'themes.json')
+
+
+def snapshot_path(data_dir: str) -> str:
+    return os.path.join(data_dir, SNAPSHOT_FILENAME)
+
+
+def source_digests(data_dir: str) -> Dict[str, str]:
+    """원본 JSON 파일별 SHA-1 (파싱 없이 바이트만 해시)"""
+    digests = {}
+    for filename in SOURCE_FILES:
+        try:
+            with open(os.path.join(data_dir, filename), 'rb') as f:
+                digests[filename] = hashlib.sha1(f.read()).hexdigest()
+        except OSError:
+            digests[filename] = ''
+    return digests
+
+
+def build_snapshot(data_dir: str, output_path: Optional[str] = None) -> str:
+    """원본 JSON과 미리 계산한 인덱스를 스냅샷 파일로 저장하고 경로 반환"""
+    if msgpack is None:
+        raise ImportError("msgpack 패키지가 설치되지 않았습니다.")
+
+    from catalog import StoreCatalog
+
+    digests = source_digests(data_dir)
+    catalog = StoreCatalog.from_json_files(data_dir)
+    document = {
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        'built_at': datetime.now(timezone.utc).isoformat(),
+        'sources': digests,
+        'stores_raw': list(catalog.stores_raw),
+        'benefits_raw': list(catalog.benefits_raw),
+        'themes': dict(catalog.themes),
+        'precomputed': catalog.precomputed(),
+    }
+
+    output_path = output_path or snapshot_path(data_dir)
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(bytes([SNAPSHOT_FORMAT_VERSION]))
+        f.write(msgpack.packb(document, use_bin_type=True))
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def load_snapshot(data_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    최신 스냅샷이 있으면 문서를 반환, 없거나 오래됐거나 형식이 다르면 None (JSON으로 대체)
+    """
+    path = snapshot_path(data_dir)
+    if msgpack is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(len(SNAPSHOT_MAGIC) + 1)
+            if header[:-1] != SNAPSHOT_MAGIC or header[-1] != SNAPSHOT_FORMAT_VERSION:
+                print("[카탈로그 스냅샷] 형식 버전 불일치 - JSON 사용")
+                return None
+            document = msgpack.unpackb(f.read(), raw=False, strict_map_key=False)
+    except Exception as e:
+        print(f"[카탈로그 스냅샷] 읽기 실패 - JSON 사용: {e}")
+        return None
+
+    if document.get('sources') != source_digests(data_dir):
+        print("[카탈로그 스냅샷] 원본 JSON이 변경됨 (오래된 스냅샷) - JSON 사용")
+        return None
+    return document
+
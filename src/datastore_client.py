@@ -0,0 +1,153 @@
+"""
+Datastore 클라이언트 캐시 (프로세스별 1개)
+datastore.Client() 는 생성할 때마다 인증 정보 탐색과 gRPC 채널 설정을 반복하므로
+워커 프로세스마다 한 번 만들어 저장/조회/목록/삭제가 모두 재사용합니다.
+
+- fork 안전: gunicorn preload_app=True 에서는 마스터가 만든 객체가 워커로 복사되므로
+  클라이언트는 처음 사용할 때 만들고, 만든 프로세스(pid)와 다르면 새로 만듭니다.
+- 상태 확인: DATASTORE_HEALTH_INTERVAL 초마다 없는 키를 한 번 조회해 연결을 확인하고,
+  실패하거나 호출하는 쪽이 연결 오류를 보고하면 다음 사용 때 다시 만듭니다.
+- 계측: 생성 횟수/시간과 재사용 횟수로 재사용이 줄인 호출당 생성 비용을 보여 줍니다.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+DATASTORE_HEALTH_INTERVAL = float(os.getenv('DATASTORE_HEALTH_INTERVAL', '300'))
+# 상태 확인에 조회하는 키 (존재하지 않아도 됨)
+HEALTH_CHECK_KIND = '_HealthCheck'
+
+try:
+    from google.api_core import exceptions as api_exceptions
+    _CONNECTION_ERRORS = (ConnectionError, api_exceptions.ServiceUnavailable, api_exceptions.DeadlineExceeded,
+                          api_exceptions.Unauthenticated, api_exceptions.RetryError)
+except ImportError:
+    _CONNECTION_ERRORS = (ConnectionError,)
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """클라이언트를 다시 만들어야 하는 오류인지 (연결/인증/시간 초과)"""
+    return isinstance(error, _CONNECTION_ERRORS)
+
+
+def _new_datastore_client():
+    from google.cloud import datastore
+    return datastore.Client()
+
+
+def _health_check(client) -> None:
+    client.get(client.key(HEALTH_CHECK_KIND, 'ping'))
+
+
+class DatastoreClientCache:
+    """
+    프로세스별로 지연 생성하는 Datastore 클라이언트 (스레드 안전)
+    factory/health_check 는 테스트와 벤치마크에서 바꿔 끼울 수 있습니다.
+    """
+
+    def __init__(self, factory: Callable[[], Any] = _new_datastore_client,
+                 health_check: Callable[[Any], None] = _health_check,
+                 health_interval: float = DATASTORE_HEALTH_INTERVAL):
+        self.factory = factory
+        self.health_check = health_check
+        self.health_interval = health_interval
+        self._client = None
+        self._pid: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.creations = 0
+        self.create_seconds = 0.0
+        self.reuses = 0
+        self.fork_resets = 0
+        self.reconnects = 0
+        self.health_checks = 0
+        self.health_failures = 0
+
+    def _after_fork(self) -> None:
+        # 부모 프로세스에서 다른 스레드가 잡고 있던 잠금을 자식이 물려받지 않도록 새로 만든다
+        self._lock = threading.Lock()
+
+    def _create(self):
+        start = time.perf_counter()
+        client = self.factory()
+        self.create_seconds += time.perf_counter() - start
+        self.creations += 1
+        self._client = client
+        self._pid = os.getpid()
+        self._checked_at = time.monotonic()
+        return client
+
+    def get(self):
+        """현재 프로세스의 클라이언트 (없거나 fork 이후면 생성, 생성 실패는 예외 그대로)"""
+        with self._lock:
+            client = self._client
+            if client is None:
+                return self._create()
+            if self._pid != os.getpid():
+                self.fork_resets += 1
+                return self._create()
+            self.reuses += 1
+            check_due = self.health_interval > 0 and time.monotonic() - self._checked_at >= self.health_interval
+            if check_due:
+                # 한 스레드만 확인하도록 먼저 시각을 갱신 (다른 스레드는 기존 클라이언트를 계속 사용)
+                self.health_checks += 1
+                self._checked_at = time.monotonic()
+        if not check_due:
+            return client
+
+        # 상태 확인 RPC 는 잠금 밖에서 실행
+        try:
+            self.health_check(client)
+            return client
+        except Exception as e:
+            print(f"[데이터스토어] 클라이언트 상태 확인 실패 - 다시 연결: {e}")
+            with self._lock:
+                self.health_failures += 1
+                # 그사이 다른 스레드가 이미 바꿨으면 그 클라이언트를 사용
+                if self._client is not client or self._pid != os.getpid():
+                    return self._client if self._client is not None else self._create()
+                self.reconnects += 1
+                return self._create()
+
+    def report_error(self, error: BaseException) -> bool:
+        """호출 중 발생한 오류 보고 -> 연결 오류면 클라이언트를 버리고 True (다음 get 에서 다시 생성)"""
+        if not is_connection_error(error):
+            return False
+        with self._lock:
+            if self._client is not None:
+                self._client = None
+                self.reconnects += 1
+        print(f"[데이터스토어] 연결 오류 - 다음 요청에서 클라이언트를 다시 만듭니다: {error}")
+        return True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._client = None
+            self._pid = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            avg_create_ms = self.create_seconds * 1000 / self.creations if self.creations else 0.0
+            return {
+                'connected': self._client is not None and self._pid == os.getpid(),
+                'creations': self.creations,
+                'reuses': self.reuses,
+                'avg_create_ms': round(avg_create_ms, 3),
+                # 재사용한 호출마다 생략된 클라이언트 생성 시간의 추정 합계
+                'saved_ms_estimate': round(avg_create_ms * self.reuses, 1),
+                'fork_resets': self.fork_resets,
+                'reconnects': self.reconnects,
+                'health_checks': self.health_checks,
+                'health_failures': self.health_failures,
+            }
+
+
+# 프로세스 전역 클라이언트 캐시 (클라이언트 자체는 첫 get() 에서 생성)
+_client_cache = DatastoreClientCache()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_client_cache._after_fork)
+
+
+def get_client_cache() -> DatastoreClientCache:
+    return _client_cache
@@ -3,9 +3,22 @@ Google Cloud Datastore를 사용한 패스 영구 저장
 """
 import os
 import json
-from typing import List, Dict, Optional, Any
-from datetime import datetime, timezone, timedelta
+from typing import List, Dict, Optional, Any, Tuple
+from datetime import datetime, timezone
 from models import Pass, Store, Benefit, UserPrefs, PassType, Theme
+from pass_cache import invalidate_pass
+from pass_codec import compact_pass_data
+from pass_summary import canonical_timestamp, project_pass_summary, summary_list_entry
+from pass_blob import decode_pass_blob, encode_pass_blob
+from datastore_client import get_client_cache
+
+# 엔티티에 저장하는 목록 요약 속성 버전 (없으면 요약 도입 전 엔티티)
+SUMMARY_VERSION = 1
+
+# 만료 패스 콜드 아카이브 종류 (본문 Blob 과 조회용 최소 속성만 저장)
+ARCHIVE_KIND = 'JemulpogoPassArchive'
+# put_multi / delete_multi 한 번에 보낼 수 있는 최대 엔티티 수
+DATASTORE_BATCH_LIMIT = 500
 
 def is_production_environment():
     """프로덕션 환경 감지"""
@@ -16,11 +29,10 @@ def is_production_environment():
     )
 
 def get_datastore_client():
-    """Google Cloud Datastore 클라이언트 가져오기"""
+    """Google Cloud Datastore 클라이언트 가져오기 (프로세스별로 한 번 만들어 재사용, datastore_client 참고)"""
     try:
         if is_production_environment():
-            from google.cloud import datastore
-            return datastore.Client()
+            return get_client_cache().get()
         else:
             print("[데이터스토어] 로컬 환경 - Datastore 사용하지 않음")
             return None
@@ -31,59 +43,81 @@ def get_datastore_client():
         print(f"[데이터스토어] 클라이언트 생성 실패: {e}")
         return None
 
+def _pass_entity(client, pass_obj: Pass, user_email: str):
+    """Pass -> JemulpogoPass 엔티티"""
+    from google.cloud import datastore
+    
+    # 패스 데이터를 직렬화 가능한 형태로 변환
+    pass_data = {
+        'pass_id': pass_obj.pass_id,
+        'pass_type': pass_obj.pass_type.value,
+        'theme': pass_obj.theme.value,
+        'stores': [store.__dict__ for store in pass_obj.stores],
+        'benefits': [benefit.__dict__ for benefit in pass_obj.benefits],
+        'created_at': pass_obj.created_at,
+        'user_prefs': pass_obj.user_prefs.__dict__,
+        'user_email': user_email,
+        'saved_at': datetime.now(timezone.utc).isoformat()
+    }
+    
+    # Datastore 엔티티 생성
+    key = client.key('JemulpogoPass', pass_obj.pass_id)
+    entity = datastore.Entity(key=key, exclude_from_indexes=('pass_data_blob',))
+    
+    # 카탈로그 참조형 JSON을 압축 봉투(pass_blob)로 저장
+    pass_data_blob = encode_pass_blob(compact_pass_data(pass_data))
+    
+    # 엔티티 크기 확인 (안전성)
+    if len(pass_data_blob) > 1000000:  # 1MB 제한
+        print(f"[데이터스토어] 경고: 패스 데이터가 매우 큼 ({len(pass_data_blob)} 바이트)")
+    
+    # 목록 조회용 요약 (저장 시 한 번 계산, 목록은 본문을 읽지 않음)
+    summary = project_pass_summary(pass_data, user_email)
+    
+    entity.update({
+        'user_email': user_email,
+        'pass_data_blob': pass_data_blob,  # Blob으로 저장
+        'created_at': datetime.fromisoformat(pass_obj.created_at.replace('Z', '+00:00')) if isinstance(pass_obj.created_at, str) else pass_obj.created_at,
+        'saved_at': datetime.now(timezone.utc),
+        'pass_id': pass_obj.pass_id,
+        'pass_type': pass_obj.pass_type.value,
+        'theme': pass_obj.theme.value,
+        'summary_version': SUMMARY_VERSION,
+        'name': summary['name'],
+        'theme_name': summary['theme_name'],
+        'pass_type_name': summary['pass_type_name'],
+        'valid_until': datetime.fromisoformat(summary['valid_until']) if summary['valid_until'] else None,
+        'total_price': summary['total_price'],
+        'store_count': summary['store_count'],
+        'benefits_count': summary['benefits_count']
+    })
+    return entity
+
 def save_pass_to_datastore(pass_obj: Pass, user_email: str) -> bool:
     """패스를 Google Cloud Datastore에 저장"""
+    return save_passes_to_datastore([(pass_obj, user_email)])
+
+def save_passes_to_datastore(items: List[Tuple[Pass, str]]) -> bool:
+    """여러 패스를 put_multi 한 번으로 저장 (write-behind 묶음 저장용, 전부 성공해야 True)"""
     try:
         client = get_datastore_client()
         if not client:
             print("[데이터스토어] 클라이언트 없음 - 저장 건너뜀")
             return False
+        if not items:
+            return True
         
-        print(f"[데이터스토어] 패스 저장 시작: {pass_obj.pass_id}")
-        
-        # 패스 데이터를 직렬화 가능한 형태로 변환
-        pass_data = {
-            'pass_id': pass_obj.pass_id,
-            'pass_type': pass_obj.pass_type.value,
-            'theme': pass_obj.theme.value,
-            'stores': [store.__dict__ for store in pass_obj.stores],
-            'benefits': [benefit.__dict__ for benefit in pass_obj.benefits],
-            'created_at': pass_obj.created_at,
-            'user_prefs': pass_obj.user_prefs.__dict__,
-            'user_email': user_email,
-            'saved_at': datetime.now(timezone.utc).isoformat()
-        }
+        print(f"[데이터스토어] 패스 저장 시작: {', '.join(pass_obj.pass_id for pass_obj, _ in items)}")
         
-        # Datastore 엔티티 생성
-        key = client.key('JemulpogoPass', pass_obj.pass_id)
-        from google.cloud import datastore
-        entity = datastore.Entity(key=key)
-        
-        # JSON을 Blob으로 저장 (크기 제한 없음)
-        pass_data_json = json.dumps(pass_data, ensure_ascii=False)
-        
-        # JSON 크기 확인 (안전성)
-        json_size = len(pass_data_json.encode('utf-8'))
-        if json_size > 1000000:  # 1MB 제한
-            print(f"[데이터스토어] 경고: 패스 데이터가 매우 큼 ({json_size} 바이트)")
-        
-        entity.update({
-            'user_email': user_email,
-            'pass_data_blob': pass_data_json.encode('utf-8'),  # Blob으로 저장
-            'created_at': datetime.fromisoformat(pass_obj.created_at.replace('Z', '+00:00')) if isinstance(pass_obj.created_at, str) else pass_obj.created_at,
-            'saved_at': datetime.now(timezone.utc),
-            'pass_id': pass_obj.pass_id,
-            'pass_type': pass_obj.pass_type.value,
-            'theme': pass_obj.theme.value
-        })
-        
-        # 저장
-        client.put(entity)
-        print(f"[데이터스토어] 패스 저장 완료: {pass_obj.pass_id}")
+        client.put_multi([_pass_entity(client, pass_obj, user_email) for pass_obj, user_email in items])
+        for pass_obj, _ in items:
+            invalidate_pass(pass_obj.pass_id)
+        print(f"[데이터스토어] 패스 {len(items)}개 저장 완료")
         return True
         
     except Exception as e:
         print(f"[데이터스토어] 패스 저장 실패: {e}")
+        get_client_cache().report_error(e)
         import traceback
         traceback.print_exc()
         return False
@@ -109,10 +143,10 @@ def load_pass_from_datastore(pass_id: str) -> Optional[Pass]:
         # Blob 데이터 파싱
         pass_data_blob = entity.get('pass_data_blob')
         if pass_data_blob:
-            # 새 방식 (Blob)
+            # 새 방식 (Blob - 압축 봉투 또는 이전 JSON 바이트)
             try:
-                pass_data = json.loads(pass_data_blob.decode('utf-8'))
-            except (json.JSONDecodeError, UnicodeDecodeError) as decode_error:
+                pass_data = decode_pass_blob(bytes(pass_data_blob))
+            except Exception as decode_error:
                 print(f"[데이터스토어] Blob 데이터 파싱 실패: {decode_error}")
                 return None
         else:
@@ -144,10 +178,189 @@ def load_pass_from_datastore(pass_id: str) -> Optional[Pass]:
         
     except Exception as e:
         print(f"[데이터스토어] 패스 로드 실패: {e}")
+        get_client_cache().report_error(e)
         import traceback
         traceback.print_exc()
         return None
 
+def _entity_pass_data(entity) -> Optional[Dict[str, Any]]:
+    """엔티티 본문 -> 패스 딕셔너리 (Blob 또는 이전 JSON 문자열)"""
+    pass_data_blob = entity.get('pass_data_blob')
+    if pass_data_blob:
+        return decode_pass_blob(bytes(pass_data_blob))
+    return json.loads(entity.get('pass_data_json', '{}')) or None
+
+def archive_expired_passes_in_datastore(created_before: datetime, archive_month_for,
+                                        limit: int = DATASTORE_BATCH_LIMIT) -> int:
+    """
+    created_before 이전에 생성된(만료된) JemulpogoPass 를 콜드 아카이브 종류로 옮김 -> 옮긴 수
+    아카이브 엔티티를 먼저 쓰고 원본을 지우므로 중간에 실패해도 패스를 잃지 않습니다.
+    archive_month_for(pass_id, created_at) 는 아카이브 월 'YYYY-MM' 을 돌려줍니다.
+    """
+    try:
+        client = get_datastore_client()
+        if not client:
+            return 0
+        from google.cloud import datastore
+        
+        query = client.query(kind='JemulpogoPass')
+        query.add_filter('created_at', '<', created_before)
+        entities = list(query.fetch(limit=min(limit, DATASTORE_BATCH_LIMIT)))
+        if not entities:
+            return 0
+        
+        archives = []
+        for entity in entities:
+            pass_id = entity.key.name
+            try:
+                pass_data = _entity_pass_data(entity)
+            except Exception as decode_error:
+                print(f"[데이터스토어] 아카이브 건너뜀 ({pass_id}): {decode_error}")
+                continue
+            if not pass_data:
+                continue
+            created_at = _entity_datetime_str(entity.get('created_at'))
+            archive = datastore.Entity(key=client.key(ARCHIVE_KIND, pass_id), exclude_from_indexes=('pass_data_blob',))
+            archive.update({
+                'pass_id': pass_id,
+                'user_email': entity.get('user_email'),
+                'created_at': entity.get('created_at'),
+                'archive_month': archive_month_for(pass_id, created_at),
+                'archived_at': datetime.now(timezone.utc),
+                'pass_data_blob': encode_pass_blob(compact_pass_data(pass_data)),
+            })
+            archives.append(archive)
+        if not archives:
+            return 0
+        
+        client.put_multi(archives)
+        client.delete_multi([client.key('JemulpogoPass', archive.key.name) for archive in archives])
+        for archive in archives:
+            invalidate_pass(archive.key.name)
+        print(f"[데이터스토어] 만료 패스 {len(archives)}개 아카이브")
+        return len(archives)
+        
+    except Exception as e:
+        print(f"[데이터스토어] 만료 패스 아카이브 실패: {e}")
+        get_client_cache().report_error(e)
+        return 0
+
+def load_archived_pass_from_datastore(pass_id: str) -> Optional[Dict[str, Any]]:
+    """콜드 아카이브 종류에서 패스 딕셔너리 조회 (없으면 None)"""
+    try:
+        client = get_datastore_client()
+        if not client:
+            return None
+        entity = client.get(client.key(ARCHIVE_KIND, pass_id))
+        return _entity_pass_data(entity) if entity else None
+    except Exception as e:
+        print(f"[데이터스토어] 아카이브 패스 조회 실패: {e}")
+        get_client_cache().report_error(e)
+        return None
+
+def _passes_from_entities(entities) -> List[Pass]:
+    """엔티티 목록 -> Pass 목록 (본문을 이미 받은 엔티티에서 바로 복원, 실패한 항목은 건너뜀)"""
+    from services import _create_pass_from_data
+    passes = []
+    for entity in entities:
+        pass_id = entity.key.name if entity.key is not None else entity.get('pass_id')
+        try:
+            pass_data = _entity_pass_data(entity)
+            pass_obj = _create_pass_from_data(pass_data) if pass_data else None
+        except Exception as create_error:
+            print(f"[데이터스토어] 패스 복원 실패 ({pass_id}): {create_error}")
+            continue
+        if pass_obj:
+            passes.append(pass_obj)
+    return passes
+
+def load_passes_from_datastore(pass_ids: List[str]) -> Dict[str, Pass]:
+    """
+    여러 패스를 get_multi 로 한 번에 로드 -> {pass_id: Pass} (없는 ID 는 빠짐)
+    DATASTORE_BATCH_LIMIT 개씩 나눠 요청하므로 그 이하이면 왕복 한 번입니다.
+    """
+    try:
+        client = get_datastore_client()
+        if not client:
+            return {}
+        pass_ids = list(dict.fromkeys(pass_id for pass_id in pass_ids if pass_id))
+        entities = []
+        for i in range(0, len(pass_ids), DATASTORE_BATCH_LIMIT):
+            keys = [client.key('JemulpogoPass', pass_id) for pass_id in pass_ids[i:i + DATASTORE_BATCH_LIMIT]]
+            entities.extend(client.get_multi(keys))
+        passes = {pass_obj.pass_id: pass_obj for pass_obj in _passes_from_entities(entities)}
+        print(f"[데이터스토어] 패스 일괄 로드: {len(passes)}/{len(pass_ids)}개")
+        return passes
+        
+    except Exception as e:
+        print(f"[데이터스토어] 패스 일괄 로드 실패: {e}")
+        get_client_cache().report_error(e)
+        return {}
+
+def load_user_passes_from_datastore(user_email: str) -> List[Pass]:
+    """사용자의 모든 패스를 쿼리 한 번으로 받아 Pass 목록으로 복원 (패스별 추가 조회 없음)"""
+    try:
+        client = get_datastore_client()
+        if not client:
+            return []
+        query = client.query(kind='JemulpogoPass')
+        query.add_filter('user_email', '=', user_email)
+        passes = _passes_from_entities(query.fetch())
+        print(f"[데이터스토어] 사용자 패스 {len(passes)}개 복원 ({user_email})")
+        return passes
+        
+    except Exception as e:
+        print(f"[데이터스토어] 사용자 패스 복원 실패: {e}")
+        get_client_cache().report_error(e)
+        return []
+
+def _entity_datetime_str(value: Any) -> str:
+    """엔티티 시각 -> 패스 요약에 저장되는 것과 같은 시간대 없는 ISO 문자열
+    (Datastore 는 저장한 시간대 없는 시각을 UTC 로 돌려주므로 UTC 기준으로 시간대를 뗀다)"""
+    if isinstance(value, datetime):
+        return canonical_timestamp(value)
+    return str(value or '')
+
+def _pass_entry_from_entity(entity) -> Optional[Dict[str, Any]]:
+    """JemulpogoPass 엔티티 -> 패스 목록 항목 (파싱할 수 없으면 None)"""
+    # 저장 시 계산된 요약 속성이 있으면 패스 본문을 읽지 않음
+    if entity.get('summary_version'):
+        return summary_list_entry({
+            'pass_id': entity.get('pass_id'),
+            'name': entity.get('name'),
+            'theme_name': entity.get('theme_name'),
+            'pass_type_name': entity.get('pass_type_name'),
+            'created_at': _entity_datetime_str(entity.get('created_at')),
+            'valid_until': _entity_datetime_str(entity.get('valid_until')),
+            'total_price': entity.get('total_price'),
+            'store_count': entity.get('store_count', 0),
+            'benefits_count': entity.get('benefits_count', 0),
+        }, 'datastore')
+    
+    # 요약 속성 도입 전 엔티티: Blob 데이터 파싱 (안전하게)
+    pass_data_blob = entity.get('pass_data_blob')
+    if pass_data_blob:
+        # 새 방식 (Blob - 압축 봉투 또는 이전 JSON 바이트)
+        try:
+            pass_data = decode_pass_blob(bytes(pass_data_blob))
+        except Exception as decode_error:
+            print(f"[데이터스토어] 패스 데이터 파싱 실패: {decode_error}")
+            return None
+    else:
+        # 이전 방식 (JSON 문자열) - 하위 호환성
+        try:
+            pass_data_json = entity.get('pass_data_json', '{}')
+            pass_data = json.loads(pass_data_json)
+        except json.JSONDecodeError as json_error:
+            print(f"[데이터스토어] JSON 문자열 파싱 실패: {json_error}")
+            return None
+    
+    if not pass_data or not pass_data.get('pass_id'):
+        print("[데이터스토어] 유효하지 않은 패스 데이터, 건너뛰기")
+        return None
+    
+    return summary_list_entry(project_pass_summary(pass_data), 'datastore')
+
 def get_user_passes_from_datastore(user_email: str) -> List[Dict[str, Any]]:
     """사용자의 모든 패스를 Google Cloud Datastore에서 조회"""
     try:
@@ -163,91 +376,12 @@ def get_user_passes_from_datastore(user_email: str) -> List[Dict[str, Any]]:
         query.add_filter('user_email', '=', user_email)
         
         passes = []
-        theme_names = {
-            'food': '맛집', 'culture': '문화', 'shopping': '쇼핑',
-            'entertainment': '오락', 'seafood': '해산물', 'cafe': '카페',
-            'traditional': '전통', 'retro': '레트로', 'quiet': '조용함'
-        }
-        
-        pass_type_names = {
-            'light': '라이트', 'premium': '프리미엄', 'citizen': '시민'
-        }
-        
-        pass_type_prices = {
-            'light': 7900, 'premium': 14900, 'citizen': 6900
-        }
-        
         for entity in query.fetch():
             try:
-                # Blob 데이터 파싱 (안전하게)
-                pass_data_blob = entity.get('pass_data_blob')
-                if pass_data_blob:
-                    # 새 방식 (Blob)
-                    try:
-                        pass_data = json.loads(pass_data_blob.decode('utf-8'))
-                    except (json.JSONDecodeError, UnicodeDecodeError) as decode_error:
-                        print(f"[데이터스토어] 패스 데이터 파싱 실패: {decode_error}")
-                        continue
-                else:
-                    # 이전 방식 (JSON 문자열) - 하위 호환성
-                    try:
-                        pass_data_json = entity.get('pass_data_json', '{}')
-                        pass_data = json.loads(pass_data_json)
-                    except json.JSONDecodeError as json_error:
-                        print(f"[데이터스토어] JSON 문자열 파싱 실패: {json_error}")
-                        continue
-                
-                if not pass_data or not pass_data.get('pass_id'):
-                    print("[데이터스토어] 유효하지 않은 패스 데이터, 건너뛰기")
-                    continue
-                
-                theme_name = theme_names.get(pass_data.get('theme', '').lower(), pass_data.get('theme', '테마'))
-                pass_type_name = pass_type_names.get(pass_data.get('pass_type', '').lower(), pass_data.get('pass_type', '타입'))
-                pass_name = f"{theme_name} {pass_type_name} 패스"
-                
-                # 유효기간 계산 (안전하게)
-                created_at = pass_data.get('created_at', datetime.now().isoformat())
-                if isinstance(created_at, str):
-                    try:
-                        created_date = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    except (ValueError, TypeError) as date_error:
-                        print(f"[데이터스토어] 날짜 파싱 실패: {date_error}, 현재 시간 사용")
-                        created_date = datetime.now()
-                else:
-                    created_date = created_at if created_at else datetime.now()
-                    
-                # 유효기간은 30일
-                try:
-                    valid_until = created_date + timedelta(days=30)
-                except TypeError:
-                    print("[데이터스토어] 유효기간 계산 실패, 기본값 사용")
-                    valid_until = datetime.now() + timedelta(days=30)
-                
-                # 패스 상태 결정
-                now = datetime.now(timezone.utc) if created_date.tzinfo else datetime.now()
-                status = 'expired' if now > valid_until else 'active'
-                
-                total_price = pass_type_prices.get(pass_data.get('pass_type', '').lower(), 7900)
-                stores = pass_data.get('stores', [])
-                benefits = pass_data.get('benefits', [])
-                
-                passes.append({
-                    'pass_id': pass_data.get('pass_id'),
-                    'name': pass_name,
-                    'pass_type': pass_type_name,
-                    'theme': theme_name,
-                    'created_at': created_at,
-                    'valid_until': valid_until.isoformat(),
-                    'status': status,
-                    'total_places': len(stores),
-                    'visited_places': 0,
-                    'total_price': total_price,
-                    'store_count': len(stores),
-                    'benefits_count': len(benefits),
-                    'source': 'datastore'  # 출처 표시
-                })
-                
-                print(f"[데이터스토어] 패스 추가: {pass_data.get('pass_id')}")
+                entry = _pass_entry_from_entity(entity)
+                if entry:
+                    passes.append(entry)
+                    print(f"[데이터스토어] 패스 추가: {entry['pass_id']}")
                 
             except Exception as pass_error:
                 print(f"[데이터스토어] 패스 처리 오류: {pass_error}")
@@ -258,10 +392,61 @@ def get_user_passes_from_datastore(user_email: str) -> List[Dict[str, Any]]:
         
     except Exception as e:
         print(f"[데이터스토어] 사용자 패스 조회 실패: {e}")
+        get_client_cache().report_error(e)
         import traceback
         traceback.print_exc()
         return []
 
+def get_user_passes_page_from_datastore(user_email: str, limit: int,
+                                        before: Optional[Tuple[str, str]] = None) -> List[Dict[str, Any]]:
+    """
+    사용자 패스를 created_at 최신순으로 limit 개까지 조회 (키셋 페이지네이션)
+    before=(created_at, pass_id) 이면 그 항목보다 오래된 패스만 반환합니다.
+    user_email + created_at 내림차순 복합 인덱스가 필요합니다 (index.yaml).
+    """
+    try:
+        client = get_datastore_client()
+        if not client:
+            return []
+        
+        query = client.query(kind='JemulpogoPass')
+        query.add_filter('user_email', '=', user_email)
+        if before:
+            # 커서 시각은 시간대 없는 UTC 기준 (canonical_timestamp) - 저장할 때와 같이 UTC 로 비교
+            before_date = datetime.fromisoformat(before[0]).replace(tzinfo=timezone.utc)
+            query.add_filter('created_at', '<=', before_date)
+        query.order = ['-created_at']
+        
+        passes = []
+        # 커서와 같은 시각의 이미 반환한 항목은 건너뛰므로, 남은 항목이 limit 개가 될 때까지
+        # Datastore 쿼리 커서로 다음 배치를 이어서 가져옴 (같은 시각 패스가 많아도 페이지가 짧아지지 않음)
+        batch_size = limit + 5
+        start_cursor = None
+        while len(passes) < limit:
+            iterator = query.fetch(limit=batch_size, start_cursor=start_cursor)
+            fetched = 0
+            for entity in next(iterator.pages, []):
+                fetched += 1
+                entry = _pass_entry_from_entity(entity)
+                if not entry:
+                    continue
+                if before and (canonical_timestamp(entry['created_at']), entry['pass_id']) >= before:
+                    continue
+                passes.append(entry)
+                if len(passes) >= limit:
+                    break
+            start_cursor = iterator.next_page_token
+            if fetched < batch_size or not start_cursor:
+                break
+        
+        print(f"[데이터스토어] 페이지 조회: {len(passes)}개 ({user_email})")
+        return passes
+        
+    except Exception as e:
+        print(f"[데이터스토어] 사용자 패스 페이지 조회 실패: {e}")
+        get_client_cache().report_error(e)
+        return []
+
 def delete_pass_from_datastore(pass_id: str) -> bool:
     """Google Cloud Datastore에서 패스 삭제"""
     try:
@@ -271,9 +456,11 @@ def delete_pass_from_datastore(pass_id: str) -> bool:
         
         key = client.key('JemulpogoPass', pass_id)
         client.delete(key)
+        invalidate_pass(pass_id)
         print(f"[데이터스토어] 패스 삭제 완료: {pass_id}")
         return True
         
     except Exception as e:
         print(f"[데이터스토어] 패스 삭제 실패: {e}")
+        get_client_cache().report_error(e)
         return False
@@ -0,0 +1,83 @@
+"""
+미리 직렬화/압축해 두는 HTTP 응답 페이로드
+카탈로그 버전당 한 번만 만들고 조건부 GET(ETag/Last-Modified)을 처리합니다.
+"""
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+@dataclass(frozen=True)
+class PrecompressedPayload:
+    """identity/gzip/br 인코딩별 본문과 검증자(ETag, Last-Modified)"""
+    body: bytes
+    etag: str
+    last_modified: datetime
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+    mimetype: str = 'application/json'
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """인코딩별로 다른 강한 ETag (본문 바이트가 다르므로)"""
+        return self.etag if not encoding else f"{self.etag}-{encoding}"
+
+    def all_etags(self):
+        return [self.etag] + [self.etag_for(enc) for enc in self.encoded]
+
+    def choose_encoding(self, accept_encoding) -> Optional[str]:
+        """Accept-Encoding 기준으로 br > gzip > identity 순 선택"""
+        for encoding in ('br', 'gzip'):
+            if encoding in self.encoded and accept_encoding[encoding]:
+                return encoding
+        return None
+
+
+def build_json_payload(data: Any, last_modified: datetime) -> PrecompressedPayload:
+    """JSON 본문을 직렬화하고 gzip/brotli 변형을 미리 만들어 둔다"""
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    encoded = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoded['br'] = brotli.compress(body, quality=11)
+    etag = hashlib.sha1(body).hexdigest()[:20]
+    return PrecompressedPayload(
+        body=body,
+        etag=etag,
+        last_modified=last_modified.astimezone(timezone.utc).replace(microsecond=0),
+        encoded=encoded,
+    )
+
+
+def is_not_modified(payload: PrecompressedPayload, request) -> bool:
+    """조건부 요청의 검증자(If-None-Match 우선, 없으면 If-Modified-Since)가 페이로드와 일치하는지"""
+    if request.if_none_match:
+        return any(request.if_none_match.contains(tag) for tag in payload.all_etags())
+    if request.if_modified_since:
+        return payload.last_modified <= request.if_modified_since
+    return False
+
+
+def make_payload_response(payload: PrecompressedPayload, request, cache_control: str = 'no-cache'):
+    """조건부 요청이면 304, 아니면 클라이언트가 받을 수 있는 압축 본문으로 응답"""
+    from flask import Response
+
+    not_modified = is_not_modified(payload, request)
+    encoding = payload.choose_encoding(request.accept_encodings)
+    if not_modified:
+        response = Response(status=304)
+    else:
+        response = Response(payload.encoded[encoding] if encoding else payload.body,
+                            mimetype=payload.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+
+    response.set_etag(payload.etag_for(encoding))
+    response.last_modified = payload.last_modified
+    response.headers['Cache-Control'] = cache_control
+    response.vary.add('Accept-Encoding')
+    return response
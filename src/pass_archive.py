@@ -0,0 +1,259 @@
+"""
+만료 패스 콜드 아카이브
+유효기간(생성 후 30일)이 지난 패스를 storage/saved_passes 에서 월별 아카이브 파일로 옮겨
+핫 저장소에는 유효한 패스만 남깁니다.
+
+    storage/pass_archive/passes-YYYY-MM.zip   (생성 월 기준, 항목: pass_<id>.jpass)
+
+항목은 이미 압축된 봉투(pass_blob)이므로 ZIP 안에서는 다시 압축하지 않으며,
+ZIP 중앙 디렉토리로 ID 하나만 바로 꺼내 읽을 수 있습니다.
+아카이브는 복사본에 추가한 뒤 교체하므로 읽는 쪽은 항상 완전한 파일을 봅니다.
+프로덕션에서는 만료된 Datastore 엔티티도 콜드 아카이브 종류(JemulpogoPassArchive)로 옮깁니다.
+"""
+import os
+import shutil
+import sqlite3
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from pass_blob import decode_pass_blob, encode_pass_blob
+from pass_cache import invalidate_pass
+from pass_codec import compact_pass_data
+from pass_index import get_pass_index
+from pass_storage import (SAVED_PASSES_DIR, iter_pass_files, pass_date, pass_filename,
+                          pass_id_from_filename, read_pass_file)
+from pass_summary import PASS_VALID_DAYS, project_pass_summary
+from storage_paths import storage_dir
+
+PASS_ARCHIVE_DIR = os.path.join(storage_dir(), 'pass_archive')
+ARCHIVE_LOCK_FILENAME = '.sweep.lock'
+# 한 번의 정리에서 옮길 최대 패스 수 (cron 요청 시간 제한 안에서 끝나도록)
+SWEEP_BATCH_LIMIT = int(os.getenv('PASS_SWEEP_BATCH_LIMIT', '500'))
+
+
+def archive_month_for(pass_id: str, created_at: str = '') -> str:
+    """패스 -> 아카이브 월 'YYYY-MM' (pass_id 의 생성 날짜 -> created_at 순, 둘 다 없으면 'unknown')"""
+    date = pass_date(pass_id)
+    if date:
+        return f"{date[:4]}-{date[4:6]}"
+    if len(created_at) >= 7 and created_at[4] == '-':
+        return created_at[:7]
+    return 'unknown'
+
+
+def archive_path(month: str, archive_dir: str = PASS_ARCHIVE_DIR) -> str:
+    return os.path.join(archive_dir, f"passes-{month}.zip")
+
+
+def read_archived_pass(pass_id: str, month: str, archive_dir: str = PASS_ARCHIVE_DIR) -> Optional[Dict[str, Any]]:
+    """월별 아카이브에서 패스 딕셔너리 읽기 (없으면 None)"""
+    path = archive_path(month, archive_dir)
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return decode_pass_blob(archive.read(pass_filename(pass_id)))
+    except (FileNotFoundError, KeyError):
+        return None
+
+
+def write_archive_entries(month: str, entries: Dict[str, bytes], archive_dir: str = PASS_ARCHIVE_DIR) -> int:
+    """
+    월별 아카이브에 {pass_id: 봉투 바이트} 추가 -> 새로 추가한 수
+    이미 들어 있는 ID 는 건너뜁니다 (이전 정리가 핫 파일 삭제 전에 중단된 경우).
+    호출하는 쪽이 정리 잠금을 잡고 있어야 합니다.
+    """
+    path = archive_path(month, archive_dir)
+    os.makedirs(archive_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(path):
+        shutil.copyfile(path, tmp_path)
+    added = 0
+    with zipfile.ZipFile(tmp_path, 'a', compression=zipfile.ZIP_STORED) as archive:
+        existing = set(archive.namelist())
+        for pass_id, blob in entries.items():
+            name = pass_filename(pass_id)
+            if name in existing:
+                continue
+            archive.writestr(name, blob)
+            added += 1
+    os.replace(tmp_path, path)
+    return added
+
+
+def load_archived_pass_data(pass_id: str, archive_dir: str = PASS_ARCHIVE_DIR) -> Optional[Dict[str, Any]]:
+    """
+    아카이브된 패스 조회 (요청 시 복원용)
+    인덱스에 기록된 아카이브 월 -> pass_id 로 계산한 월 순으로 파일을 찾고, 프로덕션에서는 Datastore 아카이브도 확인합니다.
+    """
+    months = []
+    try:
+        recorded = get_pass_index().archived_month(pass_id)
+        if recorded:
+            months.append(recorded)
+    except Exception as e:
+        print(f"[패스 아카이브] 인덱스 조회 실패: {e}")
+    guessed = archive_month_for(pass_id)
+    if guessed not in months:
+        months.append(guessed)
+    for month in months:
+        pass_data = read_archived_pass(pass_id, month, archive_dir)
+        if pass_data:
+            return pass_data
+
+    from datastore_service import is_production_environment, load_archived_pass_from_datastore
+    if is_production_environment():
+        return load_archived_pass_from_datastore(pass_id)
+    return None
+
+
+def _local_naive(moment: datetime) -> datetime:
+    """시간대 있는 시각 -> 서버 현지 시각(시간대 없음), 패스 created_at/valid_until 과 같은 기준"""
+    return moment.astimezone().replace(tzinfo=None) if moment.tzinfo is not None else moment
+
+
+def _expired_cutoff(now: datetime) -> datetime:
+    """이 시각 이전에 생성된 패스는 now 기준으로 만료"""
+    return now - timedelta(days=PASS_VALID_DAYS)
+
+
+def _is_expired(valid_until: str, now: datetime) -> bool:
+    """유효기간이 now(현지 시각, 시간대 없음)보다 이전인지 (유효기간을 모르면 만료 아님)"""
+    try:
+        valid_until_date = datetime.fromisoformat(valid_until)
+    except (ValueError, TypeError):
+        return False
+    return _local_naive(valid_until_date) < now
+
+
+@contextmanager
+def _sweep_lock(archive_dir: str) -> Iterator[bool]:
+    """정리 잠금 (다른 프로세스가 잡고 있으면 False, POSIX fcntl / Windows msvcrt)"""
+    os.makedirs(archive_dir, exist_ok=True)
+    with open(os.path.join(archive_dir, ARCHIVE_LOCK_FILENAME), 'a+') as lock_file:
+        try:
+            import fcntl
+        except ImportError:
+            import msvcrt
+            try:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            except OSError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            return
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _remove_empty_shards(paths: List[str], saved_passes_dir: str) -> None:
+    """파일을 옮긴 뒤 비게 된 날짜 샤드 디렉토리 정리 (saved_passes 자체는 남김)"""
+    base = os.path.abspath(saved_passes_dir)
+    for directory in sorted({os.path.abspath(os.path.dirname(path)) for path in paths}, reverse=True):
+        while directory != base and directory.startswith(base + os.sep):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                # 비어 있지 않거나 이미 지워짐
+                break
+            directory = os.path.dirname(directory)
+
+
+def _sweep_local_files(now: datetime, cutoff: datetime, limit: int, dry_run: bool, saved_passes_dir: str,
+                       archive_dir: str, result: Dict[str, Any]) -> None:
+    """로컬 패스 파일을 월별 아카이브로 옮기고 result 에 결과 기록 (다른 프로세스가 정리 중이면 skipped)"""
+    with _sweep_lock(archive_dir) as locked:
+        if not locked:
+            print("[패스 아카이브] 다른 프로세스가 정리 중 - 건너뜀")
+            result['skipped'] = True
+            return
+
+        # 월별로 모아 아카이브 파일은 월마다 한 번만 다시 쓴다
+        by_month: Dict[str, Dict[str, bytes]] = {}
+        paths: Dict[str, str] = {}
+        rows: List[Dict[str, Any]] = []
+        for path in iter_pass_files(saved_passes_dir, until=cutoff.strftime('%Y%m%d')):
+            if len(rows) >= limit:
+                break
+            try:
+                pass_data = read_pass_file(path)
+                summary = project_pass_summary(pass_data)
+            except Exception as e:
+                print(f"[패스 아카이브] 읽기 실패 - 건너뜀 ({os.path.basename(path)}): {e}")
+                continue
+            if not _is_expired(summary['valid_until'], now):
+                continue
+            pass_id = pass_id_from_filename(os.path.basename(path))
+            month = archive_month_for(pass_id, summary['created_at'])
+            by_month.setdefault(month, {})[pass_id] = encode_pass_blob(compact_pass_data(pass_data))
+            paths[pass_id] = path
+            rows.append({'pass_id': pass_id, 'archive_month': month,
+                         'user_email': summary['user_email'], 'created_at': summary['created_at']})
+
+        result['expired'] = len(rows)
+        result['months'] = sorted(by_month)
+        if dry_run:
+            return
+
+        for month, entries in sorted(by_month.items()):
+            write_archive_entries(month, entries, archive_dir)
+        # 아카이브를 쓴 뒤에만 핫 저장소에서 지운다
+        get_pass_index().mark_archived(rows, now.isoformat())
+        for pass_id, path in paths.items():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            invalidate_pass(pass_id)
+        _remove_empty_shards(list(paths.values()), saved_passes_dir)
+        result['archived'] = len(rows)
+
+
+def sweep_expired_passes(now: Optional[datetime] = None, limit: int = SWEEP_BATCH_LIMIT, dry_run: bool = False,
+                         saved_passes_dir: str = SAVED_PASSES_DIR,
+                         archive_dir: str = PASS_ARCHIVE_DIR) -> Dict[str, Any]:
+    """
+    만료된 패스를 월별 콜드 아카이브로 옮기고 핫 파일/인덱스/캐시를 정리 -> 처리 결과
+    만료 기준일 이전의 날짜 샤드만 열어 확인하며(날짜 형식이 아닌 _other 샤드는 대상 아님),
+    한 번에 limit 개까지 옮깁니다. 다른 프로세스가 정리 중이면 건너뜁니다.
+    로컬 파일 정리가 실패해도(저장소를 쓸 수 없는 경우 등) 프로덕션 Datastore 아카이브는 따로 진행하며
+    실패한 단계는 local_error / datastore_error 로 보고합니다.
+    """
+    # 패스 시각은 서버 현지 시각(시간대 없음)으로 저장되므로 같은 기준으로 비교
+    now = _local_naive(now) if now is not None else datetime.now()
+    cutoff = _expired_cutoff(now)
+    result: Dict[str, Any] = {'expired': 0, 'archived': 0, 'datastore_archived': 0, 'months': [],
+                              'dry_run': dry_run, 'skipped': False}
+
+    try:
+        _sweep_local_files(now, cutoff, limit, dry_run, saved_passes_dir, archive_dir, result)
+    except (OSError, sqlite3.Error, zipfile.BadZipFile) as e:
+        print(f"[패스 아카이브] 로컬 파일 정리 실패: {e}")
+        result['local_error'] = str(e)
+    if result['skipped'] or dry_run:
+        return result
+
+    from datastore_service import archive_expired_passes_in_datastore, is_production_environment
+    if is_production_environment():
+        try:
+            # Datastore 는 시간대 없는 created_at 을 그대로(UTC 로 간주해) 저장하므로 같은 시간대 없는 기준 시각을 넘긴다
+            result['datastore_archived'] = archive_expired_passes_in_datastore(cutoff, archive_month_for, limit)
+        except Exception as e:
+            print(f"[패스 아카이브] Datastore 아카이브 실패: {e}")
+            result['datastore_error'] = str(e)
+
+    print(f"[패스 아카이브] 만료 패스 {result['archived']}개 아카이브 (Datastore {result['datastore_archived']}개), "
+          f"월: {', '.join(result['months']) or '-'}")
+    return result
@@ -0,0 +1,79 @@
+"""
+패스 저장 바이트 형식 (버전 있는 압축 봉투)
+파일과 Datastore pass_data_blob 이 같은 형식을 사용합니다.
+
+    MAGIC(1바이트 0xA7) | 형식 버전(1바이트) | 압축 방식(1바이트: 0=없음, 1=zlib, 2=zstd) | 본문
+
+본문은 공백 없이 직렬화한 UTF-8 JSON 이며 zstandard 가 설치돼 있으면 zstd, 없으면 zlib 으로 압축합니다.
+MAGIC 으로 시작하지 않는 바이트는 이전 형식(압축하지 않은 JSON, 파일은 indent=2)으로 읽습니다.
+"""
+import json
+import zlib
+from typing import Any, Dict, Optional
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BLOB_MAGIC = 0xA7
+BLOB_VERSION = 1
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+HEADER_SIZE = 3
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 9
+# 이보다 작은 본문은 압축해도 이득이 없어 그대로 저장
+MIN_COMPRESS_SIZE = 128
+
+_CODEC_NAMES = {CODEC_NONE: 'none', CODEC_ZLIB: 'zlib', CODEC_ZSTD: 'zstd'}
+
+
+def default_codec() -> int:
+    return CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+
+
+def encode_pass_blob(pass_data: Dict[str, Any], codec: Optional[int] = None) -> bytes:
+    """패스 딕셔너리 -> 봉투 바이트"""
+    body = json.dumps(pass_data, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+    if codec is None:
+        codec = default_codec() if len(body) >= MIN_COMPRESS_SIZE else CODEC_NONE
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("zstandard 패키지가 설치되지 않았습니다.")
+        body = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    elif codec == CODEC_ZLIB:
+        body = zlib.compress(body, ZLIB_LEVEL)
+    elif codec != CODEC_NONE:
+        raise ValueError(f"알 수 없는 압축 방식: {codec}")
+    return bytes((BLOB_MAGIC, BLOB_VERSION, codec)) + body
+
+
+def is_pass_blob(data: bytes) -> bool:
+    return len(data) >= HEADER_SIZE and data[0] == BLOB_MAGIC
+
+
+def blob_codec_name(data: bytes) -> str:
+    """저장 형식 이름 (통계/디버그용)"""
+    if not is_pass_blob(data):
+        return 'legacy-json'
+    return f"v{data[1]}-{_CODEC_NAMES.get(data[2], 'unknown')}"
+
+
+def decode_pass_blob(data: bytes) -> Dict[str, Any]:
+    """봉투 또는 이전 형식(JSON) 바이트 -> 패스 딕셔너리 (형식 오류는 ValueError)"""
+    if not is_pass_blob(data):
+        return json.loads(data.decode('utf-8'))
+    version, codec = data[1], data[2]
+    if version != BLOB_VERSION:
+        raise ValueError(f"지원하지 않는 패스 형식 버전: {version}")
+    body = data[HEADER_SIZE:]
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("zstd 로 압축된 패스지만 zstandard 패키지가 설치되지 않았습니다.")
+        body = zstandard.ZstdDecompressor().decompress(body)
+    elif codec == CODEC_ZLIB:
+        body = zlib.decompress(body)
+    elif codec != CODEC_NONE:
+        raise ValueError(f"알 수 없는 압축 방식: {codec}")
+    return json.loads(body.decode('utf-8'))
@@ -0,0 +1,129 @@
+"""
+패스 조회 캐시 (프로세스별 LRU)
+load_pass_from_file 이 Datastore/세션/파일에서 읽어 복원한 Pass 객체를 보관합니다.
+개수, 대략적인 바이트 크기, TTL 세 가지로 제한하며 저장/삭제 시 해당 패스를 무효화합니다.
+패스는 생성 후 바뀌지 않으므로 TTL은 다른 워커에서 삭제된 패스를 정리하는 안전장치입니다.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from models import Pass
+
+PASS_CACHE_MAX_ENTRIES = int(os.getenv('PASS_CACHE_MAX_ENTRIES', '512'))
+PASS_CACHE_MAX_BYTES = int(os.getenv('PASS_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+PASS_CACHE_TTL = float(os.getenv('PASS_CACHE_TTL', '600'))
+
+
+def estimate_pass_size(pass_obj: Pass) -> int:
+    """Pass 의 대략적인 크기 (저장 파일과 같은 JSON 직렬화 바이트 수)"""
+    data = {
+        'pass_id': pass_obj.pass_id,
+        'stores': [store.__dict__ for store in pass_obj.stores],
+        'benefits': [benefit.__dict__ for benefit in pass_obj.benefits],
+        'created_at': pass_obj.created_at,
+        'user_prefs': pass_obj.user_prefs.__dict__,
+    }
+    return len(json.dumps(data, ensure_ascii=False, default=str).encode('utf-8'))
+
+
+class PassCache:
+    """
+    개수/바이트/TTL 제한 LRU 캐시 (스레드 안전)
+    반환되는 Pass 는 캐시와 공유되는 객체이므로 호출하는 쪽에서 수정하지 않아야 합니다.
+    """
+
+    def __init__(self, max_entries: int = PASS_CACHE_MAX_ENTRIES, max_bytes: int = PASS_CACHE_MAX_BYTES,
+                 ttl: float = PASS_CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, Tuple[Pass, int, float]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _pop(self, pass_id: str) -> None:
+        _, size, _ = self._entries.pop(pass_id)
+        self._bytes -= size
+
+    def get(self, pass_id: str) -> Optional[Pass]:
+        with self._lock:
+            entry = self._entries.get(pass_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            pass_obj, _, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._pop(pass_id)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(pass_id)
+            self.hits += 1
+            return pass_obj
+
+    def put(self, pass_id: str, pass_obj: Pass) -> None:
+        if self.max_entries <= 0:
+            return
+        size = estimate_pass_size(pass_obj)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if pass_id in self._entries:
+                self._pop(pass_id)
+            self._entries[pass_id] = (pass_obj, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            # 가장 오래 사용되지 않은 항목부터 제거
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, pass_id: str) -> None:
+        """저장/삭제된 패스를 캐시에서 제거"""
+        with self._lock:
+            if pass_id in self._entries:
+                self._pop(pass_id)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+
+# 프로세스 전역 캐시 인스턴스
+_pass_cache = PassCache()
+
+
+def get_pass_cache() -> PassCache:
+    return _pass_cache
+
+
+def invalidate_pass(pass_id: str) -> None:
+    """패스 저장/삭제 시 호출"""
+    _pass_cache.invalidate(pass_id)
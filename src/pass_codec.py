@@ -0,0 +1,130 @@
+"""
+패스 저장 형식 (카탈로그 참조형)
+패스의 상점/혜택은 대부분 카탈로그 항목을 그대로 복사한 것이므로, 저장할 때는
+상점 ID / 혜택 특수코드와 카탈로그와 달라진 필드만 기록하고 로드할 때 메모리 카탈로그로 복원합니다.
+파일, Datastore pass_data_blob, 세션이 모두 같은 형식을 사용하며
+'format' 키가 없는 이전(전체 내장) 형식도 그대로 읽습니다.
+
+카탈로그가 바뀌어도(상점 삭제, 혜택 설명 수정으로 코드 변경) 패스를 알아볼 수 있도록
+참조마다 표시용 텍스트(상점 이름 / 혜택 상점 ID, 종류, 설명)를 함께 기록하고 조회에 실패하면 그 값으로 복원합니다.
+
+    {"format": "compact-2", "pass_id": ...,
+     "store_refs": [{"id": "S001", "name": "월미도 횟집"}, {"id": "S002", "name": "...", "rating": 4.1}, {...전체...}],
+     "benefit_refs": [{"code": "AB12CD", "store_name": "S001", "benefit_type": "할인", "description": "..."},
+                      {...전체...}], ...}
+
+이전 compact-1 형식(참조가 ID/코드 문자열이거나 표시용 텍스트가 없는 형식)도 읽습니다.
+"""
+from typing import Any, Dict, List, Tuple
+
+from models import Store
+
+COMPACT_FORMAT = 'compact-2'
+# 읽을 수 있는 참조형 형식
+COMPACT_FORMATS = ('compact-1', COMPACT_FORMAT)
+# 카탈로그 조회에 실패해도 복원할 수 있도록 참조에 함께 기록하는 필드
+STORE_FALLBACK_FIELDS = ('name',)
+BENEFIT_FALLBACK_FIELDS = ('store_name', 'benefit_type', 'description')
+UNKNOWN_STORE_NAME = '알 수 없는 상점'
+
+
+def _changed_fields(value: Dict[str, Any], base: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: item for key, item in value.items() if key not in base or base[key] != item}
+
+
+def _placeholder_store(name: str) -> Dict[str, Any]:
+    """카탈로그에서 사라진 상점 자리 (참조에 기록된 이름만 남김)"""
+    return Store(name=name, category='', address='', phone='', description='', rating=0.0,
+                 price_range='보통', opening_hours='', menu_highlights=[], location='').__dict__
+
+
+def is_compact(pass_data: Dict[str, Any]) -> bool:
+    return pass_data.get('format') in COMPACT_FORMATS
+
+
+def pass_counts(pass_data: Dict[str, Any]) -> Tuple[int, int]:
+    """(상점 수, 혜택 수) - 두 형식 모두 복원 없이 계산"""
+    if is_compact(pass_data):
+        return len(pass_data.get('store_refs', [])), len(pass_data.get('benefit_refs', []))
+    return len(pass_data.get('stores', [])), len(pass_data.get('benefits', []))
+
+
+def compact_pass_data(pass_data: Dict[str, Any], catalog=None) -> Dict[str, Any]:
+    """전체 내장 형식 패스 딕셔너리 -> 카탈로그 참조형 (이미 참조형이면 그대로)"""
+    if is_compact(pass_data):
+        return pass_data
+    if catalog is None:
+        from catalog import get_catalog
+        catalog = get_catalog()
+
+    store_refs: List[Any] = []
+    for store_data in pass_data.get('stores', []):
+        store_id = catalog.store_id_by_name.get(store_data.get('name'))
+        row = catalog.store_row_by_id.get(store_id) if store_id else None
+        if row is None:
+            # 카탈로그에 없는 상점은 전체를 내장
+            store_refs.append(dict(store_data))
+            continue
+        changed = _changed_fields(store_data, catalog.stores[row].__dict__)
+        fallback = {key: store_data[key] for key in STORE_FALLBACK_FIELDS if key in store_data}
+        store_refs.append({'id': store_id, **fallback, **changed})
+
+    benefit_refs: List[Any] = []
+    for benefit_data in pass_data.get('benefits', []):
+        code = benefit_data.get('redemption_code')
+        benefit = catalog.find_benefit_by_code(code) if code else None
+        if benefit is None:
+            benefit_refs.append(dict(benefit_data))
+            continue
+        changed = _changed_fields(benefit_data, benefit.__dict__)
+        changed.pop('redemption_code', None)
+        fallback = {key: benefit_data[key] for key in BENEFIT_FALLBACK_FIELDS if key in benefit_data}
+        benefit_refs.append({'code': code, **fallback, **changed})
+
+    compact = {key: value for key, value in pass_data.items() if key not in ('stores', 'benefits')}
+    compact.update({'format': COMPACT_FORMAT, 'store_refs': store_refs, 'benefit_refs': benefit_refs})
+    return compact
+
+
+def expand_pass_data(pass_data: Dict[str, Any], catalog=None) -> Dict[str, Any]:
+    """카탈로그 참조형 -> 전체 내장 형식 (이전 형식이면 그대로)"""
+    if not is_compact(pass_data):
+        return pass_data
+    if catalog is None:
+        from catalog import get_catalog
+        catalog = get_catalog()
+
+    stores: List[Dict[str, Any]] = []
+    for ref in pass_data.get('store_refs', []):
+        if isinstance(ref, str):
+            ref = {'id': ref}
+        if 'id' not in ref:
+            stores.append(dict(ref))
+            continue
+        store_id = ref['id']
+        row = catalog.store_row_by_id.get(store_id)
+        # 카탈로그 객체와 목록을 공유하지 않도록 복사
+        store_data = (dict(catalog.stores[row].__dict__) if row is not None
+                      else _placeholder_store(ref.get('name') or UNKNOWN_STORE_NAME))
+        store_data.update({key: value for key, value in ref.items() if key != 'id'})
+        store_data['menu_highlights'] = list(store_data.get('menu_highlights') or [])
+        stores.append(store_data)
+
+    benefits: List[Dict[str, Any]] = []
+    for ref in pass_data.get('benefit_refs', []):
+        if isinstance(ref, str):
+            ref = {'code': ref}
+        if 'code' not in ref:
+            benefits.append(dict(ref))
+            continue
+        benefit = catalog.find_benefit_by_code(ref['code'])
+        benefit_data = (dict(benefit.__dict__) if benefit is not None
+                        else {'store_name': '', 'benefit_type': '할인', 'description': ''})
+        benefit_data.update({key: value for key, value in ref.items() if key != 'code'})
+        benefit_data['redemption_code'] = ref['code']
+        benefits.append(benefit_data)
+
+    expanded = {key: value for key, value in pass_data.items()
+                if key not in ('format', 'store_refs', 'benefit_refs')}
+    expanded.update({'stores': stores, 'benefits': benefits})
+    return expanded
@@ -4,6 +4,7 @@ AI 기반 맞춤형 패스 생성 로직을 담당합니다.
 """
 import json
 import os
+from dataclasses import replace
 from datetime import datetime
 from typing import List, Dict, Optional, Any
 try:
@@ -12,20 +13,25 @@ except ImportError:
     genai = None
 from dotenv import load_dotenv
 from models import Store, Benefit, UserPrefs, Pass, PassType, Theme
+from catalog import get_catalog, reload_catalog
+from pass_cache import invalidate_pass
+from pass_index import get_pass_index, summarize_pass_data
+from pass_storage import write_pass_file
+from pass_codec import compact_pass_data
 import hashlib
 
 # 환경 변수 로드
 load_dotenv()
 
+# AI 프롬프트에 포함할 최대 상점 수 (테마 필터링 순위 기준 상위)
+MAX_PROMPT_STORES = 30
+
 class PassGenerator:
     """패스 생성을 담당하는 클래스"""
     
     def __init__(self):
         """PassGenerator 초기화"""
         self.model = self._initialize_ai_model()
-        self.stores_cache = None
-        self.benefits_cache = None
-        self.stores_raw_cache = None
         self.store_reasons = {}  # 상점별 선택 이유 저장
         
     def _initialize_ai_model(self):
@@ -53,112 +59,44 @@ class PassGenerator:
             return None
     
     def load_stores(self) -> List[Store]:
-        """상점 데이터 로드 (캐싱 적용)"""
-        if self.stores_cache is not None:
-            return self.stores_cache
-            
+        """상점 데이터 로드 (프로세스 공유 카탈로그 사용)"""
         try:
-            stores_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'stores.json')
-            with open(stores_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                stores_data = data.get('stores', data)
-                
-                stores = []
-                for store_data in stores_data:
-                    store = Store(
-                        name=store_data.get('name', ''),
-                        category=store_data.get('category', ''),
-                        address=store_data.get('address', ''),
-                        phone=store_data.get('phone', ''),
-                        description=store_data.get('desc', store_data.get('description', '')),
-                        rating=float(store_data.get('rating', 0)),
-                        price_range=store_data.get('price_range', '보통'),
-                        opening_hours=store_data.get('opening_hours', '09:00-21:00'),
-                        menu_highlights=store_data.get('menu_highlights', []),
-                        location=store_data.get('area', store_data.get('location', '')),
-                        latitude=store_data.get('latitude'),
-                        longitude=store_data.get('longitude'),
-                        image_url=store_data.get('image_url', '')
-                    )
-                    stores.append(store)
-                
-                self.stores_cache = stores
-                return stores
-                
-        except FileNotFoundError:
-            print("[패스 생성기] stores.json 파일을 찾을 수 없습니다.")
-            return []
+            return list(get_catalog().stores)
         except Exception as e:
             print(f"[패스 생성기] 상점 데이터 로드 중 오류: {e}")
             return []
 
     def load_stores_raw(self) -> List[Dict]:
-        """상점 원본 데이터 로드 (ID 포함, 캐싱 적용)"""
-        if self.stores_raw_cache is not None:
-            return self.stores_raw_cache
-            
+        """상점 원본 데이터 로드 (ID 포함, 프로세스 공유 카탈로그 사용)"""
         try:
-            stores_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'stores.json')
-            with open(stores_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                stores_data = data.get('stores', data)
-                self.stores_raw_cache = stores_data
-                return stores_data
-                
-        except FileNotFoundError:
-            print("[패스 생성기] stores.json 파일을 찾을 수 없습니다.")
-            return []
+            return list(get_catalog().stores_raw)
         except Exception as e:
             print(f"[패스 생성기] 상점 데이터 로드 중 오류: {e}")
             return []
 
     def load_benefits(self) -> List[Benefit]:
-        """혜택 데이터 로드 (캐싱 적용)"""
-        if self.benefits_cache is not None:
-            return self.benefits_cache
-            
+        """혜택 데이터 로드 (프로세스 공유 카탈로그 사용)"""
         try:
-            benefits_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'benefits.json')
-            with open(benefits_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                benefits_data = data.get('benefits', data)
-                
-                benefits = []
-                for benefit_data in benefits_data:
-                    benefit = Benefit(
-                        store_name=benefit_data.get('store_id', ''),
-                        benefit_type=benefit_data.get('type', 'discount'),
-                        description=benefit_data.get('desc', benefit_data.get('description', ''))
-                    )
-                    benefits.append(benefit)
-                
-                self.benefits_cache = benefits
-                return benefits
-                
-        except FileNotFoundError:
-            print("[패스 생성기] benefits.json 파일을 찾을 수 없습니다.")
-            return []
+            return list(get_catalog().benefits)
         except Exception as e:
             print(f"[패스 생성기] 혜택 데이터 로드 중 오류: {e}")
             return []
 
     def filter_stores_by_theme(self, stores: List[Store], theme: Theme) -> List[Store]:
-        """테마에 따른 상점 필터링"""
-        theme_categories = {
-            Theme.FOOD: ["한식", "중식", "일식", "양식", "디저트", "카페", "음식점"],
-            Theme.CULTURE: ["관광지", "박물관", "갤러리", "문화시설"],
-            Theme.SHOPPING: ["쇼핑몰", "마트", "의류", "잡화"],
-            Theme.ENTERTAINMENT: ["엔터테인먼트", "레저", "스포츠", "게임"]
-        }
+        """
+        테마에 따른 상점 필터링 (테마/카테고리 역색인)
+        테마 토큰과 많이 일치하는 순, 같으면 상생 점수 순으로 정렬된 목록을 반환합니다.
+        일치하는 상점이 없으면 빈 목록을 반환합니다 (전체 상점으로 대체하지 않음).
+        """
+        ranked = get_catalog().stores_for_theme(theme)
         
-        relevant_categories = theme_categories.get(theme, [])
-        filtered_stores = [store for store in stores 
-                         if any(cat in store.category for cat in relevant_categories)]
+        # 전달된 상점 목록에 있는 상점만 남김 (보통은 카탈로그 전체)
+        stores_by_name = {store.name: store for store in stores}
+        filtered_stores = [stores_by_name[store.name] for store in ranked if store.name in stores_by_name]
         
-        # 필터링된 결과가 없으면 전체 사용
         if not filtered_stores:
-            print(f"[패스 생성기] 테마 '{theme.value}' 필터링 결과 없음, 전체 상점 사용")
-            return stores
+            print(f"[패스 생성기] 테마 '{theme.value}' 필터링 결과 없음")
+            return []
             
         print(f"[패스 생성기] 테마 '{theme.value}' 필터링: {len(filtered_stores)}개 상점")
         return filtered_stores
@@ -254,21 +192,20 @@ class PassGenerator:
         
         # 추천된 상점들의 ID 목록 생성
         recommended_store_ids = []
-        stores_raw = self.load_stores_raw()
+        store_id_by_name = get_catalog().store_id_by_name
         
         for store in recommended_stores:
-            for store_data in stores_raw:
-                if store_data.get('name') == store.name:
-                    store_id = store_data.get('id')
-                    recommended_store_ids.append(store_id)
-                    print(f"[패스 생성기] 혜택 매칭: {store.name} -> {store_id}")
-                    break
+            store_id = store_id_by_name.get(store.name)
+            if store_id:
+                recommended_store_ids.append(store_id)
+                print(f"[패스 생성기] 혜택 매칭: {store.name} -> {store_id}")
         
         print(f"[패스 생성기] 추천된 상점 ID들: {recommended_store_ids}")
         
-        # 해당 상점들의 혜택 찾기
-        store_benefits = [benefit for benefit in all_benefits 
-                         if benefit.store_name in recommended_store_ids]
+        # 해당 상점들의 혜택 찾기 (카탈로그 객체는 공유되므로 복사본 사용)
+        recommended_id_set = set(recommended_store_ids)
+        store_benefits = [replace(benefit) for benefit in all_benefits 
+                         if benefit.store_name in recommended_id_set]
         
         print(f"[패스 생성기] 찾은 혜택 수: {len(store_benefits)}")
         for benefit in store_benefits:
@@ -295,12 +232,12 @@ class PassGenerator:
         # 패스 ID 생성
         pass_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(str(user_prefs)) % 10000:04d}"
         
-        # 패스 생성
+        # 패스 생성 (카탈로그 상점 객체는 공유되므로 복사본 사용)
         pass_obj = Pass(
             pass_id=pass_id,
             pass_type=pass_type,
             theme=theme,
-            stores=stores,
+            stores=[replace(store, menu_highlights=list(store.menu_highlights or [])) for store in stores],
             benefits=benefits,
             created_at=datetime.now().isoformat(),
             user_prefs=user_prefs
@@ -312,12 +249,9 @@ class PassGenerator:
         print(f"[패스 생성기] 패스 객체 생성 완료: {pass_id}")
         return pass_obj
 
-    def save_pass_to_file(self, pass_obj: Pass) -> bool:
-        """패스를 파일로 저장"""
+    def save_pass_to_file(self, pass_obj: Pass, user_email: Optional[str] = None) -> bool:
+        """패스를 파일로 저장하고 패스 목록 인덱스에 요약 기록"""
         try:
-            saved_passes_dir = os.path.join(os.path.dirname(__file__), '..', 'storage', 'saved_passes')
-            os.makedirs(saved_passes_dir, exist_ok=True)
-            
             pass_data = {
                 'pass_id': pass_obj.pass_id,
                 'pass_type': pass_obj.pass_type.value,
@@ -328,11 +262,13 @@ class PassGenerator:
                 'user_prefs': pass_obj.user_prefs.__dict__
             }
             
-            filename = f"pass_{pass_obj.pass_id}.json"
-            filepath = os.path.join(saved_passes_dir, filename)
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(pass_data, f, ensure_ascii=False, indent=2)
+            # 날짜 샤드 경로에 압축 봉투로 저장 (이전 형식 파일은 정리)
+            filepath = write_pass_file(pass_obj.pass_id, compact_pass_data(pass_data))
+            invalidate_pass(pass_obj.pass_id)
+            try:
+                get_pass_index().upsert(summarize_pass_data(pass_data, user_email))
+            except Exception as index_error:
+                print(f"[패스 생성기] 패스 인덱스 갱신 실패: {index_error}")
             
             print(f"[패스 생성기] 패스 저장 완료: {filepath}")
             return True
@@ -533,11 +469,15 @@ class PassGenerator:
                 print("[패스 생성기] 상점 데이터가 없습니다.")
                 return None
             
-            # 2. 테마별 상점 필터링
+            # 2. 테마별 상점 필터링 (순위 상위 상점만 프롬프트에 포함)
             filtered_stores = self.filter_stores_by_theme(all_stores, theme)
+            if not filtered_stores:
+                print(f"[패스 생성기] 테마 '{theme.value}'에 맞는 상점이 없습니다.")
+                return None
             
             # 3. AI 프롬프트 생성
-            prompt = self.generate_ai_prompt(user_prefs, pass_type, theme, filtered_stores)
+            prompt = self.generate_ai_prompt(user_prefs, pass_type, theme,
+                                             filtered_stores[:MAX_PROMPT_STORES])
             
             # 4. AI 추천 받기
             recommended_store_names = self.get_ai_recommendations(prompt)
@@ -565,10 +505,8 @@ class PassGenerator:
             return None
 
     def clear_cache(self):
-        """캐시 초기화"""
-        self.stores_cache = None
-        self.benefits_cache = None
-        self.stores_raw_cache = None
+        """캐시 초기화 (공유 카탈로그 재로드)"""
+        reload_catalog()
         print("[패스 생성기] 캐시 초기화 완료")
 
 
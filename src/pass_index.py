@@ -0,0 +1,256 @@
+"""
+저장된 패스 요약 인덱스 (SQLite)
+save_pass_to_file 이 패스를 저장할 때마다 목록 화면에 필요한 요약 한 줄을 함께 기록합니다.
+패스 목록은 파일을 하나씩 읽어 복원하지 않고 created_at 인덱스 조회 한 번으로 만듭니다.
+새 인덱스를 처음 열면 기존 storage/saved_passes 파일(날짜 샤드 포함)을 한 번 읽어 채웁니다.
+만료되어 콜드 아카이브로 옮긴 패스는 요약 행을 지우고 archived_passes 에 아카이브 월만 남깁니다.
+"""
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from models import Pass
+from pass_summary import project_pass_summary
+from pass_storage import SAVED_PASSES_DIR, iter_pass_files, read_pass_file
+from storage_paths import storage_dir
+
+STORAGE_DIR = storage_dir()
+PASS_INDEX_FILENAME = 'pass_index.db'
+# IN (...) 조회 한 번에 넣을 최대 ID 수 (SQLite 바인드 변수 제한 이하)
+SQLITE_MAX_PARAMS = 500
+
+
+def summarize_pass(pass_obj: Pass, user_email: Optional[str] = None) -> Dict[str, Any]:
+    """Pass 객체 -> 인덱스 요약 행"""
+    return project_pass_summary({
+        'pass_id': pass_obj.pass_id,
+        'pass_type': pass_obj.pass_type.value,
+        'theme': pass_obj.theme.value,
+        'created_at': pass_obj.created_at,
+        'stores': pass_obj.stores,
+        'benefits': pass_obj.benefits,
+    }, user_email)
+
+
+def summarize_pass_data(pass_data: Dict[str, Any], user_email: Optional[str] = None) -> Dict[str, Any]:
+    """저장 파일 형식의 패스 딕셔너리 -> 인덱스 요약 행 (Pass 객체로 복원하지 않음)"""
+    return project_pass_summary(pass_data, user_email)
+
+
+class PassIndex:
+    """
+    패스 요약 인덱스 (WAL 모드, created_at / (user_email, created_at) 인덱스)
+    연결은 프로세스/스레드별로 따로 열어 fork 이후에도 안전하게 사용합니다.
+    """
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS pass_summaries (
+            pass_id TEXT PRIMARY KEY,
+            pass_type TEXT NOT NULL,
+            theme TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            store_count INTEGER NOT NULL,
+            benefits_count INTEGER NOT NULL,
+            user_email TEXT,
+            name TEXT,
+            theme_name TEXT,
+            pass_type_name TEXT,
+            valid_until TEXT,
+            total_price INTEGER
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_pass_summaries_created ON pass_summaries (created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_pass_summaries_user ON pass_summaries (user_email, created_at)",
+        # 만료되어 콜드 아카이브로 옮긴 패스 (ID -> 아카이브 월)
+        """CREATE TABLE IF NOT EXISTS archived_passes (
+            pass_id TEXT PRIMARY KEY,
+            archive_month TEXT NOT NULL,
+            user_email TEXT,
+            created_at TEXT,
+            archived_at TEXT NOT NULL
+        )""",
+    )
+    # 저장 시점에 계산하는 목록 표시 필드 (이전 인덱스에는 열을 추가하고 채움)
+    PROJECTED_COLUMNS = (('name', 'TEXT'), ('theme_name', 'TEXT'), ('pass_type_name', 'TEXT'),
+                         ('valid_until', 'TEXT'), ('total_price', 'INTEGER'))
+    # 사용자 정보 없이 다시 저장돼도 기존 소유자는 유지
+    UPSERT_SQL = (
+        'INSERT INTO pass_summaries (pass_id, pass_type, theme, created_at, store_count, benefits_count, user_email, '
+        'name, theme_name, pass_type_name, valid_until, total_price) '
+        'VALUES (:pass_id, :pass_type, :theme, :created_at, :store_count, :benefits_count, :user_email, '
+        ':name, :theme_name, :pass_type_name, :valid_until, :total_price) '
+        'ON CONFLICT(pass_id) DO UPDATE SET pass_type = excluded.pass_type, theme = excluded.theme, '
+        'created_at = excluded.created_at, store_count = excluded.store_count, '
+        'benefits_count = excluded.benefits_count, user_email = COALESCE(excluded.user_email, user_email), '
+        'name = excluded.name, theme_name = excluded.theme_name, pass_type_name = excluded.pass_type_name, '
+        'valid_until = excluded.valid_until, total_price = excluded.total_price'
+    )
+    COLUMNS = ('pass_id, pass_type, theme, created_at, store_count, benefits_count, user_email, '
+               'name, theme_name, pass_type_name, valid_until, total_price')
+
+    def __init__(self, path: str, backfill_dir: Optional[str] = None):
+        self.path = path
+        self._local = threading.local()
+        is_new = not os.path.exists(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connection()
+        for statement in self.SCHEMA:
+            conn.execute(statement)
+        self._add_projected_columns(conn)
+        # 새 인덱스면 기존 패스 파일로 채운다
+        if is_new and backfill_dir and os.path.isdir(backfill_dir):
+            indexed = self.rebuild_from_dir(backfill_dir)
+            print(f"[패스 인덱스] 기존 패스 파일 {indexed}개 색인")
+
+    def _add_projected_columns(self, conn: sqlite3.Connection) -> None:
+        """요약 필드 도입 전 인덱스: 열을 추가하고 기존 행의 값으로 계산 (패스 파일은 읽지 않음)"""
+        existing = {row['name'] for row in conn.execute('PRAGMA table_info(pass_summaries)')}
+        missing = [(name, sql_type) for name, sql_type in self.PROJECTED_COLUMNS if name not in existing]
+        if not missing:
+            return
+        for name, sql_type in missing:
+            conn.execute(f'ALTER TABLE pass_summaries ADD COLUMN {name} {sql_type}')
+        rows = conn.execute('SELECT pass_id, pass_type, theme, created_at, store_count, benefits_count, user_email '
+                            'FROM pass_summaries').fetchall()
+        summaries = []
+        for row in rows:
+            summary = project_pass_summary(dict(row))
+            summary.update(store_count=row['store_count'], benefits_count=row['benefits_count'])
+            summaries.append(summary)
+        self.upsert_many(summaries)
+        print(f"[패스 인덱스] 목록 요약 필드 추가: {len(summaries)}개 행")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA busy_timeout=10000')
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def upsert(self, summary: Dict[str, Any]) -> None:
+        self._connection().execute(self.UPSERT_SQL, summary)
+
+    def upsert_many(self, summaries: Iterable[Dict[str, Any]]) -> int:
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            count = 0
+            for summary in summaries:
+                conn.execute(self.UPSERT_SQL, summary)
+                count += 1
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return count
+
+    def delete(self, pass_id: str) -> None:
+        self._connection().execute('DELETE FROM pass_summaries WHERE pass_id = ?', (pass_id,))
+
+    def mark_archived(self, rows: Iterable[Dict[str, Any]], archived_at: str) -> int:
+        """
+        아카이브로 옮긴 패스의 요약 행을 지우고 아카이브 위치를 기록 -> 기록한 수
+        rows: {'pass_id', 'archive_month', 'user_email', 'created_at'}
+        """
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            count = 0
+            for row in rows:
+                conn.execute('DELETE FROM pass_summaries WHERE pass_id = ?', (row['pass_id'],))
+                conn.execute(
+                    'INSERT OR REPLACE INTO archived_passes (pass_id, archive_month, user_email, created_at, archived_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (row['pass_id'], row['archive_month'], row.get('user_email'), row.get('created_at'), archived_at))
+                count += 1
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return count
+
+    def archived_month(self, pass_id: str) -> Optional[str]:
+        """아카이브된 패스의 아카이브 월 'YYYY-MM' (없으면 None)"""
+        row = self._connection().execute(
+            'SELECT archive_month FROM archived_passes WHERE pass_id = ?', (pass_id,)).fetchone()
+        return row[0] if row else None
+
+    def list_passes(self, user_email: Optional[str] = None, pass_ids: Iterable[str] = (),
+                    limit: Optional[int] = None,
+                    before: Optional[Tuple[str, str]] = None) -> List[Dict[str, Any]]:
+        """
+        요약 목록을 (created_at, pass_id) 최신순으로 조회
+        user_email 의 패스와 pass_ids 에 있는 패스를 합쳐 한 번의 쿼리로 반환합니다.
+        둘 다 없으면 전체 목록입니다. before=(created_at, pass_id) 이면 그보다 오래된 것만 (키셋 페이지네이션).
+        """
+        pass_ids = list(dict.fromkeys(pass_ids))[:SQLITE_MAX_PARAMS]
+        owners, params = [], []
+        if user_email:
+            owners.append('user_email = ?')
+            params.append(user_email)
+        if pass_ids:
+            owners.append(f"pass_id IN ({','.join('?' * len(pass_ids))})")
+            params.extend(pass_ids)
+        conditions = [f"({' OR '.join(owners)})"] if owners else []
+        if before:
+            conditions.append('(created_at < ? OR (created_at = ? AND pass_id < ?))')
+            params.extend([before[0], before[0], before[1]])
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        sql = f'SELECT {self.COLUMNS} FROM pass_summaries {where} ORDER BY created_at DESC, pass_id DESC'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return [dict(row) for row in self._connection().execute(sql, params)]
+
+    def known_ids(self, pass_ids: Iterable[str]) -> Set[str]:
+        """pass_ids 중 인덱스에 있거나 콜드 아카이브로 옮긴 ID (다시 색인하지 않아야 하는 ID)"""
+        pass_ids = list(dict.fromkeys(pass_ids))
+        found: Set[str] = set()
+        conn = self._connection()
+        for i in range(0, len(pass_ids), SQLITE_MAX_PARAMS):
+            chunk = pass_ids[i:i + SQLITE_MAX_PARAMS]
+            placeholders = ','.join('?' * len(chunk))
+            found.update(row[0] for row in conn.execute(
+                f"SELECT pass_id FROM pass_summaries WHERE pass_id IN ({placeholders}) "
+                f"UNION SELECT pass_id FROM archived_passes WHERE pass_id IN ({placeholders})", chunk + chunk))
+        return found
+
+    def count(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM pass_summaries').fetchone()[0]
+
+    def rebuild_from_dir(self, saved_passes_dir: str = SAVED_PASSES_DIR, since: Optional[str] = None,
+                         until: Optional[str] = None) -> int:
+        """
+        패스 파일 디렉토리를 읽어 인덱스 채우기 (관리용 - 초기 생성/복구) -> 색인한 파일 수
+        since/until('YYYYMMDD')을 주면 해당 날짜 샤드만 읽습니다.
+        """
+        summaries = []
+        for path in iter_pass_files(saved_passes_dir, since=since, until=until):
+            try:
+                summaries.append(summarize_pass_data(read_pass_file(path)))
+            except Exception as e:
+                print(f"[패스 인덱스] 색인 건너뜀 ({os.path.basename(path)}): {e}")
+        return self.upsert_many(summaries)
+
+
+def pass_index_path(storage_dir: str = STORAGE_DIR) -> str:
+    return os.path.join(storage_dir, PASS_INDEX_FILENAME)
+
+
+# 프로세스 전역 인덱스 인스턴스
+_index_instance = None
+_index_lock = threading.Lock()
+
+
+def get_pass_index() -> PassIndex:
+    global _index_instance
+    if _index_instance is None:
+        with _index_lock:
+            if _index_instance is None:
+                _index_instance = PassIndex(pass_index_path(), backfill_dir=SAVED_PASSES_DIR)
+    return _index_instance
@@ -0,0 +1,172 @@
+"""
+저장된 패스 파일 배치 (storage/saved_passes 날짜 샤드)
+pass_id 앞부분의 생성 날짜(YYYYMMDD_HHMMSS_xxxx)로 saved_passes/YYYY/MM/DD/pass_<id>.jpass 에 저장합니다.
+saved_passes 는 저장소 루트(storage_paths.storage_dir, 기본 storage/) 아래에 있습니다.
+.jpass 는 압축 봉투(pass_blob) 형식이고, 이전에 저장된 pass_<id>.json 도 그대로 읽습니다.
+날짜 형식이 아닌 ID 는 saved_passes/_other/<해시 2자리>/ 에 둡니다.
+샤드 도입 전의 평면 배치(saved_passes/pass_<id>.json)도 그대로 찾을 수 있으며
+scripts/migrate_pass_layout.py 로 샤드 배치로 옮깁니다.
+"""
+import hashlib
+import os
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pass_blob import decode_pass_blob, encode_pass_blob
+from storage_paths import storage_dir
+
+STORAGE_DIR = storage_dir()
+SAVED_PASSES_DIR = os.path.join(STORAGE_DIR, 'saved_passes')
+OTHER_SHARD = '_other'
+PASS_FILE_EXT = '.jpass'
+LEGACY_PASS_FILE_EXT = '.json'
+
+_DATED_PASS_ID = re.compile(r'^(\d{4})(\d{2})(\d{2})_')
+
+
+def pass_filename(pass_id: str, ext: str = PASS_FILE_EXT) -> str:
+    return f"pass_{pass_id}{ext}"
+
+
+def pass_id_from_filename(filename: str) -> Optional[str]:
+    if filename.startswith('pass_'):
+        for ext in (PASS_FILE_EXT, LEGACY_PASS_FILE_EXT):
+            if filename.endswith(ext):
+                return filename[len('pass_'):-len(ext)]
+    return None
+
+
+def pass_date(pass_id: str) -> Optional[str]:
+    """pass_id 의 생성 날짜 'YYYYMMDD' (날짜 형식이 아니면 None)"""
+    match = _DATED_PASS_ID.match(pass_id)
+    return ''.join(match.groups()) if match else None
+
+
+def shard_parts(pass_id: str) -> Tuple[str, ...]:
+    """pass_id -> 샤드 디렉토리 경로 구성요소"""
+    match = _DATED_PASS_ID.match(pass_id)
+    if match:
+        return match.groups()
+    return OTHER_SHARD, hashlib.md5(pass_id.encode('utf-8')).hexdigest()[:2]
+
+
+def pass_file_path(pass_id: str, base_dir: str = SAVED_PASSES_DIR, ext: str = PASS_FILE_EXT) -> str:
+    """패스를 저장할 샤드 파일 경로"""
+    return os.path.join(base_dir, *shard_parts(pass_id), pass_filename(pass_id, ext))
+
+
+def legacy_pass_file_path(pass_id: str, base_dir: str = SAVED_PASSES_DIR) -> str:
+    """샤드 도입 전 평면 배치의 파일 경로"""
+    return os.path.join(base_dir, pass_filename(pass_id, LEGACY_PASS_FILE_EXT))
+
+
+def _candidate_paths(pass_id: str, base_dir: str) -> Tuple[str, str, str]:
+    # 최신 형식 -> 샤드로 옮긴 이전 JSON -> 평면 배치 JSON
+    return (pass_file_path(pass_id, base_dir), pass_file_path(pass_id, base_dir, LEGACY_PASS_FILE_EXT),
+            legacy_pass_file_path(pass_id, base_dir))
+
+
+def find_pass_file(pass_id: str, base_dir: str = SAVED_PASSES_DIR) -> Optional[str]:
+    """샤드(.jpass -> .json) -> 평면 경로 순으로 찾아 존재하는 파일 경로 반환"""
+    for path in _candidate_paths(pass_id, base_dir):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def read_pass_file(path: str) -> Dict[str, Any]:
+    """패스 파일 읽기 (압축 봉투/이전 JSON 자동 판별)"""
+    with open(path, 'rb') as f:
+        return decode_pass_blob(f.read())
+
+
+def write_pass_file(pass_id: str, pass_data: Dict[str, Any], base_dir: str = SAVED_PASSES_DIR) -> str:
+    """
+    패스를 샤드 경로에 압축 봉투로 저장 -> 파일 경로
+    임시 파일에 쓴 뒤 교체하므로 읽는 쪽이 쓰다 만 파일을 보지 않으며, 같은 패스의 이전 형식 파일은 정리합니다.
+    """
+    path = pass_file_path(pass_id, base_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(encode_pass_blob(pass_data))
+    os.replace(tmp_path, path)
+    for stale_path in _candidate_paths(pass_id, base_dir)[1:]:
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+    return path
+
+
+def _sorted_subdirs(path: str) -> List[str]:
+    try:
+        return sorted(entry.name for entry in os.scandir(path) if entry.is_dir())
+    except FileNotFoundError:
+        return []
+
+
+def _pass_files_in(path: str) -> Iterator[str]:
+    try:
+        names = sorted(entry.name for entry in os.scandir(path) if entry.is_file())
+    except FileNotFoundError:
+        return
+    for name in names:
+        if pass_id_from_filename(name):
+            yield os.path.join(path, name)
+
+
+def iter_pass_files(base_dir: str = SAVED_PASSES_DIR, since: Optional[str] = None,
+                    until: Optional[str] = None) -> Iterator[str]:
+    """
+    패스 파일 경로 순회 (평면 배치 파일 포함)
+    since/until('YYYYMMDD', 양 끝 포함)을 주면 그 범위의 날짜 샤드 디렉토리만 엽니다.
+    범위를 주면 날짜 형식이 아닌 ID(_other 샤드)는 제외됩니다.
+    """
+    ranged = since is not None or until is not None
+
+    def in_range(prefix: str) -> bool:
+        # prefix 는 'YYYY' / 'YYYYMM' / 'YYYYMMDD' - 같은 길이로 잘라 비교
+        return ((since is None or prefix >= since[:len(prefix)]) and
+                (until is None or prefix <= until[:len(prefix)]))
+
+    # 평면 배치 (마이그레이션 전 파일)
+    for path in _pass_files_in(base_dir):
+        date = pass_date(pass_id_from_filename(os.path.basename(path)))
+        if not ranged or (date and in_range(date)):
+            yield path
+
+    for year in _sorted_subdirs(base_dir):
+        if year == OTHER_SHARD:
+            if not ranged:
+                for bucket in _sorted_subdirs(os.path.join(base_dir, year)):
+                    yield from _pass_files_in(os.path.join(base_dir, year, bucket))
+            continue
+        if not in_range(year):
+            continue
+        for month in _sorted_subdirs(os.path.join(base_dir, year)):
+            if not in_range(year + month):
+                continue
+            for day in _sorted_subdirs(os.path.join(base_dir, year, month)):
+                if in_range(year + month + day):
+                    yield from _pass_files_in(os.path.join(base_dir, year, month, day))
+
+
+def migrate_flat_layout(base_dir: str = SAVED_PASSES_DIR, dry_run: bool = False) -> Tuple[int, int]:
+    """
+    평면 배치 파일을 샤드 경로로 이동 -> (이동한 수, 건너뛴 수)
+    샤드에 같은 패스가 이미 있으면(새로 저장된 쪽이 최신) 평면 파일만 지웁니다.
+    """
+    moved = skipped = 0
+    for path in list(_pass_files_in(base_dir)):
+        filename = os.path.basename(path)
+        pass_id = pass_id_from_filename(filename)
+        target = os.path.join(base_dir, *shard_parts(pass_id), filename)
+        if os.path.exists(target) or os.path.exists(pass_file_path(pass_id, base_dir)):
+            if not dry_run:
+                os.remove(path)
+            skipped += 1
+            continue
+        if not dry_run:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(path, target)
+        moved += 1
+    return moved, skipped
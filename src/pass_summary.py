@@ -0,0 +1,115 @@
+"""
+패스 목록 요약 (저장 시점 계산)
+패스 목록 화면에 필요한 이름, 유효기간, 가격, 상점/혜택 수를 패스를 저장할 때 한 번 계산해
+패스 인덱스 행과 Datastore 엔티티 속성으로 함께 기록합니다.
+목록 조회는 이 요약만 읽으며 패스 본문을 복원하지 않습니다. (상태는 유효기간과 현재 시각으로 판정)
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Union
+
+from pass_codec import pass_counts
+
+# 패스 목록 표시용 이름/가격
+THEME_NAMES = {
+    'food': '맛집', 'culture': '문화', 'shopping': '쇼핑',
+    'entertainment': '오락', 'seafood': '해산물', 'cafe': '카페',
+    'traditional': '전통', 'retro': '레트로', 'quiet': '조용함'
+}
+
+PASS_TYPE_NAMES = {
+    'light': '라이트', 'premium': '프리미엄', 'citizen': '시민'
+}
+
+PASS_TYPE_PRICES = {
+    'light': 7900, 'premium': 14900, 'citizen': 6900
+}
+DEFAULT_PASS_PRICE = 7900
+
+# 패스 유효기간 (생성일로부터)
+PASS_VALID_DAYS = 30
+
+
+def canonical_timestamp(value: Union[str, datetime, None]) -> str:
+    """
+    저장 시각 -> 목록 정렬/커서 비교에 쓰는 한 가지 형식 (시간대 없는 ISO 문자열)
+    패스는 시간대 없는 created_at 을 저장하고, Datastore 는 이를 UTC 로 간주해 시간대 있는 UTC 시각으로
+    돌려주므로 시간대가 있으면 UTC 로 바꾼 뒤 시간대를 뗍니다. 파싱할 수 없으면 문자열 그대로 반환합니다.
+    """
+    if isinstance(value, datetime):
+        moment = value
+    else:
+        text = str(value or '')
+        try:
+            moment = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            return text
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.isoformat()
+
+
+def valid_until_for(created_at: str) -> str:
+    """생성 시각 -> 유효기간 만료 시각 (ISO, 파싱할 수 없으면 빈 문자열)"""
+    try:
+        created_date = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+    except (ValueError, TypeError, AttributeError):
+        return ''
+    return (created_date + timedelta(days=PASS_VALID_DAYS)).isoformat()
+
+
+def pass_status(valid_until: str, now: Optional[datetime] = None) -> str:
+    """유효기간 -> active / expired (유효기간을 모르면 active)"""
+    try:
+        valid_until_date = datetime.fromisoformat(valid_until)
+    except (ValueError, TypeError):
+        return 'active'
+    if now is None:
+        now = datetime.now(timezone.utc) if valid_until_date.tzinfo else datetime.now()
+    elif (now.tzinfo is None) != (valid_until_date.tzinfo is None):
+        # 비교할 수 있도록 시간대 정보를 맞춘다 (naive 시각은 UTC로 간주)
+        now = now.replace(tzinfo=timezone.utc) if now.tzinfo is None else now.replace(tzinfo=None)
+    return 'expired' if now > valid_until_date else 'active'
+
+
+def project_pass_summary(pass_data: Dict[str, Any], user_email: Optional[str] = None) -> Dict[str, Any]:
+    """저장 형식 패스 딕셔너리(전체 내장/카탈로그 참조형) -> 목록 요약"""
+    pass_type = pass_data.get('pass_type') or 'light'
+    theme = pass_data.get('theme') or ''
+    created_at = str(pass_data.get('created_at') or '')
+    theme_name = THEME_NAMES.get(theme.lower(), theme or '테마')
+    pass_type_name = PASS_TYPE_NAMES.get(pass_type.lower(), pass_type)
+    store_count, benefits_count = pass_counts(pass_data)
+    return {
+        'pass_id': pass_data['pass_id'],
+        'pass_type': pass_type,
+        'theme': theme,
+        'created_at': created_at,
+        'store_count': store_count,
+        'benefits_count': benefits_count,
+        'user_email': user_email or pass_data.get('user_email'),
+        'name': f"{theme_name} {pass_type_name} 패스",
+        'theme_name': theme_name,
+        'pass_type_name': pass_type_name,
+        'valid_until': valid_until_for(created_at),
+        'total_price': PASS_TYPE_PRICES.get(pass_type.lower(), DEFAULT_PASS_PRICE),
+    }
+
+
+def summary_list_entry(summary: Dict[str, Any], source: str) -> Dict[str, Any]:
+    """요약 -> /api/user/passes 목록 항목"""
+    valid_until = summary.get('valid_until') or ''
+    return {
+        'pass_id': summary['pass_id'],
+        'name': summary['name'],
+        'pass_type': summary['pass_type_name'],
+        'theme': summary['theme_name'],
+        'created_at': summary['created_at'],
+        'valid_until': valid_until or summary['created_at'],
+        'status': pass_status(valid_until),
+        'total_places': summary['store_count'],
+        'visited_places': 0,
+        'total_price': summary['total_price'],
+        'store_count': summary['store_count'],
+        'benefits_count': summary['benefits_count'],
+        'source': source
+    }
@@ -0,0 +1,403 @@
+"""
+혜택 코드 사용 내역 원장 (전역 1회성 코드)
+기본 백엔드는 SQLite(WAL)로, "미사용이면 사용 처리"를 한 번의 원자적 INSERT로 처리해
+여러 gunicorn 워커가 동시에 같은 코드를 사용해도 한 번만 성공합니다.
+REDEMPTION_BACKEND=json 이면 기존 storage/redemptions.json 방식을 그대로 사용합니다 (호환/비교용).
+
+App Engine standard 에서는 /tmp 만 쓸 수 있으므로 STORAGE_DIR 을 지정하지 않으면 /tmp 아래에 원장을 둡니다.
+이 경우 원장은 인스턴스별 임시 저장소이며 인스턴스가 바뀌면 사라집니다 (여러 인스턴스가 공유하지 않음).
+SQLite 원장을 열 수 없으면 예외를 내지 않고 JSON 원장으로 대체합니다 (저장 실패는 JSON 원장처럼 무시).
+
+사용 처리와 같은 트랜잭션에서 상점별/혜택(코드)별/시간대별 사용 집계도 갱신하므로
+가맹점 대시보드 조회(stats)는 원장 전체를 훑지 않고 집계만 읽습니다.
+"""
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from storage_paths import storage_dir
+
+STORAGE_DIR = storage_dir()
+REDEMPTION_BACKEND = os.getenv('REDEMPTION_BACKEND', 'sqlite').lower()
+
+LEGACY_JSON_FILENAME = 'redemptions.json'
+SQLITE_FILENAME = 'redemptions.db'
+# IN (...) 조회 한 번에 넣을 최대 코드 수 (SQLite 바인드 변수 제한 이하)
+SQLITE_MAX_PARAMS = 500
+
+# 코드 -> 상점 ID 변환 함수 (가져오기/집계 재계산 때 상점 ID가 없는 기록에 사용)
+StoreIdResolver = Callable[[str], Optional[str]]
+
+
+def hour_bucket(used_at: Optional[str]) -> str:
+    """ISO 시각 문자열의 시간 단위 집계 버킷 ('2024-05-01T13')"""
+    return (used_at or '')[:13]
+
+
+def _stats_result(by_store: List[Dict[str, Any]], by_benefit: List[Dict[str, Any]],
+                  by_hour: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "total": sum(entry['count'] for entry in by_store),
+        "by_store": by_store,
+        "by_benefit": by_benefit,
+        "by_hour": by_hour,
+    }
+
+
+class JsonRedemptionLedger:
+    """
+    기존 redemptions.json 원장 ({"used": {code: {used_at, used_by, pass_id}}, "stats": {...}})
+    호출마다 파일 전체를 읽고 다시 쓰며 잠금이 없으므로 다중 워커 환경에서는 안전하지 않습니다.
+    """
+    backend = 'json'
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Dict[str, Any]:
+        """전역 혜택 코드 사용 내역 로드"""
+        if not os.path.exists(self.path):
+            return {"used": {}}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                if 'used' not in data:
+                    data = {"used": {}}
+                return data
+        except Exception:
+            return {"used": {}}
+
+    def save(self, data: Dict[str, Any]) -> bool:
+        """전역 혜택 코드 사용 내역 저장"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _record_stats(data: Dict[str, Any], code: str, store_id: Optional[str], used_at: Optional[str]):
+        """사용 처리 1건을 data['stats'] 집계에 반영 (원장과 같은 파일에 함께 저장)"""
+        stats = data.setdefault('stats', {"by_store": {}, "by_benefit": {}, "by_hour": {}})
+        store_key = store_id or ''
+        store = stats['by_store'].setdefault(store_key, {"count": 0, "last_used_at": None})
+        store['count'] += 1
+        store['last_used_at'] = used_at
+        benefit = stats['by_benefit'].setdefault(code, {"store_id": store_key, "count": 0, "last_used_at": None})
+        benefit['count'] += 1
+        benefit['last_used_at'] = used_at
+        hours = stats['by_hour'].setdefault(store_key, {})
+        bucket = hour_bucket(used_at)
+        hours[bucket] = hours.get(bucket, 0) + 1
+
+    def get(self, code: str) -> Optional[Dict[str, Any]]:
+        return self.load().get('used', {}).get(code)
+
+    def redeem(self, code: str, used_info: Dict[str, Any],
+               store_id: Optional[str] = None) -> Tuple[bool, Dict[str, Any]]:
+        """미사용이면 사용 처리 -> (이번 호출로 사용 처리됐는지, 사용 정보)"""
+        return self.redeem_many([(code, store_id)], used_info)[0]
+
+    def get_many(self, codes: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        used = self.load().get('used', {})
+        return {code: used[code] for code in codes if code in used}
+
+    def redeem_many(self, entries: Sequence[Tuple[str, Optional[str]]],
+                    used_info: Dict[str, Any]) -> List[Tuple[bool, Dict[str, Any]]]:
+        """[(코드, 상점 ID)] 를 한 번 읽고 한 번 저장해 사용 처리 (입력 순서대로 결과)"""
+        data = self.load()
+        used = data.setdefault('used', {})
+        results = []
+        for code, store_id in entries:
+            if code in used:
+                results.append((False, used[code]))
+            else:
+                used[code] = dict(used_info)
+                self._record_stats(data, code, store_id, used_info.get('used_at'))
+                results.append((True, used[code]))
+        if any(redeemed for redeemed, _ in results):
+            self.save(data)
+        return results
+
+    def stats(self, store_id: Optional[str] = None, since_hour: Optional[str] = None) -> Dict[str, Any]:
+        """집계만 읽어 사용 통계 반환 (store_id 지정 시 해당 상점만, since_hour 이후 시간대만)"""
+        stats = self.load().get('stats') or {"by_store": {}, "by_benefit": {}, "by_hour": {}}
+        by_store = [{"store_id": sid, **entry} for sid, entry in stats['by_store'].items()
+                    if store_id is None or sid == store_id]
+        by_benefit = [{"code": code, **entry} for code, entry in stats['by_benefit'].items()
+                      if store_id is None or entry['store_id'] == store_id]
+        by_hour: Dict[str, int] = {}
+        for sid, hours in stats['by_hour'].items():
+            if store_id is not None and sid != store_id:
+                continue
+            for hour, count in hours.items():
+                if since_hour is None or hour >= since_hour:
+                    by_hour[hour] = by_hour.get(hour, 0) + count
+        return _stats_result(sorted(by_store, key=lambda e: (-e['count'], e['store_id'])),
+                             sorted(by_benefit, key=lambda e: (-e['count'], e['code'])),
+                             [{"hour": hour, "count": by_hour[hour]} for hour in sorted(by_hour)])
+
+    def count(self) -> int:
+        return len(self.load().get('used', {}))
+
+
+class SqliteRedemptionLedger:
+    """
+    SQLite 원장 (WAL 모드, code 기본키 인덱스) + 상점/혜택/시간대별 집계 테이블
+    연결은 프로세스/스레드별로 따로 열어 fork(gunicorn preload) 이후에도 안전하게 사용합니다.
+    """
+    backend = 'sqlite'
+
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS redemptions (
+            code TEXT PRIMARY KEY,
+            used_at TEXT NOT NULL,
+            used_by TEXT,
+            pass_id TEXT,
+            store_id TEXT
+        )""",
+        """CREATE TABLE IF NOT EXISTS redemption_store_stats (
+            store_id TEXT PRIMARY KEY,
+            count INTEGER NOT NULL,
+            last_used_at TEXT
+        )""",
+        """CREATE TABLE IF NOT EXISTS redemption_benefit_stats (
+            code TEXT PRIMARY KEY,
+            store_id TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            last_used_at TEXT
+        )""",
+        """CREATE TABLE IF NOT EXISTS redemption_hourly_stats (
+            store_id TEXT NOT NULL,
+            hour TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (store_id, hour)
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_redemption_benefit_store ON redemption_benefit_stats (store_id)",
+        "CREATE INDEX IF NOT EXISTS idx_redemption_hourly_hour ON redemption_hourly_stats (hour)",
+    )
+    INSERT_SQL = 'INSERT OR IGNORE INTO redemptions (code, used_at, used_by, pass_id, store_id) VALUES (?, ?, ?, ?, ?)'
+
+    def __init__(self, path: str, legacy_json_path: Optional[str] = None,
+                 store_id_for: Optional[StoreIdResolver] = None):
+        self.path = path
+        self._local = threading.local()
+        is_new = not os.path.exists(path)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connection()
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(redemptions)')}
+        if columns and 'store_id' not in columns:
+            # 집계 도입 이전 원장 - 상점 ID 컬럼 추가 (기존 집계는 migrate_redemptions.py 로 재계산)
+            conn.execute('ALTER TABLE redemptions ADD COLUMN store_id TEXT')
+        for statement in self.SCHEMA:
+            conn.execute(statement)
+        # 새 원장이면 기존 JSON 사용 내역을 가져온다
+        if is_new and legacy_json_path and os.path.exists(legacy_json_path):
+            imported = self.import_json(legacy_json_path, store_id_for)
+            print(f"[코드 원장] 기존 {os.path.basename(legacy_json_path)}에서 {imported}건 가져옴")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            # isolation_level=None: 문장 단위 자동 커밋, 여러 문장은 명시적 BEGIN 으로 묶음
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA busy_timeout=10000')
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _row_to_info(row: sqlite3.Row) -> Dict[str, Any]:
+        return {"used_at": row['used_at'], "used_by": row['used_by'], "pass_id": row['pass_id']}
+
+    @staticmethod
+    def _record_stats(conn: sqlite3.Connection, code: str, store_id: Optional[str], used_at: Optional[str]):
+        """사용 처리 1건을 집계 테이블에 반영 (호출하는 쪽 트랜잭션 안에서 실행)"""
+        store_key = store_id or ''
+        conn.execute(
+            'INSERT INTO redemption_store_stats (store_id, count, last_used_at) VALUES (?, 1, ?) '
+            'ON CONFLICT(store_id) DO UPDATE SET count = count + 1, last_used_at = excluded.last_used_at',
+            (store_key, used_at))
+        conn.execute(
+            'INSERT INTO redemption_benefit_stats (code, store_id, count, last_used_at) VALUES (?, ?, 1, ?) '
+            'ON CONFLICT(code) DO UPDATE SET count = count + 1, last_used_at = excluded.last_used_at',
+            (code, store_key, used_at))
+        conn.execute(
+            'INSERT INTO redemption_hourly_stats (store_id, hour, count) VALUES (?, ?, 1) '
+            'ON CONFLICT(store_id, hour) DO UPDATE SET count = count + 1',
+            (store_key, hour_bucket(used_at)))
+
+    def get(self, code: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            'SELECT used_at, used_by, pass_id FROM redemptions WHERE code = ?', (code,)).fetchone()
+        return self._row_to_info(row) if row else None
+
+    def redeem(self, code: str, used_info: Dict[str, Any],
+               store_id: Optional[str] = None) -> Tuple[bool, Dict[str, Any]]:
+        """미사용이면 사용 처리하고 집계 갱신 -> (이번 호출로 사용 처리됐는지, 사용 정보)"""
+        return self.redeem_many([(code, store_id)], used_info)[0]
+
+    def get_many(self, codes: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """여러 코드의 사용 정보를 IN 조회로 한 번에 (사용되지 않은 코드는 결과에 없음)"""
+        codes = list(dict.fromkeys(codes))
+        found = {}
+        conn = self._connection()
+        for i in range(0, len(codes), SQLITE_MAX_PARAMS):
+            chunk = codes[i:i + SQLITE_MAX_PARAMS]
+            rows = conn.execute(
+                f"SELECT code, used_at, used_by, pass_id FROM redemptions "
+                f"WHERE code IN ({','.join('?' * len(chunk))})", chunk).fetchall()
+            found.update((row['code'], self._row_to_info(row)) for row in rows)
+        return found
+
+    def redeem_many(self, entries: Sequence[Tuple[str, Optional[str]]],
+                    used_info: Dict[str, Any]) -> List[Tuple[bool, Dict[str, Any]]]:
+        """
+        [(코드, 상점 ID)] 를 한 트랜잭션 안에서 사용 처리하고 집계 갱신 (입력 순서대로 결과)
+        같은 코드가 반복되면 두 번째부터는 이미 사용된 것으로 처리됩니다.
+        """
+        conn = self._connection()
+        used_at = used_info.get('used_at')
+        params = (used_at, used_info.get('used_by'), used_info.get('pass_id'))
+        redeemed = []
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for code, store_id in entries:
+                inserted = conn.execute(self.INSERT_SQL, (code,) + params + (store_id,)).rowcount == 1
+                if inserted:
+                    self._record_stats(conn, code, store_id, used_at)
+                redeemed.append(inserted)
+            existing = self.get_many(code for (code, _), ok in zip(entries, redeemed) if not ok)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return [(True, dict(used_info)) if ok else (False, existing.get(code, used_info))
+                for (code, _), ok in zip(entries, redeemed)]
+
+    def stats(self, store_id: Optional[str] = None, since_hour: Optional[str] = None) -> Dict[str, Any]:
+        """집계 테이블만 읽어 사용 통계 반환 (store_id 지정 시 해당 상점만, since_hour 이후 시간대만)"""
+        conn = self._connection()
+        where, params = ('WHERE store_id = ?', [store_id]) if store_id is not None else ('', [])
+        by_store = [dict(row) for row in conn.execute(
+            f'SELECT store_id, count, last_used_at FROM redemption_store_stats {where} '
+            f'ORDER BY count DESC, store_id', params)]
+        by_benefit = [dict(row) for row in conn.execute(
+            f'SELECT code, store_id, count, last_used_at FROM redemption_benefit_stats {where} '
+            f'ORDER BY count DESC, code', params)]
+        if since_hour is not None:
+            where = f"{where} AND hour >= ?" if where else 'WHERE hour >= ?'
+            params = params + [since_hour]
+        by_hour = [dict(row) for row in conn.execute(
+            f'SELECT hour, SUM(count) AS count FROM redemption_hourly_stats {where} '
+            f'GROUP BY hour ORDER BY hour', params)]
+        return _stats_result(by_store, by_benefit, by_hour)
+
+    def count(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM redemptions').fetchone()[0]
+
+    def import_entries(self, entries: Iterable[Tuple[str, Dict[str, Any]]],
+                       store_id_for: Optional[StoreIdResolver] = None) -> int:
+        """
+        (코드, 사용 정보) 목록을 한 트랜잭션으로 가져오기 (이미 있는 코드는 유지) -> 추가된 건수
+        추가된 기록은 집계에도 반영합니다 (상점 ID는 store_id_for 로 조회).
+        """
+        conn = self._connection()
+        imported = 0
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for code, info in entries:
+                store_id = store_id_for(code) if store_id_for else None
+                used_at = info.get('used_at') or ''
+                if conn.execute(self.INSERT_SQL, (code, used_at, info.get('used_by'),
+                                                  info.get('pass_id'), store_id)).rowcount == 1:
+                    self._record_stats(conn, code, store_id, used_at)
+                    imported += 1
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return imported
+
+    def import_json(self, json_path: str, store_id_for: Optional[StoreIdResolver] = None) -> int:
+        """기존 redemptions.json 내용을 가져오기"""
+        data = JsonRedemptionLedger(json_path).load()
+        return self.import_entries(data.get('used', {}).items(), store_id_for)
+
+    def rebuild_stats(self, store_id_for: Optional[StoreIdResolver] = None) -> int:
+        """
+        원장 전체로 집계 테이블을 다시 계산 (마이그레이션/복구용 관리 작업) -> 집계한 건수
+        store_id_for 를 주면 상점 ID가 비어 있는 기록도 채웁니다.
+        """
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute('SELECT code, used_at, store_id FROM redemptions').fetchall()
+            for table in ('redemption_store_stats', 'redemption_benefit_stats', 'redemption_hourly_stats'):
+                conn.execute(f'DELETE FROM {table}')
+            for row in rows:
+                store_id = row['store_id']
+                if not store_id and store_id_for:
+                    store_id = store_id_for(row['code'])
+                    if store_id:
+                        conn.execute('UPDATE redemptions SET store_id = ? WHERE code = ?',
+                                     (store_id, row['code']))
+                self._record_stats(conn, row['code'], store_id, row['used_at'])
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return len(rows)
+
+
+def legacy_json_path(storage_dir: str = STORAGE_DIR) -> str:
+    return os.path.join(storage_dir, LEGACY_JSON_FILENAME)
+
+
+def sqlite_path(storage_dir: str = STORAGE_DIR) -> str:
+    return os.path.join(storage_dir, SQLITE_FILENAME)
+
+
+def catalog_store_id_for(code: str) -> Optional[str]:
+    """카탈로그 코드 인덱스로 코드의 상점 ID 조회 (카탈로그에 없는 코드는 None)"""
+    from catalog import get_catalog
+    benefit = get_catalog().find_benefit_by_code(code)
+    return benefit.store_name if benefit else None
+
+
+def create_ledger(backend: str = REDEMPTION_BACKEND, storage_dir: str = STORAGE_DIR):
+    """백엔드 이름으로 원장 생성 (sqlite | json)"""
+    if backend == 'json':
+        return JsonRedemptionLedger(legacy_json_path(storage_dir))
+    if backend != 'sqlite':
+        print(f"[코드 원장] 알 수 없는 백엔드 '{backend}' - sqlite 사용")
+    try:
+        return SqliteRedemptionLedger(sqlite_path(storage_dir), legacy_json_path(storage_dir),
+                                      store_id_for=catalog_store_id_for)
+    except (sqlite3.Error, OSError) as e:
+        # 읽기 전용 파일 시스템 등 - 요청을 실패시키지 않고 JSON 원장으로 대체
+        print(f"[코드 원장] SQLite 원장을 열 수 없음 ({e}) - json 백엔드로 대체")
+        return JsonRedemptionLedger(legacy_json_path(storage_dir))
+
+
+# 프로세스 전역 원장 인스턴스
+_ledger_instance = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger():
+    """환경 변수(REDEMPTION_BACKEND, STORAGE_DIR)에 따른 원장 반환"""
+    global _ledger_instance
+    if _ledger_instance is None:
+        with _ledger_lock:
+            if _ledger_instance is None:
+                _ledger_instance = create_ledger()
+                print(f"[코드 원장] {_ledger_instance.backend} 백엔드 사용: {_ledger_instance.path}")
+    return _ledger_instance
@@ -6,9 +6,10 @@ import os
 from models import UserPrefs, PassType, Theme
 from services import (
     load_stores, load_benefits, load_themes,
-    load_pass_from_file, get_all_passes
+    load_pass_from_file, get_all_passes, get_user_passes_page, MAX_PASS_PAGE_SIZE
 )
 from pass_generator import generate_pass  # 패스 생성 모듈에서 임포트
+from pass_codec import compact_pass_data, expand_pass_data
 from chatbot import get_chatbot, clear_chatbot_session  # 채팅봇 모듈 임포트
 
 def login_required(f):
@@ -300,6 +301,7 @@ def register_routes(app):
                 
                 for pass_data in saved_passes:
                     try:
+                        pass_data = expand_pass_data(pass_data)
                         # 패스 데이터를 Pass 객체로 복원
                         pass_type = PassType(pass_data.get('pass_type', 'light'))
                         theme = Theme(pass_data.get('theme', 'food'))
@@ -377,6 +379,7 @@ def register_routes(app):
                 
                 for pass_data in saved_passes:
                     try:
+                        pass_data = expand_pass_data(pass_data)
                         # 패스 객체 복원 (위와 동일한 로직)
                         pass_type = PassType(pass_data.get('pass_type', 'light'))
                         theme = Theme(pass_data.get('theme', 'food'))
@@ -432,7 +435,7 @@ def register_routes(app):
                         )
                         
                         # 파일 시스템에 저장
-                        file_result = generator.save_pass_to_file(pass_obj)
+                        file_result = generator.save_pass_to_file(pass_obj, user_email)
                         print(f"[로그아웃] 파일 저장 결과 ({pass_data.get('pass_id')}): {file_result}")
                         
                     except Exception as file_save_error:
@@ -583,21 +586,100 @@ def register_routes(app):
 
     @app.route('/api/stores')
     def get_stores():
-        """매장 정보 반환 (좌표 포함)"""
+        """매장 정보 반환 (좌표 포함)
+        카탈로그 버전별로 미리 직렬화/압축된 본문을 사용하고 ETag/Last-Modified 조건부 요청을 지원합니다.
+        """
         try:
-            from services import load_stores_raw
-            stores_data = load_stores_raw()  # 원본 데이터 사용 (좌표 포함)
+            from catalog import get_catalog, peek_stores_payload
+            from http_payload import is_not_modified, make_payload_response
+            # 조건부 요청은 미리 만든 페이로드의 검증자로 먼저 확인 (카탈로그를 건드리지 않음)
+            cached = peek_stores_payload()
+            if cached is not None and is_not_modified(cached, request):
+                return make_payload_response(cached, request)
+            payload = get_catalog().stores_payload()  # 원본 데이터 사용 (좌표 포함)
+            return make_payload_response(payload, request)
+            
+        except Exception as e:
+            print(f"[오류] 매장 데이터 로드 실패: {e}")
+            return jsonify({
+                'error': f'매장 데이터를 불러올 수 없습니다: {str(e)}',
+                'success': False,
+                'stores': [],
+                'count': 0
+            }), 500
+
+    @app.route('/api/stores/nearby')
+    def get_nearby_stores():
+        """좌표 주변 매장 조회 (공간 인덱스 기반, 거리순 정렬)
+        - lat, lng: 기준 좌표 (필수)
+        - k: 최대 개수 (radius 없이 호출 시 기본 10, 최대 100)
+        - radius: 반경(미터, 최대 20000)
+        """
+        try:
+            lat = request.args.get('lat', type=float)
+            lng = request.args.get('lng', type=float)
+            if lat is None or lng is None or not (-90 <= lat <= 90) or not (-180 <= lng <= 180):
+                return jsonify({'success': False, 'error': '유효한 lat, lng 좌표가 필요합니다.'}), 400
+            
+            k = request.args.get('k', type=int)
+            radius = request.args.get('radius', type=float)
+            if radius is not None:
+                radius = max(0.0, min(radius, 20000.0))
+            if k is None and radius is None:
+                k = 10
+            if k is not None:
+                k = max(1, min(k, 100))
+            
+            from catalog import get_catalog
+            nearby = get_catalog().nearby_stores(lat, lng, k=k, radius_m=radius)
+            stores = [dict(store, distance_m=round(distance, 1)) for distance, store in nearby]
             
             return jsonify({
                 'success': True,
-                'stores': stores_data,
-                'count': len(stores_data)
+                'stores': stores,
+                'count': len(stores)
             })
             
         except Exception as e:
-            print(f"[오류] 매장 데이터 로드 실패: {e}")
+            print(f"[오류] 주변 매장 조회 실패: {e}")
             return jsonify({
-                'error': f'매장 데이터를 불러올 수 없습니다: {str(e)}',
+                'error': f'주변 매장을 조회할 수 없습니다: {str(e)}',
+                'success': False,
+                'stores': [],
+                'count': 0
+            }), 500
+
+    @app.route('/api/stores/search')
+    def search_stores():
+        """매장 검색 (상점명/설명/지역 n-gram 인덱스, 관련도순 정렬)
+        - q: 검색어 (필수, 공백으로 구분한 단어는 모두 포함해야 함)
+        - limit: 최대 개수 (기본 20, 최대 100)
+        """
+        try:
+            query = (request.args.get('q') or '').strip()
+            if not query:
+                return jsonify({'success': False, 'error': '검색어(q)가 필요합니다.'}), 400
+            if len(query) > 50:
+                return jsonify({'success': False, 'error': '검색어는 50자 이하로 입력해주세요.'}), 400
+            
+            limit = request.args.get('limit', default=20, type=int)
+            limit = max(1, min(limit, 100))
+            
+            from catalog import get_catalog
+            hits = get_catalog().search_stores(query, limit=limit)
+            stores = [dict(store, score=score) for score, store in hits]
+            
+            return jsonify({
+                'success': True,
+                'query': query,
+                'stores': stores,
+                'count': len(stores)
+            })
+            
+        except Exception as e:
+            print(f"[오류] 매장 검색 실패: {e}")
+            return jsonify({
+                'error': f'매장을 검색할 수 없습니다: {str(e)}',
                 'success': False,
                 'stores': [],
                 'count': 0
@@ -817,19 +899,9 @@ def register_routes(app):
                 return jsonify({'error': '조건에 맞는 패스를 생성할 수 없습니다.'}), 400
             
             # 혜택 데이터에서 store_id를 실제 상점명으로 변환
-            from services import load_stores_raw, load_benefits_raw
-            stores_raw = load_stores_raw()
-            benefits_raw = load_benefits_raw()
-            
-            store_id_to_name = {store['id']: store['name'] for store in stores_raw}
-            
-            # 혜택별 경제적 가치 맵핑
-            benefit_value_map = {}
-            for benefit_data in benefits_raw:
-                store_id = benefit_data.get('store_id', '')
-                desc = benefit_data.get('desc', '')
-                eco_value = benefit_data.get('eco_value', 3000)
-                benefit_value_map[f"{store_id}_{desc}"] = eco_value
+            from catalog import get_catalog
+            catalog = get_catalog()
+            store_id_to_name = catalog.store_name_by_id
             
             # AI가 생성한 상점별 선택 이유 가져오기
             store_reasons = getattr(pass_generator, 'store_reasons', {})
@@ -841,9 +913,8 @@ def register_routes(app):
             for benefit in generated_pass.benefits:
                 store_name = store_id_to_name.get(benefit.store_name, benefit.store_name)
                 
-                # 실제 경제적 가치 계산
-                key = f"{benefit.store_name}_{benefit.description}"
-                eco_value = benefit_value_map.get(key, 3000)
+                # 실제 경제적 가치 (카탈로그에 미리 계산된 값)
+                eco_value = catalog.eco_value_for(benefit.store_name, benefit.description)
                 
                 # AI가 제공한 상점별 선택 이유 가져오기
                 ai_reason = store_reasons.get(store_name, f'{store_name}에서 제공하는 사용자 맞춤 혜택입니다.')
@@ -920,7 +991,7 @@ def register_routes(app):
                     user_email = session.get('user_email', 'demo@jemulpogo.com')
                     
                     # 1. 세션에 즉시 저장
-                    pass_data = {
+                    pass_data = compact_pass_data({
                         'pass_id': generated_pass.pass_id,
                         'pass_type': generated_pass.pass_type.value,
                         'theme': generated_pass.theme.value,
@@ -930,7 +1001,7 @@ def register_routes(app):
                         'user_prefs': generated_pass.user_prefs.__dict__,
                         'user_email': user_email,
                         'saved_via': 'chatbot_production'
-                    }
+                    })
                     
                     # 세션에 저장
                     saved_passes = session.get('saved_passes', [])
@@ -959,7 +1030,7 @@ def register_routes(app):
                     try:
                         from pass_generator import get_pass_generator
                         generator = get_pass_generator()
-                        file_result = generator.save_pass_to_file(generated_pass)
+                        file_result = generator.save_pass_to_file(generated_pass, user_email)
                         print(f"[채팅봇 API] 파일 저장 결과: {file_result}")
                     except Exception as file_err:
                         print(f"[채팅봇 API] 파일 저장 실패: {file_err}")
@@ -970,7 +1041,7 @@ def register_routes(app):
             # 추가: 세션에 직접 패스 저장 (백업 보장) - 모든 환경에서 실행
             try:
                 user_email = session.get('user_email', 'demo@jemulpogo.com')
-                pass_data = {
+                pass_data = compact_pass_data({
                     'pass_id': generated_pass.pass_id,
                     'pass_type': generated_pass.pass_type.value,
                     'theme': generated_pass.theme.value,
@@ -980,7 +1051,7 @@ def register_routes(app):
                     'user_prefs': generated_pass.user_prefs.__dict__,
                     'user_email': user_email,
                     'saved_via': 'chatbot_direct'
-                }
+                })
                 
                 saved_passes = session.get('saved_passes', [])
                 saved_passes = [p for p in saved_passes if p.get('pass_id') != generated_pass.pass_id]
@@ -1203,19 +1274,10 @@ def register_routes(app):
                 return jsonify({'error': '조건에 맞는 패스를 생성할 수 없습니다.'}), 400
             
             # 혜택 데이터에서 store_id를 실제 상점명으로 변환
-            from services import load_stores_raw, load_benefits_raw, calculate_average_synergy_score
-            stores_raw = load_stores_raw()
-            benefits_raw = load_benefits_raw()
-            
-            store_id_to_name = {store['id']: store['name'] for store in stores_raw}
-            
-            # 혜택별 경제적 가치 맵핑
-            benefit_value_map = {}
-            for benefit_data in benefits_raw:
-                store_id = benefit_data.get('store_id', '')
-                desc = benefit_data.get('desc', '')
-                eco_value = benefit_data.get('eco_value', 3000)
-                benefit_value_map[f"{store_id}_{desc}"] = eco_value
+            from services import calculate_average_synergy_score
+            from catalog import get_catalog
+            catalog = get_catalog()
+            store_id_to_name = catalog.store_name_by_id
             
             # AI가 생성한 상점별 선택 이유 가져오기 (일반 패스 생성 API용)
             from pass_generator import get_pass_generator
@@ -1229,9 +1291,8 @@ def register_routes(app):
             for benefit in generated_pass.benefits:
                 store_name = store_id_to_name.get(benefit.store_name, benefit.store_name)
                 
-                # 실제 경제적 가치 계산
-                key = f"{benefit.store_name}_{benefit.description}"
-                eco_value = benefit_value_map.get(key, 3000)
+                # 실제 경제적 가치 (카탈로그에 미리 계산된 값)
+                eco_value = catalog.eco_value_for(benefit.store_name, benefit.description)
                 
                 # AI가 제공한 상점별 선택 이유 가져오기
                 ai_reason = store_reasons.get(store_name, f'{store_name}에서 제공하는 사용자 맞춤 혜택입니다.')
@@ -1302,7 +1363,7 @@ def register_routes(app):
                 )
                 
                 user_email = session.get('user_email', 'demo@jemulpogo.com')
-                pass_data = {
+                pass_data = compact_pass_data({
                     'pass_id': generated_pass.pass_id,
                     'pass_type': generated_pass.pass_type.value,
                     'theme': generated_pass.theme.value,
@@ -1312,7 +1373,7 @@ def register_routes(app):
                     'user_prefs': generated_pass.user_prefs.__dict__,
                     'user_email': user_email,
                     'saved_via': 'direct_api'
-                }
+                })
                 
                 saved_passes = session.get('saved_passes', [])
                 saved_passes = [p for p in saved_passes if p.get('pass_id') != generated_pass.pass_id]
@@ -1421,9 +1482,8 @@ def register_routes(app):
                 return jsonify({'error': '패스를 찾을 수 없습니다.'}), 404
             
             # 혜택 데이터에서 store_id를 실제 상점명으로 변환
-            from services import load_stores_raw
-            stores_raw = load_stores_raw()
-            store_id_to_name = {store['id']: store['name'] for store in stores_raw}
+            from catalog import get_catalog
+            store_id_to_name = get_catalog().store_name_by_id
             
             # 혜택 정보를 사용자 친화적으로 변환
             enhanced_benefits = []
@@ -1453,7 +1513,13 @@ def register_routes(app):
     @app.route('/api/user/passes')
     @login_required
     def get_user_passes_api():
-        """사용자의 모든 패스 조회"""
+        """사용자의 모든 패스 조회 (limit 이 있으면 cursor 기반 페이지 조회)"""
+        page_limit = None
+        if 'limit' in request.args:
+            try:
+                page_limit = max(1, min(int(request.args['limit']), MAX_PASS_PAGE_SIZE))
+            except ValueError:
+                return jsonify({'success': False, 'error': 'limit은 정수여야 합니다.'}), 400
         try:
             # 프로덕션 환경 감지
             is_production = (
@@ -1504,6 +1570,19 @@ def register_routes(app):
                                         print("[패스 조회 API] 쿠키에서 패스 복원 시도")
                                         restored_passes = []
                                         
+                                        # 프로덕션: 쿠키의 패스를 get_multi 한 번으로 먼저 로드 (없는 것만 개별 조회)
+                                        batch_loaded = {}
+                                        try:
+                                            try:
+                                                from src.datastore_service import load_passes_from_datastore
+                                            except ImportError:
+                                                from datastore_service import load_passes_from_datastore
+                                            batch_loaded = load_passes_from_datastore(
+                                                [pid for pid in cookie_pass_ids if isinstance(pid, str) and pid.strip()
+                                                 and not pid.startswith('test_')])
+                                        except Exception as batch_error:
+                                            print(f"[패스 조회 API] Datastore 일괄 로드 실패: {batch_error}")
+                                        
                                         for pass_id in cookie_pass_ids:
                                             # 유효한 pass_id인지 확인
                                             if not isinstance(pass_id, str) or not pass_id.strip():
@@ -1520,9 +1599,9 @@ def register_routes(app):
                                                 
                                             # 파일에서 패스 로드 시도
                                             try:
-                                                pass_obj = load_pass_from_file(pass_id)
+                                                pass_obj = batch_loaded.get(pass_id) or load_pass_from_file(pass_id)
                                                 if pass_obj:
-                                                    pass_data = {
+                                                    pass_data = compact_pass_data({
                                                         'pass_id': pass_obj.pass_id,
                                                         'pass_type': pass_obj.pass_type.value,
                                                         'theme': pass_obj.theme.value,
@@ -1532,7 +1611,7 @@ def register_routes(app):
                                                         'user_prefs': pass_obj.user_prefs.__dict__,
                                                         'user_email': user_email,
                                                         'saved_via': 'cookie_restored'
-                                                    }
+                                                    })
                                                     restored_passes.append(pass_data)
                                                     print(f"[패스 조회 API] 쿠키에서 패스 복원: {pass_id}")
                                             except Exception as restore_error:
@@ -1569,75 +1648,49 @@ def register_routes(app):
                     print(f"[패스 조회 API] 현재 세션 패스: {len(session_passes)}개")
                     
                     # Datastore에서 패스를 가져와 세션이 비어있거나 적을 때 복원
+                    # (쿼리 한 번으로 받은 엔티티 본문에서 바로 Pass 를 만든다 - 패스별 추가 조회 없음)
                     try:
-                        from src.datastore_service import get_user_passes_from_datastore
+                        from src.datastore_service import load_user_passes_from_datastore
                     except ImportError:
-                        from datastore_service import get_user_passes_from_datastore
+                        from datastore_service import load_user_passes_from_datastore
                     
                     print(f"[패스 조회 API] Datastore 조회 시작 - 사용자: {user_email}")
-                    datastore_passes_raw = get_user_passes_from_datastore(user_email)
-                    print(f"[패스 조회 API] Datastore에서 발견: {len(datastore_passes_raw)}개")
-                    
-                    # 🚨 디버깅: Datastore 데이터 상세 출력
-                    if datastore_passes_raw:
-                        print(f"[패스 조회 API] 🔍 Datastore 첫 번째 패스 샘플: {datastore_passes_raw[0] if datastore_passes_raw else 'None'}")
+                    datastore_pass_objs = load_user_passes_from_datastore(user_email)
+                    print(f"[패스 조회 API] Datastore에서 발견: {len(datastore_pass_objs)}개")
                     
                     # 조건을 완화: 세션에 패스가 없으면 항상 복원 시도
-                    if len(session_passes) == 0 or len(session_passes) < len(datastore_passes_raw):
+                    if len(session_passes) == 0 or len(session_passes) < len(datastore_pass_objs):
                         print("[패스 조회 API] Datastore에서 세션으로 패스 복원 시작")
                         
                         # Datastore의 패스를 세션 형식으로 변환
+                        session_pass_ids = {sp.get('pass_id') for sp in session_passes}
                         restored_session_passes = []
-                        for i, dp in enumerate(datastore_passes_raw):
-                            pass_id = dp.get('pass_id', '')
-                            print(f"[패스 조회 API] 🔍 Datastore 패스 #{i+1}: {pass_id}")
-                            
-                            if not pass_id.startswith('test_') and pass_id:  # 테스트 패스 제외 및 유효성 확인
-                                
-                                # Datastore 데이터를 세션 형식으로 안전하게 변환
-                                try:
-                                    # Datastore에서 온 데이터는 get_user_passes_from_datastore의 반환 형식
-                                    # 이것을 세션 형식으로 다시 변환해야 함
-                                    
-                                    # 실제 패스 객체가 필요한 경우 파일이나 원본 데이터에서 로드
-                                    try:
-                                        from src.datastore_service import load_pass_from_datastore
-                                    except ImportError:
-                                        from datastore_service import load_pass_from_datastore
-                                    
-                                    print(f"[패스 조회 API] 🔍 패스 객체 로드 시도: {pass_id}")
-                                    pass_obj = load_pass_from_datastore(pass_id)
-                                    
-                                    if pass_obj:
-                                        # Pass 객체를 세션 형식으로 변환
-                                        pass_data = {
-                                            'pass_id': pass_obj.pass_id,
-                                            'pass_type': pass_obj.pass_type.value,
-                                            'theme': pass_obj.theme.value,
-                                            'created_at': pass_obj.created_at,
-                                            'stores': [store.__dict__ for store in pass_obj.stores],
-                                            'benefits': [benefit.__dict__ for benefit in pass_obj.benefits],
-                                            'user_prefs': pass_obj.user_prefs.__dict__,
-                                            'user_email': user_email,
-                                            'saved_via': 'datastore_restored'
-                                        }
-                                        
-                                        # 세션에 이미 있는 패스가 아닌 경우만 추가
-                                        if not any(sp.get('pass_id') == pass_id for sp in session_passes):
-                                            restored_session_passes.append(pass_data)
-                                            print(f"[패스 조회 API] ✅ 패스 복원 성공: {pass_id}")
-                                        else:
-                                            print(f"[패스 조회 API] ⚠️ 패스 이미 존재: {pass_id}")
-                                    else:
-                                        print(f"[패스 조회 API] ❌ 패스 객체 로드 실패: {pass_id}")
-                                        
-                                except Exception as convert_error:
-                                    print(f"[패스 조회 API] ❌ Datastore 패스 변환 실패 ({pass_id}): {convert_error}")
-                                    import traceback
-                                    print(f"[패스 조회 API] 변환 오류 세부사항: {traceback.format_exc()}")
-                                    continue
-                            else:
+                        for pass_obj in datastore_pass_objs:
+                            pass_id = pass_obj.pass_id
+                            if not pass_id or pass_id.startswith('test_'):  # 테스트 패스 제외 및 유효성 확인
                                 print(f"[패스 조회 API] ⚠️ 패스 건너뛰기: {pass_id} (테스트 패스이거나 빈 ID)")
+                                continue
+                            # 세션에 이미 있는 패스가 아닌 경우만 추가
+                            if pass_id in session_pass_ids:
+                                print(f"[패스 조회 API] ⚠️ 패스 이미 존재: {pass_id}")
+                                continue
+                            try:
+                                # Pass 객체를 세션 형식으로 변환
+                                pass_data = compact_pass_data({
+                                    'pass_id': pass_obj.pass_id,
+                                    'pass_type': pass_obj.pass_type.value,
+                                    'theme': pass_obj.theme.value,
+                                    'created_at': pass_obj.created_at,
+                                    'stores': [store.__dict__ for store in pass_obj.stores],
+                                    'benefits': [benefit.__dict__ for benefit in pass_obj.benefits],
+                                    'user_prefs': pass_obj.user_prefs.__dict__,
+                                    'user_email': user_email,
+                                    'saved_via': 'datastore_restored'
+                                })
+                                restored_session_passes.append(pass_data)
+                                print(f"[패스 조회 API] ✅ 패스 복원 성공: {pass_id}")
+                            except Exception as convert_error:
+                                print(f"[패스 조회 API] ❌ Datastore 패스 변환 실패 ({pass_id}): {convert_error}")
                         
                         if restored_session_passes:
                             combined_passes = session_passes + restored_session_passes
@@ -1668,7 +1721,15 @@ def register_routes(app):
             # 테스트 패스 자동 생성 로직 제거 (더 이상 사용하지 않음)
             # 실제 패스가 없는 경우에는 빈 상태를 유지하여 사용자가 새로 생성하도록 함
             
-            user_passes = get_all_passes()
+            page = None
+            if page_limit is not None:
+                try:
+                    page = get_user_passes_page(page_limit, request.args.get('cursor') or None)
+                except ValueError as cursor_error:
+                    return jsonify({'success': False, 'error': str(cursor_error)}), 400
+                user_passes = page['passes']
+            else:
+                user_passes = get_all_passes()
             
             # 기존 테스트 패스 정리 (프로덕션에서 한 번만 실행)
             try:
@@ -1721,6 +1782,9 @@ def register_routes(app):
                     'storage_types': list(set([p.get('source', 'unknown') for p in user_passes]))
                 }
             }
+            if page is not None:
+                response_data['next_cursor'] = page['next_cursor']
+                response_data['has_more'] = page['has_more']
             
             response = jsonify(response_data)
             
@@ -1809,6 +1873,7 @@ def register_routes(app):
                     from src.datastore_service import get_user_passes_from_datastore, get_datastore_client
                 except ImportError:
                     from datastore_service import get_user_passes_from_datastore, get_datastore_client
+                from datastore_client import get_client_cache
                 
                 # 데이터스토어 클라이언트 확인
                 client = get_datastore_client()
@@ -1820,6 +1885,7 @@ def register_routes(app):
                 return jsonify({
                     'success': True,
                     'datastore_client': client_status,
+                    'datastore_client_stats': get_client_cache().stats(),
                     'user_email': user_email,
                     'passes_count': len(datastore_passes),
                     'passes': datastore_passes[:3] if datastore_passes else [],  # 최대 3개만 미리보기
@@ -1843,6 +1909,36 @@ def register_routes(app):
                 'error': f'디버그 API 실행 실패: {str(e)}'
             })
 
+    @app.route('/api/debug/pass-cache', methods=['GET'])
+    @login_required
+    def debug_pass_cache():
+        """패스 조회 캐시 적중률/크기, write-behind 대기열, Datastore 클라이언트 재사용 상태 확인 (디버그용, 워커 프로세스별 값)"""
+        from pass_cache import get_pass_cache
+        from write_behind import get_write_behind
+        from datastore_client import get_client_cache
+        return jsonify({'success': True, 'pid': os.getpid(), 'cache': get_pass_cache().stats(),
+                        'write_behind': get_write_behind().stats(),
+                        'datastore_client': get_client_cache().stats()})
+
+    @app.route('/api/cron/sweep-expired-passes', methods=['GET'])
+    def cron_sweep_expired_passes():
+        """만료 패스를 콜드 아카이브로 옮기기 (cron.yaml 에서 매일 호출)"""
+        is_production = (
+            os.environ.get('GAE_ENV', '').startswith('standard') or
+            os.environ.get('SERVER_SOFTWARE', '').startswith('Google App Engine/') or
+            'appspot.com' in os.environ.get('GOOGLE_CLOUD_PROJECT', '')
+        )
+        # App Engine 은 외부 요청의 X-Appengine-Cron 헤더를 제거하므로 cron 요청만 이 헤더를 가진다
+        if is_production and request.headers.get('X-Appengine-Cron') != 'true':
+            return jsonify({'success': False, 'error': 'cron 요청만 허용됩니다.'}), 403
+        try:
+            from pass_archive import sweep_expired_passes
+            result = sweep_expired_passes(dry_run=request.args.get('dry_run') == '1')
+            return jsonify({'success': True, **result})
+        except Exception as e:
+            print(f"[패스 아카이브] 정리 실패: {e}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+
     @app.route('/api/benefits/redeem', methods=['POST'])
     @login_required
     def redeem_benefit_code():
@@ -1860,6 +1956,87 @@ def register_routes(app):
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    def _batch_codes_from_request():
+        """일괄 요청 본문에서 코드 목록 추출 -> (코드 목록, 오류 응답)"""
+        from services import MAX_BATCH_CODES
+        data = request.get_json() or {}
+        codes = data.get('codes')
+        if not isinstance(codes, list) or not codes:
+            return None, (jsonify({'success': False, 'error': '코드 목록(codes)이 필요합니다.'}), 400)
+        if len(codes) > MAX_BATCH_CODES:
+            return None, (jsonify({'success': False,
+                                   'error': f'한 번에 최대 {MAX_BATCH_CODES}개까지 처리할 수 있습니다.'}), 400)
+        return [str(code or '').strip().upper() for code in codes], None
+
+    @app.route('/api/benefits/validate/batch', methods=['POST'])
+    def validate_benefit_codes_batch():
+        """여러 혜택 코드를 한 번에 확인 (가맹점 단말 정산용)"""
+        try:
+            codes, error = _batch_codes_from_request()
+            if error:
+                return error
+            from services import validate_redemption_codes
+            results = validate_redemption_codes(codes)
+            return jsonify({
+                'success': True,
+                'results': results,
+                'summary': {
+                    'total': len(results),
+                    'valid': sum(1 for r in results if r['valid']),
+                    'used': sum(1 for r in results if r['used']),
+                }
+            })
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    @app.route('/api/benefits/redeem/batch', methods=['POST'])
+    @login_required
+    def redeem_benefit_codes_batch():
+        """여러 혜택 코드를 한 번에 사용 처리 (원장 트랜잭션 1회, 코드별 결과 반환)"""
+        try:
+            codes, error = _batch_codes_from_request()
+            if error:
+                return error
+            pass_id = ((request.get_json() or {}).get('pass_id') or '').strip() or None
+            from services import redeem_codes
+            results = redeem_codes(codes, pass_id, session.get('user_email'))
+            return jsonify({
+                'success': True,
+                'results': results,
+                'summary': {
+                    'total': len(results),
+                    'redeemed': sum(1 for r in results if r.get('success') and not r['already_used']),
+                    'already_used': sum(1 for r in results if r.get('already_used')),
+                    'invalid': sum(1 for r in results if not r.get('success')),
+                }
+            })
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+    @app.route('/api/merchant/redemption-stats')
+    @login_required
+    def merchant_redemption_stats():
+        """가맹점 대시보드: 상점/혜택/시간대별 코드 사용 집계 (원장 전체를 읽지 않음, 관리자/해당 가맹점만)"""
+        try:
+            store_id = (request.args.get('store_id') or '').strip() or None
+            try:
+                hours = int(request.args.get('hours', 24))
+            except ValueError:
+                return jsonify({'success': False, 'error': 'hours는 숫자여야 합니다.'}), 400
+            hours = max(1, min(hours, 24 * 31))
+            from services import get_redemption_stats, resolve_stats_store
+            # 쿠키의 이메일은 위조할 수 있으므로 세션의 이메일로만 권한 확인
+            try:
+                store_id = resolve_stats_store(session.get('user_email'), store_id)
+            except PermissionError as e:
+                return jsonify({'success': False, 'error': str(e)}), 403
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+            stats = get_redemption_stats(store_id=store_id, hours=hours)
+            return jsonify({'success': True, **stats})
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
     @app.route('/api/directions', methods=['POST'])
     def get_directions():
         """두 지점 간의 최적 경로를 반환 (도보/대중교통 통합)"""
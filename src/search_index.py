@@ -0,0 +1,172 @@
+"""
+상점 전문 검색 인덱스
+상점명/설명/지역을 글자 단위 n-gram(1글자, 2글자) 역색인으로 만들어 부분 문자열 검색을 처리합니다.
+점수 계산은 문서별 반복 없이 집합 연산(분할 정제)으로 처리해 결과가 많아도 빠르게 상위 N개를 고릅니다.
+"""
+import heapq
+import re
+from typing import Dict, FrozenSet, List, Sequence, Set, Tuple
+
+# 검색 대상 필드와 가중치 (상점명 일치가 가장 중요)
+SEARCH_FIELDS: Tuple[Tuple[str, int], ...] = (('name', 3), ('area', 2), ('desc', 1))
+# 상점명 단어가 검색어로 시작하거나 상점명 전체가 검색어와 같을 때 가점
+NAME_PREFIX_BONUS = 2
+NAME_EXACT_BONUS = 5
+
+_NON_WORD = re.compile(r'[^0-9a-z가-힣一-鿿]+')
+_EMPTY: FrozenSet[int] = frozenset()
+
+
+def normalize_text(text: str) -> str:
+    """검색용 정규화: 소문자, 한글/영숫자/한자 외 문자는 공백으로"""
+    return _NON_WORD.sub(' ', (text or '').lower()).strip()
+
+
+def _grams(text: str) -> Set[str]:
+    """텍스트의 1글자, 2글자 n-gram"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+def _query_grams(term: str) -> Set[str]:
+    """검색어 후보 조회용 n-gram (2글자 이상이면 2-gram만 사용해 후보를 좁힘)"""
+    if len(term) == 1:
+        return {term}
+    return {term[i:i + 2] for i in range(len(term) - 1)}
+
+
+class _FieldIndex:
+    """
+    필드 하나의 n-gram 역색인
+    같은 값을 가진 문서가 많으므로 (예: 지역) 서로 다른 값 단위로 색인하고 값 -> 문서 집합을 따로 둡니다.
+    값은 공백을 제거해 비교하므로 띄어쓰기 없이 검색해도 일치합니다.
+    """
+
+    def __init__(self, texts: Sequence[str], word_prefix: bool = False):
+        value_ids: Dict[str, int] = {}
+        self._compact: List[str] = []
+        self._words: List[List[str]] = []
+        docs: List[Set[int]] = []
+        for doc_id, text in enumerate(texts):
+            value_id = value_ids.get(text)
+            if value_id is None:
+                value_id = value_ids[text] = len(self._compact)
+                self._compact.append(text.replace(' ', ''))
+                self._words.append(text.split() if word_prefix else [])
+                docs.append(set())
+            docs[value_id].add(doc_id)
+        self._docs: List[FrozenSet[int]] = [frozenset(d) for d in docs]
+
+        grams: Dict[str, Set[int]] = {}
+        starts: Dict[str, Set[int]] = {}
+        for value_id, compact in enumerate(self._compact):
+            for gram in _grams(compact):
+                grams.setdefault(gram, set()).add(value_id)
+            # 단어 시작 n-gram (접두사 검색용)
+            for word in self._words[value_id]:
+                for gram in (word[:1], word[:2]):
+                    starts.setdefault(gram, set()).add(value_id)
+        self._grams = {gram: frozenset(ids) for gram, ids in grams.items()}
+        # 1~2글자 검색어는 n-gram 자체가 검색어이므로 문서 집합을 미리 펼쳐 둔다
+        self._gram_docs = {gram: self._to_docs(ids) for gram, ids in self._grams.items()}
+        self._start_docs = {gram: self._to_docs(ids) for gram, ids in starts.items()}
+
+    def _to_docs(self, value_ids) -> FrozenSet[int]:
+        if not value_ids:
+            return _EMPTY
+        return frozenset().union(*(self._docs[v] for v in value_ids))
+
+    def match(self, term: str) -> Tuple[FrozenSet[int], FrozenSet[int]]:
+        """
+        (값에 검색어가 포함된 문서, 단어가 검색어로 시작하는 문서)
+        2글자 이하는 색인 조회만으로 정확하고, 그 이상은 n-gram 교집합으로 좁힌 후보 값만 검증합니다.
+        """
+        if len(term) <= 2:
+            return self._gram_docs.get(term, _EMPTY), self._start_docs.get(term, _EMPTY)
+        grams = sorted(_query_grams(term), key=lambda g: len(self._grams.get(g, ())))
+        values = self._grams.get(grams[0], _EMPTY)
+        for gram in grams[1:]:
+            if not values:
+                break
+            values = values & self._grams.get(gram, _EMPTY)
+        values = [v for v in values if term in self._compact[v]]
+        prefixed = [v for v in values if any(w.startswith(term) for w in self._words[v])]
+        return self._to_docs(values), self._to_docs(prefixed)
+
+
+class StoreSearchIndex:
+    """
+    n-gram 역색인 기반 상점 검색
+    문서 번호는 카탈로그의 stores_raw 순서와 같습니다.
+    """
+
+    def __init__(self, stores_raw: Sequence[Dict]):
+        self._size = len(stores_raw)
+        names = [normalize_text(str(s.get('name') or '')) for s in stores_raw]
+        self._fields: Dict[str, _FieldIndex] = {'name': _FieldIndex(names, word_prefix=True)}
+        for field, _ in SEARCH_FIELDS:
+            if field != 'name':
+                self._fields[field] = _FieldIndex([normalize_text(str(s.get(field) or ''))
+                                                   for s in stores_raw])
+        exact: Dict[str, Set[int]] = {}
+        for doc_id, name in enumerate(names):
+            exact.setdefault(name.replace(' ', ''), set()).add(doc_id)
+        self._exact_name = {name: frozenset(ids) for name, ids in exact.items()}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[int, int]]:
+        """
+        검색어로 상점 검색 -> [(점수, 문서 번호)] 점수 높은 순 (같으면 카탈로그 순서)
+        공백으로 구분한 여러 단어는 모두 포함된 상점만 반환합니다 (AND).
+        점수 = 단어별로 포함된 필드 가중치 합 + 상점명 접두사/완전 일치 가점
+        """
+        terms = normalize_text(query).split()
+        if not terms or limit <= 0:
+            return []
+
+        # 단어별로 (문서 집합, 가중치) 특징을 모으고 일치 문서는 교집합
+        features: List[Tuple[FrozenSet[int], int]] = []
+        matched = None
+        for term in terms:
+            term_docs: FrozenSet[int] = _EMPTY
+            for field, weight in SEARCH_FIELDS:
+                docs, prefixed = self._fields[field].match(term)
+                features.append((docs, weight))
+                if field == 'name':
+                    features.append((prefixed, NAME_PREFIX_BONUS))
+                term_docs = term_docs | docs
+            matched = term_docs if matched is None else matched & term_docs
+            if not matched:
+                return []
+        features.append((self._exact_name.get(''.join(terms), _EMPTY), NAME_EXACT_BONUS))
+
+        # 분할 정제: 특징마다 각 블록을 (포함, 미포함)으로 나누며 점수 누적
+        blocks: List[Tuple[int, FrozenSet[int]]] = [(0, matched)]
+        for docs, weight in features:
+            if not docs:
+                continue
+            refined = []
+            for score, block in blocks:
+                inside = block & docs
+                if inside:
+                    refined.append((score + weight, inside))
+                    if len(inside) < len(block):
+                        refined.append((score, block - inside))
+                else:
+                    refined.append((score, block))
+            blocks = refined
+
+        # 점수 높은 블록부터 문서 번호순으로 limit 개까지
+        by_score: Dict[int, List[FrozenSet[int]]] = {}
+        for score, block in blocks:
+            by_score.setdefault(score, []).append(block)
+        hits: List[Tuple[int, int]] = []
+        for score in sorted(by_score, reverse=True):
+            docs = frozenset().union(*by_score[score])
+            hits.extend((score, doc_id) for doc_id in heapq.nsmallest(limit - len(hits), docs))
+            if len(hits) >= limit:
+                break
+        return hits
@@ -2,53 +2,32 @@
 비즈니스 로직 및 서비스 (패스 생성 제외)
 패스 생성 기능은 pass_generator.py 모듈로 분리되었습니다.
 """
+import base64
 import json
 import os
-from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Optional, Any
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Any, Tuple
 from dotenv import load_dotenv
 from models import Store, Benefit, UserPrefs, Pass, PassType, Theme
-import hashlib
+from catalog import get_catalog, stable_redemption_code
+from store_table import synergy_score
+from redemption_ledger import get_ledger
+from pass_cache import get_pass_cache
+from pass_index import get_pass_index, summarize_pass, summarize_pass_data
+from pass_storage import find_pass_file, read_pass_file
+from pass_archive import load_archived_pass_data
+from pass_codec import compact_pass_data, expand_pass_data
+from pass_summary import canonical_timestamp, summary_list_entry
+from write_behind import PASS_WRITE_BEHIND, get_write_behind
 from pass_generator import generate_pass  # 패스 생성 모듈 임포트
 
 # 환경 변수 로드
 load_dotenv()
 
 def load_stores() -> List[Store]:
-    """상점 데이터 로드"""
+    """상점 데이터 로드 (프로세스 공유 카탈로그 사용)"""
     try:
-        stores_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'stores.json')
-        with open(stores_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            # JSON 구조가 {"stores": [...]} 형태인 경우
-            if 'stores' in data:
-                stores_data = data['stores']
-            else:
-                stores_data = data
-            
-            stores = []
-            for store_data in stores_data:
-                # JSON 필드를 Store 모델에 맞게 변환
-                store = Store(
-                    name=store_data.get('name', ''),
-                    category=store_data.get('category', ''),
-                    address=store_data.get('address', ''),
-                    phone=store_data.get('phone', ''),
-                    description=store_data.get('desc', store_data.get('description', '')),
-                    rating=float(store_data.get('rating', 0)),
-                    price_range=store_data.get('price_range', '보통'),
-                    opening_hours=store_data.get('opening_hours', '09:00-21:00'),
-                    menu_highlights=store_data.get('menu_highlights', []),
-                    location=store_data.get('area', store_data.get('location', '')),
-                    latitude=store_data.get('latitude'),
-                    longitude=store_data.get('longitude'),
-                    image_url=store_data.get('image_url', '')
-                )
-                stores.append(store)
-            return stores
-    except FileNotFoundError:
-        print("stores.json 파일을 찾을 수 없습니다.")
-        return []
+        return list(get_catalog().stores)
     except Exception as e:
         print(f"상점 데이터 로드 중 오류: {e}")
         return []
@@ -56,49 +35,15 @@ def load_stores() -> List[Store]:
 def load_stores_raw() -> List[Dict]:
     """상점 원본 데이터 로드 (ID 포함)"""
     try:
-        stores_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'stores.json')
-        with open(stores_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            # JSON 구조가 {"stores": [...]} 형태인 경우
-            if 'stores' in data:
-                return data['stores']
-            else:
-                return data
-    except FileNotFoundError:
-        print("stores.json 파일을 찾을 수 없습니다.")
-        return []
+        return list(get_catalog().stores_raw)
     except Exception as e:
         print(f"상점 데이터 로드 중 오류: {e}")
         return []
 
 def load_benefits() -> List[Benefit]:
-    """혜택 데이터 로드"""
+    """혜택 데이터 로드 (프로세스 공유 카탈로그 사용)"""
     try:
-        benefits_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'benefits.json')
-        with open(benefits_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            # JSON 구조가 {"benefits": [...]} 형태인 경우
-            if 'benefits' in data:
-                benefits_data = data['benefits']
-            else:
-                benefits_data = data
-            
-            benefits = []
-            for benefit_data in benefits_data:
-                # JSON 필드를 Benefit 모델에 맞게 변환
-                benefit = Benefit(
-                    store_name=benefit_data.get('store_id', ''),  # store_id를 store_name으로 사용
-                    benefit_type=benefit_data.get('benefit_type', '할인'),
-                    description=benefit_data.get('desc', benefit_data.get('description', '')),
-                    discount_rate=benefit_data.get('discount_rate'),
-                    valid_until=benefit_data.get('valid_until'),
-                    terms=benefit_data.get('terms')
-                )
-                benefits.append(benefit)
-            return benefits
-    except FileNotFoundError:
-        print("benefits.json 파일을 찾을 수 없습니다.")
-        return []
+        return list(get_catalog().benefits)
     except Exception as e:
         print(f"혜택 데이터 로드 중 오류: {e}")
         return []
@@ -106,112 +51,175 @@ def load_benefits() -> List[Benefit]:
 def load_themes() -> Dict[str, Any]:
     """테마 데이터 로드"""
     try:
-        themes_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'themes.json')
-        with open(themes_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print("themes.json 파일을 찾을 수 없습니다.")
-        return {}
+        return dict(get_catalog().themes)
     except Exception as e:
         print(f"테마 데이터 로드 중 오류: {e}")
         return {}
 
 def _stable_redemption_code(source: str) -> str:
     """입력 문자열 기반으로 안정적인 8자 코드 생성(대문자+숫자), XXXX-XXXX 형식"""
-    digest = hashlib.sha1(source.encode('utf-8')).hexdigest().upper()
-    # 영숫자만 사용, 앞 8자
-    code = ''.join(ch for ch in digest if ch.isalnum())[:8]
-    return f"{code[:4]}-{code[4:8]}"
+    return stable_redemption_code(source)
 
 
-def _attach_redemption_codes(benefits: List[Benefit]) -> None:
-    """각 혜택에 전역 고정 특수코드 부여(입력 데이터 기반 안정적 생성)"""
-    for b in benefits:
-        # store_name에는 현재 store_id가 들어있음(load_benefits 구현 참고)
-        source = f"{b.store_name}|{b.benefit_type}|{b.description}"
-        b.redemption_code = _stable_redemption_code(source)
-
-
-def _redemptions_path() -> str:
-    return os.path.join(os.path.dirname(__file__), '..', 'storage', 'redemptions.json')
-
-
-def load_redemptions() -> Dict[str, Any]:
-    """전역 혜택 코드 사용 내역 로드"""
-    path = _redemptions_path()
-    if not os.path.exists(path):
-        return {"used": {}}  # { code: { used_at, used_by, pass_id? }}
-    try:
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            if 'used' not in data:
-                data = {"used": {}}
-            return data
-    except Exception:
-        return {"used": {}}
-
-
-def save_redemptions(data: Dict[str, Any]) -> bool:
-    """전역 혜택 코드 사용 내역 저장"""
-    try:
-        path = _redemptions_path()
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        return True
-    except Exception:
-        return False
+def _benefit_summary(benefit: Benefit) -> Dict[str, Any]:
+    return {
+        "store_name": benefit.store_name,
+        "benefit_type": benefit.benefit_type,
+        "description": benefit.description,
+    }
 
 
 def validate_redemption_code(code: str) -> Dict[str, Any]:
     """코드 유효성 및 사용 여부 확인"""
-    all_benefits = load_benefits()
-    # 코드 부여
-    _attach_redemption_codes(all_benefits)
-    benefit_map = {b.redemption_code: b for b in all_benefits if b.redemption_code}
+    # 카탈로그 로드 시 만들어 둔 코드 인덱스 조회 (O(1))
+    benefit = get_catalog().find_benefit_by_code(code)
     info = {"valid": False, "used": False}
-    if code not in benefit_map:
+    if benefit is None:
         return info
-    redemptions = load_redemptions()
+    # 사용 내역은 하이픈 포함 정규 코드 기준으로 관리
+    used_info = get_ledger().get(benefit.redemption_code)
     info.update({
         "valid": True,
-        "used": code in redemptions.get('used', {}),
-        "benefit": {
-            "store_name": benefit_map[code].store_name,
-            "benefit_type": benefit_map[code].benefit_type,
-            "description": benefit_map[code].description,
-        }
+        "used": used_info is not None,
+        "benefit": _benefit_summary(benefit)
     })
-    if info["used"]:
-        info["used_info"] = redemptions['used'][code]
+    if used_info is not None:
+        info["used_info"] = used_info
     return info
 
 
 def redeem_code(code: str, pass_id: Optional[str], user_email: Optional[str]) -> Dict[str, Any]:
     """코드를 사용 처리(전역 1회성)
-    - code가 유효하면 사용 처리
-    - 이미 사용된 경우 used=true 반환
+    - code가 유효하면 사용 처리 (원장에서 원자적으로 "미사용이면 사용")
+    - 이미 사용된 경우 used=true, already_used=true 와 먼저 사용한 기록 반환
     """
-    result = validate_redemption_code(code)
-    if not result.get('valid'):
+    benefit = get_catalog().find_benefit_by_code(code)
+    if benefit is None:
         return {"success": False, "error": "invalid_code"}
-    redemptions = load_redemptions()
-    if code in redemptions.get('used', {}):
-        return {"success": True, "used": True, "used_info": redemptions['used'][code]}
-    # 사용 처리
-    redemptions.setdefault('used', {})[code] = {
+    # 같은 원장 트랜잭션에서 상점/혜택/시간대별 집계도 갱신
+    redeemed, used_info = get_ledger().redeem(benefit.redemption_code, {
         "used_at": datetime.now().isoformat(),
         "used_by": user_email,
         "pass_id": pass_id,
-    }
-    save_redemptions(redemptions)
-    return {"success": True, "used": True}
+    }, store_id=benefit.store_name)
+    if not redeemed:
+        return {"success": True, "used": True, "already_used": True, "used_info": used_info}
+    return {"success": True, "used": True, "already_used": False}
+
+# 일괄 처리 한 번에 받을 수 있는 최대 코드 수
+MAX_BATCH_CODES = 200
+
+
+def _resolve_codes(codes: List[str]) -> List[Optional[Benefit]]:
+    """입력 코드 목록을 한 번에 혜택으로 변환 (유효하지 않은 코드는 None)"""
+    catalog = get_catalog()
+    return [catalog.find_benefit_by_code(code) for code in codes]
+
+
+def validate_redemption_codes(codes: List[str]) -> List[Dict[str, Any]]:
+    """여러 코드를 한 번에 확인 (원장 조회 1회) -> 입력 순서대로 코드별 결과"""
+    benefits = _resolve_codes(codes)
+    used = get_ledger().get_many(b.redemption_code for b in benefits if b is not None)
+    results = []
+    for code, benefit in zip(codes, benefits):
+        if benefit is None:
+            results.append({"code": code, "valid": False, "used": False})
+            continue
+        result = {"code": code, "valid": True, "used": benefit.redemption_code in used,
+                  "benefit": _benefit_summary(benefit)}
+        if result["used"]:
+            result["used_info"] = used[benefit.redemption_code]
+        results.append(result)
+    return results
+
+
+def redeem_codes(codes: List[str], pass_id: Optional[str], user_email: Optional[str]) -> List[Dict[str, Any]]:
+    """여러 코드를 한 원장 트랜잭션으로 사용 처리 -> 입력 순서대로 코드별 결과"""
+    benefits = _resolve_codes(codes)
+    valid = [(b.redemption_code, b.store_name) for b in benefits if b is not None]
+    outcomes = iter(get_ledger().redeem_many(valid, {
+        "used_at": datetime.now().isoformat(),
+        "used_by": user_email,
+        "pass_id": pass_id,
+    }) if valid else [])
+    results = []
+    for code, benefit in zip(codes, benefits):
+        if benefit is None:
+            results.append({"code": code, "success": False, "error": "invalid_code"})
+            continue
+        redeemed, used_info = next(outcomes)
+        result = {"code": code, "success": True, "used": True, "already_used": not redeemed,
+                  "benefit": _benefit_summary(benefit)}
+        if not redeemed:
+            result["used_info"] = used_info
+        results.append(result)
+    return results
+
+
+def _parse_email_list(value: str) -> frozenset:
+    return frozenset(email.strip().lower() for email in value.split(',') if email.strip())
+
+def _parse_merchant_accounts(value: str) -> Dict[str, frozenset]:
+    """'owner@x.com:S001;other@x.com:S002,S003' -> {이메일: 상점 ID 집합}"""
+    accounts: Dict[str, frozenset] = {}
+    for entry in value.split(';'):
+        email, _, store_ids = entry.partition(':')
+        if email.strip() and store_ids.strip():
+            accounts[email.strip().lower()] = frozenset(s.strip() for s in store_ids.split(',') if s.strip())
+    return accounts
+
+# 가맹점 대시보드 접근 권한
+# ADMIN_EMAILS: 모든 상점 통계를 볼 수 있는 관리자 / MERCHANT_ACCOUNTS: 가맹점 계정별 자기 상점 ID
+ADMIN_EMAILS = _parse_email_list(os.getenv('ADMIN_EMAILS', ''))
+MERCHANT_ACCOUNTS = _parse_merchant_accounts(os.getenv('MERCHANT_ACCOUNTS', ''))
+
+def resolve_stats_store(user_email: Optional[str], store_id: Optional[str]) -> Optional[str]:
+    """
+    사용자가 조회할 수 있는 통계 범위 -> 조회할 상점 ID (None 이면 전체, 관리자만)
+    관리자는 모든 상점, 가맹점 계정은 자기 상점만 조회할 수 있습니다 (상점이 하나면 store_id 생략 가능).
+    권한이 없으면 PermissionError, 상점을 골라야 하면 ValueError.
+    """
+    email = (user_email or '').strip().lower()
+    if email and email in ADMIN_EMAILS:
+        return store_id
+    own_store_ids = MERCHANT_ACCOUNTS.get(email) if email else None
+    if not own_store_ids:
+        raise PermissionError('가맹점 또는 관리자 계정만 조회할 수 있습니다.')
+    if store_id is None:
+        if len(own_store_ids) != 1:
+            raise ValueError('조회할 store_id가 필요합니다.')
+        return next(iter(own_store_ids))
+    if store_id not in own_store_ids:
+        raise PermissionError('자신의 상점 통계만 조회할 수 있습니다.')
+    return store_id
+
+def get_redemption_stats(store_id: Optional[str] = None, hours: int = 24) -> Dict[str, Any]:
+    """
+    가맹점 대시보드용 코드 사용 통계 (원장 집계만 조회)
+    - store_id 지정 시 해당 상점만, 시간대별 추이는 최근 hours 시간
+    - 상점명/혜택 설명은 카탈로그에서 채움
+    """
+    since_hour = (datetime.now() - timedelta(hours=max(hours - 1, 0))).strftime('%Y-%m-%dT%H')
+    stats = get_ledger().stats(store_id=store_id, since_hour=since_hour)
+    catalog = get_catalog()
+    for entry in stats["by_store"]:
+        entry["store_name"] = catalog.store_name_for(entry["store_id"])
+    for entry in stats["by_benefit"]:
+        benefit = catalog.find_benefit_by_code(entry["code"])
+        entry["description"] = benefit.description if benefit else None
+        entry["store_name"] = catalog.store_name_for(entry["store_id"])
+    stats.update({"store_id": store_id, "hours": hours, "since_hour": since_hour})
+    return stats
 
 # 패스 생성 기능은 pass_generator.py 모듈로 이동되었습니다.
 # 기존 generate_pass, save_pass_to_file 함수들은 pass_generator.py에서 처리합니다.
 
 def save_pass(pass_obj: Pass, user_email: str) -> Dict[str, Any]:
-    """패스를 여러 저장소에 저장 (파일 + Datastore + 세션)"""
+    """
+    패스를 여러 저장소에 저장 (세션 + 파일 + Datastore)
+    기본은 모든 저장소에 동기 저장합니다. write-behind 를 켜면(PASS_WRITE_BEHIND=1) 세션과 대기 버퍼에만 넣고
+    바로 반환하며 파일/Datastore 저장은 백그라운드 워커가 처리합니다.
+    """
     try:
         from pass_generator import get_pass_generator
         generator = get_pass_generator()
@@ -227,25 +235,34 @@ def save_pass(pass_obj: Pass, user_email: str) -> Dict[str, Any]:
         print(f"[패스 저장] 패스 ID: {pass_obj.pass_id}")
         print(f"[패스 저장] 사용자: {user_email}")
         
-        # 1. 파일 시스템 저장 시도
-        file_success = generator.save_pass_to_file(pass_obj)
-        print(f"[패스 저장] 파일 저장 결과: {file_success}")
-        
-        # 2. Datastore 저장 (프로덕션 환경에서 영구 저장)
+        file_success = False
         datastore_success = False
-        if is_production:
-            try:
+        persist_status = None
+        if PASS_WRITE_BEHIND:
+            # 1-2. 파일/Datastore 저장은 write-behind 대기열에 맡김
+            write_behind = get_write_behind()
+            write_behind.enqueue(pass_obj, user_email)
+            persist_status = write_behind.status(pass_obj.pass_id)
+            print(f"[패스 저장] 영구 저장 대기열 등록: {persist_status}")
+        else:
+            # 1. 파일 시스템 저장 시도
+            file_success = generator.save_pass_to_file(pass_obj, user_email)
+            print(f"[패스 저장] 파일 저장 결과: {file_success}")
+            
+            # 2. Datastore 저장 (프로덕션 환경에서 영구 저장)
+            if is_production:
                 try:
-                    from src.datastore_service import save_pass_to_datastore
-                except ImportError:
-                    from datastore_service import save_pass_to_datastore
-                print(f"[패스 저장] Datastore 저장 시작")
-                datastore_success = save_pass_to_datastore(pass_obj, user_email)
-                print(f"[패스 저장] Datastore 저장 결과: {datastore_success}")
-            except Exception as datastore_error:
-                print(f"[패스 저장] Datastore 저장 실패: {datastore_error}")
-                import traceback
-                print(f"[패스 저장] Datastore 오류 세부사항: {traceback.format_exc()}")
+                    try:
+                        from src.datastore_service import save_pass_to_datastore
+                    except ImportError:
+                        from datastore_service import save_pass_to_datastore
+                    print(f"[패스 저장] Datastore 저장 시작")
+                    datastore_success = save_pass_to_datastore(pass_obj, user_email)
+                    print(f"[패스 저장] Datastore 저장 결과: {datastore_success}")
+                except Exception as datastore_error:
+                    print(f"[패스 저장] Datastore 저장 실패: {datastore_error}")
+                    import traceback
+                    print(f"[패스 저장] Datastore 오류 세부사항: {traceback.format_exc()}")
         
         # 3. 세션에 패스 저장 (즉시 접근용) - 모든 환경에서 실행
         session_success = False
@@ -272,7 +289,7 @@ def save_pass(pass_obj: Pass, user_email: str) -> Dict[str, Any]:
             saved_passes = [p for p in saved_passes if p.get('pass_id') != pass_obj.pass_id]
             
             # 새 패스 추가
-            saved_passes.append(pass_data)
+            saved_passes.append(compact_pass_data(pass_data))
             
             # 최대 50개까지만 유지
             if len(saved_passes) > 50:
@@ -289,13 +306,14 @@ def save_pass(pass_obj: Pass, user_email: str) -> Dict[str, Any]:
             import traceback
             print(f"[패스 저장] 세션 오류 세부사항: {traceback.format_exc()}")
         
-        # 전체 저장 결과 계산
-        overall_success = file_success or datastore_success or session_success
+        # 전체 저장 결과 계산 (대기열에 들어간 패스는 이 프로세스에서 바로 조회 가능)
+        overall_success = file_success or datastore_success or session_success or persist_status is not None
         
         result = {
             'file_success': file_success,
             'datastore_success': datastore_success,
             'session_success': session_success,
+            'persist_status': persist_status,
             'overall_success': overall_success,
             'is_production': is_production,
             'pass_id': pass_obj.pass_id,
@@ -318,7 +336,26 @@ def save_pass(pass_obj: Pass, user_email: str) -> Dict[str, Any]:
         }
 
 def load_pass_from_file(pass_id: str) -> Optional[Pass]:
-    """파일에서 패스 로드 (프로덕션 환경에서는 Datastore와 세션에서도 조회)"""
+    """
+    패스 로드 (프로세스 LRU 캐시 우선)
+    캐시에 없으면 write-behind 대기 버퍼, Datastore/세션/파일 순으로 찾아 복원한 뒤 캐시에 보관합니다.
+    반환된 Pass 는 캐시와 공유되므로 수정하지 않아야 합니다.
+    """
+    cache = get_pass_cache()
+    pass_obj = cache.get(pass_id)
+    if pass_obj is not None:
+        return pass_obj
+    # 아직 영구 저장되지 않은 패스는 저장소를 조회하지 않고 버퍼의 패스를 그대로 사용
+    pending = get_write_behind().get_pending(pass_id)
+    if pending is not None:
+        return pending
+    pass_obj = _load_pass_uncached(pass_id)
+    if pass_obj is not None:
+        cache.put(pass_id, pass_obj)
+    return pass_obj
+
+def _load_pass_uncached(pass_id: str, include_archive: bool = True) -> Optional[Pass]:
+    """파일에서 패스 로드 (프로덕션 환경에서는 Datastore와 세션에서도 조회, 없으면 include_archive 일 때 콜드 아카이브)"""
     try:
         print(f"[패스 로드] 패스 ID: {pass_id}")
         
@@ -349,8 +386,9 @@ def load_pass_from_file(pass_id: str) -> Optional[Pass]:
                 import traceback
                 print(f"[패스 로드] Datastore 오류 세부사항: {traceback.format_exc()}")
         
-        # 프로덕션 환경에서는 세션에서도 찾기 (백업)
-        if is_production:
+        # 세션에서 찾기 (프로덕션 백업, 다른 워커가 아직 영구 저장 중인 패스)
+        from flask import has_request_context
+        if has_request_context():
             try:
                 from flask import session
                 session_passes = session.get('saved_passes', [])
@@ -366,20 +404,21 @@ def load_pass_from_file(pass_id: str) -> Optional[Pass]:
             except Exception as session_error:
                 print(f"[패스 로드] 세션 접근 오류: {session_error}")
         
-        # 파일 시스템에서 찾기
-        filename = f"pass_{pass_id}.json"
-        saved_passes_dir = os.path.join(os.path.dirname(__file__), '..', 'storage', 'saved_passes')
-        filepath = os.path.join(saved_passes_dir, filename)
+        # 파일 시스템에서 찾기 (날짜 샤드 -> 평면 배치)
+        filepath = find_pass_file(pass_id)
         
         print(f"[패스 로드] 파일 경로: {filepath}")
-        print(f"[패스 로드] 파일 존재: {os.path.exists(filepath)}")
         
-        if not os.path.exists(filepath):
+        if not filepath:
+            # 만료되어 콜드 아카이브로 옮긴 패스
+            archived_data = load_archived_pass_data(pass_id) if include_archive else None
+            if archived_data:
+                print(f"[패스 로드] 아카이브에서 패스 발견: {pass_id}")
+                return _create_pass_from_data(archived_data)
             print(f"[패스 로드] 파일을 찾을 수 없음: {pass_id}")
             return None
         
-        with open(filepath, 'r', encoding='utf-8') as f:
-            pass_data = json.load(f)
+        pass_data = read_pass_file(filepath)
         
         print(f"[패스 로드] 파일에서 패스 발견: {pass_id}")
         return _create_pass_from_data(pass_data)
@@ -391,8 +430,10 @@ def load_pass_from_file(pass_id: str) -> Optional[Pass]:
         return None
 
 def _create_pass_from_data(pass_data: dict) -> Optional[Pass]:
-    """패스 데이터 딕셔너리에서 Pass 객체 생성"""
+    """패스 데이터 딕셔너리에서 Pass 객체 생성 (카탈로그 참조형은 카탈로그로 복원)"""
     try:
+        pass_data = expand_pass_data(pass_data)
+        
         # 호환성을 위한 데이터 구조 확인
         if 'stores' not in pass_data:
             print(f"패스 생성 오류: stores 필드 없음")
@@ -468,12 +509,44 @@ def _create_pass_from_data(pass_data: dict) -> Optional[Pass]:
         traceback.print_exc()
         return None
 
+def _cookie_pass_ids() -> List[str]:
+    """user_passes 쿠키의 패스 ID 목록 (테스트 패스 제외, 형식이 잘못되면 빈 목록)"""
+    from flask import request
+    cookie_passes = request.cookies.get('user_passes')
+    if not cookie_passes:
+        return []
+    try:
+        parsed_ids = json.loads(cookie_passes)
+    except json.JSONDecodeError:
+        return []
+    if not isinstance(parsed_ids, list):
+        return []
+    pass_ids = [pid for pid in parsed_ids if isinstance(pid, str) and pid and not pid.startswith('test_')]
+    print(f"[패스 조회] 쿠키에서 {len(pass_ids)}개 패스 ID 발견")
+    return pass_ids
+
+def _index_missing_passes(pass_index, pass_ids: List[str]) -> None:
+    """
+    인덱스에 없는 패스(인덱스 도입 전 Datastore에만 있는 패스 등)는 직접 로드해 색인
+    콜드 아카이브로 옮긴 패스는 핫 인덱스에 다시 넣지 않습니다 (아카이브는 조회하지 않음).
+    """
+    if not pass_ids:
+        return
+    known = pass_index.known_ids(pass_ids)
+    for pass_id in pass_ids:
+        if pass_id in known:
+            continue
+        pass_obj = get_write_behind().get_pending(pass_id)
+        if pass_obj is None:
+            pass_obj = _load_pass_uncached(pass_id, include_archive=False)
+        if pass_obj:
+            pass_index.upsert(summarize_pass(pass_obj))
+
 def get_all_passes() -> List[Dict[str, Any]]:
     """모든 저장된 패스 목록 반환"""
     try:
         passes = []
         pass_ids_seen = set()  # 중복 방지를 위한 집합
-        saved_passes_dir = os.path.join(os.path.dirname(__file__), '..', 'storage', 'saved_passes')
         
         # 프로덕션 환경 감지
         is_production = (
@@ -483,8 +556,6 @@ def get_all_passes() -> List[Dict[str, Any]]:
         )
         
         print(f"[패스 조회] 프로덕션 환경: {is_production}")
-        print(f"[패스 조회] 저장 디렉토리: {saved_passes_dir}")
-        print(f"[패스 조회] 디렉토리 존재: {os.path.exists(saved_passes_dir)}")
         
         # 프로덕션 환경에서는 Datastore에서도 패스를 가져옴 (영구 저장소) - 최우선
         if is_production:
@@ -507,7 +578,7 @@ def get_all_passes() -> List[Dict[str, Any]]:
                 else:
                     print("[패스 조회] ⚠️ Datastore에서 패스를 찾을 수 없음")
                 
-                # Datastore에서 가져온 패스를 변환하여 추가
+                # Datastore에서 가져온 패스 추가
                 for i, pass_raw in enumerate(datastore_passes):
                     pass_id = pass_raw.get('pass_id')
                     print(f"[패스 조회] 🔧 Datastore 패스 #{i+1} 처리: {pass_id}")
@@ -525,72 +596,8 @@ def get_all_passes() -> List[Dict[str, Any]]:
                         print(f"[패스 조회] ⚠️ 테스트 패스 건너뛰기: {pass_id}")
                         continue
                     
-                    # 패스 처리 계속
-                    print(f"[패스 조회] ✅ 유효한 패스 처리 시작: {pass_id}")
-                    
-                    # Datastore 데이터를 표준 형식으로 변환
-                    theme_names = {
-                        'food': '맛집', 'culture': '문화', 'shopping': '쇼핑',
-                        'entertainment': '오락', 'seafood': '해산물', 'cafe': '카페',
-                        'traditional': '전통', 'retro': '레트로', 'quiet': '조용함'
-                    }
-                    
-                    pass_type_names = {
-                        'light': '라이트', 'premium': '프리미엄', 'citizen': '시민'
-                    }
-                    
-                    theme_name = theme_names.get(pass_raw.get('theme', '').lower(), pass_raw.get('theme', '테마'))
-                    pass_type_name = pass_type_names.get(pass_raw.get('pass_type', '').lower(), pass_raw.get('pass_type', '타입'))
-                    pass_name = f"{theme_name} {pass_type_name} 패스"
-                    
-                    print(f"[패스 조회] 🔧 패스 이름 생성: {pass_name}")
-                    
-                    # 유효기간 계산
-                    created_at = pass_raw.get('created_at', datetime.now().isoformat())
-                    if isinstance(created_at, str):
-                        try:
-                            created_date = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                        except ValueError:
-                            created_date = datetime.now()
-                    else:
-                        created_date = created_at if created_at else datetime.now()
-                        
-                    valid_until = created_date + timedelta(days=30)
-                    
-                    # 패스 상태 결정
-                    now = datetime.now(timezone.utc) if created_date.tzinfo else datetime.now()
-                    status = 'expired' if now > valid_until else 'active'
-                    
-                    # 패스 가격 계산
-                    pass_type_prices = {
-                        'light': 7900, 'premium': 14900, 'citizen': 6900
-                    }
-                    total_price = pass_type_prices.get(pass_raw.get('pass_type', '').lower(), 7900)
-                    
-                    stores = pass_raw.get('stores', [])
-                    benefits = pass_raw.get('benefits', [])
-                    
-                    datastore_pass_entry = {
-                        'pass_id': pass_id,
-                        'name': pass_name,
-                        'pass_type': pass_type_name,
-                        'theme': theme_name,
-                        'created_at': created_at,
-                        'valid_until': valid_until.isoformat(),
-                        'status': status,
-                        'total_places': len(stores),
-                        'visited_places': 0,
-                        'total_price': total_price,
-                        'store_count': len(stores),
-                        'benefits_count': len(benefits),
-                        'source': 'datastore'  # 출처 표시
-                    }
-                    
-                    passes.append(datastore_pass_entry)
-                    pass_ids_seen.add(pass_id)
-                    print(f"[패스 조회] ✅ Datastore 패스 추가됨: {pass_id}")
-                        
-                    passes.append(datastore_pass_entry)
+                    # Datastore 조회 결과는 이미 목록 항목 형식 (저장 시 계산된 요약)
+                    passes.append(pass_raw)
                     pass_ids_seen.add(pass_id)
                     print(f"[패스 조회] ✅ Datastore 패스 추가됨: {pass_id}")
                         
@@ -618,67 +625,13 @@ def get_all_passes() -> List[Dict[str, Any]]:
                         print(f"[패스 조회] 테스트 패스 제외: {pass_id}")
                         continue
                     
-                    # 세션에서 가져온 패스 데이터를 처리
-                    theme_names = {
-                        'food': '맛집', 'culture': '문화', 'shopping': '쇼핑',
-                        'entertainment': '오락', 'seafood': '해산물', 'cafe': '카페',
-                        'traditional': '전통', 'retro': '레트로', 'quiet': '조용함'
-                    }
-                    
-                    pass_type_names = {
-                        'light': '라이트', 'premium': '프리미엄', 'citizen': '시민'
-                    }
-                    
-                    theme_name = theme_names.get(pass_data.get('theme', '').lower(), pass_data.get('theme', '테마'))
-                    pass_type_name = pass_type_names.get(pass_data.get('pass_type', '').lower(), pass_data.get('pass_type', '타입'))
-                    pass_name = f"{theme_name} {pass_type_name} 패스"
-                    
-                    # 유효기간 계산
-                    created_at = pass_data.get('created_at', datetime.now().isoformat())
-                    if isinstance(created_at, str):
-                        try:
-                            created_date = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                        except ValueError:
-                            # ISO 형식이 아닌 경우 현재 시간 사용
-                            created_date = datetime.now()
-                    else:
-                        created_date = created_at if created_at else datetime.now()
-                        
-                    valid_until = created_date + timedelta(days=30)
-                    
-                    # 패스 상태 결정
-                    now = datetime.now(timezone.utc) if created_date.tzinfo else datetime.now()
-                    status = 'expired' if now > valid_until else 'active'
-                    
-                    # 패스 가격 계산
-                    pass_type_prices = {
-                        'light': 7900, 'premium': 14900, 'citizen': 6900
-                    }
-                    total_price = pass_type_prices.get(pass_data.get('pass_type', '').lower(), 7900)
-                    
-                    stores = pass_data.get('stores', [])
-                    benefits = pass_data.get('benefits', [])
-                    
-                    pass_entry = {
-                        'pass_id': pass_id,
-                        'name': pass_name,
-                        'pass_type': pass_type_name,
-                        'theme': theme_name,
-                        'created_at': created_at,
-                        'valid_until': valid_until.isoformat(),
-                        'status': status,
-                        'total_places': len(stores),
-                        'visited_places': 0,
-                        'total_price': total_price,
-                        'store_count': len(stores),
-                        'benefits_count': len(benefits),
-                        'source': 'session'  # 출처 표시
-                    }
+                    # 세션에서 가져온 패스 데이터를 요약해 목록 항목으로 변환
+                    pass_entry = summary_list_entry(summarize_pass_data(pass_data), 'session')
                     
                     passes.append(pass_entry)
                     pass_ids_seen.add(pass_id)
-                    print(f"[패스 조회] 세션에서 패스 추가: {pass_id} - {pass_name}")
-                    print(f"[패스 조회] 패스 상세: 장소={len(stores)}, 혜택={len(benefits)}, 상태={status}")
+                    print(f"[패스 조회] 세션에서 패스 추가: {pass_id} - {pass_entry['name']}")
+                    print(f"[패스 조회] 패스 상세: 장소={pass_entry['store_count']}, 혜택={pass_entry['benefits_count']}, 상태={pass_entry['status']}")
                     
                 except Exception as pass_error:
                     print(f"[패스 조회] 세션 패스 처리 오류: {pass_error}")
@@ -691,92 +644,28 @@ def get_all_passes() -> List[Dict[str, Any]]:
             import traceback
             print(f"[패스 조회] 세션 접근 세부 오류: {traceback.format_exc()}")
         
-        # 쿠키에서도 패스를 가져옴 (로그아웃 후에도 유지되는 백업)
+        # 파일에 저장된 패스: 사용자 패스와 쿠키에 남은 패스 ID를 인덱스 한 번 조회로 가져옴
         try:
-            from flask import request
-            cookie_passes = request.cookies.get('user_passes')
-            if cookie_passes:
-                import json
-                cookie_pass_ids = json.loads(cookie_passes)
-                print(f"[패스 조회] 쿠키에서 {len(cookie_pass_ids)}개 패스 ID 발견")
-                
-                for pass_id in cookie_pass_ids:
-                    try:
-                        # 중복 확인
-                        if pass_id in pass_ids_seen:
-                            continue
-                        
-                        # 테스트 패스 필터링
-                        if pass_id.startswith('test_'):
-                            print(f"[패스 조회] 쿠키 테스트 패스 제외: {pass_id}")
-                            continue
-                            
-                        # 파일에서 패스 로드 시도
-                        pass_obj = load_pass_from_file(pass_id)
-                        if pass_obj:
-                            # 패스 이름 생성 (테마와 타입 기반)
-                            theme_names = {
-                                'food': '맛집', 'culture': '문화', 'shopping': '쇼핑',
-                                'entertainment': '오락', 'seafood': '해산물', 'cafe': '카페',
-                                'traditional': '전통', 'retro': '레트로', 'quiet': '조용함'
-                            }
-                            
-                            pass_type_names = {
-                                'light': '라이트', 'premium': '프리미엄', 'citizen': '시민'
-                            }
-                            
-                            theme_name = theme_names.get(pass_obj.theme.value, pass_obj.theme.value)
-                            pass_type_name = pass_type_names.get(pass_obj.pass_type.value, pass_obj.pass_type.value)
-                            pass_name = f"{theme_name} {pass_type_name} 패스"
-                            
-                            # 유효기간 계산
-                            try:
-                                if isinstance(pass_obj.created_at, str):
-                                    created_date = datetime.fromisoformat(pass_obj.created_at.replace('Z', '+00:00'))
-                                else:
-                                    created_date = pass_obj.created_at
-                                    
-                                valid_until = created_date + timedelta(days=30)
-                                
-                                # 패스 상태 결정
-                                now = datetime.now(timezone.utc) if created_date.tzinfo else datetime.now()
-                                status = 'expired' if now > valid_until else 'active'
-                                
-                                # 패스 가격 계산
-                                pass_type_prices = {
-                                    'light': 7900, 'premium': 14900, 'citizen': 6900
-                                }
-                                total_price = pass_type_prices.get(pass_obj.pass_type.value, 7900)
-                                
-                                passes.append({
-                                    'pass_id': pass_obj.pass_id,
-                                    'name': pass_name,
-                                    'pass_type': pass_type_name,
-                                    'theme': theme_name,
-                                    'created_at': pass_obj.created_at,
-                                    'valid_until': valid_until.isoformat(),
-                                    'status': status,
-                                    'total_places': len(pass_obj.stores),
-                                    'visited_places': 0,
-                                    'total_price': total_price,
-                                    'store_count': len(pass_obj.stores),
-                                    'benefits_count': len(pass_obj.benefits),
-                                    'source': 'cookie_file'  # 출처 표시
-                                })
-                                
-                                pass_ids_seen.add(pass_id)
-                                print(f"[패스 조회] 쿠키에서 패스 추가: {pass_id} - {pass_name}")
-                                
-                            except Exception as date_error:
-                                print(f"[패스 조회] 날짜 처리 오류 (패스 {pass_id}): {date_error}")
-                                continue
-                                
-                    except Exception as cookie_pass_error:
-                        print(f"[패스 조회] 쿠키 패스 로드 실패 ({pass_id}): {cookie_pass_error}")
-                        continue
+            from flask import session
+            cookie_pass_ids = _cookie_pass_ids()
+            user_email = session.get('user_email')
+            
+            pass_index = get_pass_index()
+            _index_missing_passes(pass_index, [pid for pid in cookie_pass_ids if pid not in pass_ids_seen])
+            summaries = []
+            if user_email or cookie_pass_ids:
+                summaries = pass_index.list_passes(user_email=user_email, pass_ids=cookie_pass_ids)
+            print(f"[패스 조회] 패스 인덱스에서 {len(summaries)}개 패스 발견")
+            
+            for summary in summaries:
+                pass_id = summary['pass_id']
+                if pass_id in pass_ids_seen or pass_id.startswith('test_'):
+                    continue
+                passes.append(summary_list_entry(summary, 'index'))
+                pass_ids_seen.add(pass_id)
                         
-        except Exception as cookie_error:
-            print(f"[패스 조회] 쿠키 접근 오류: {cookie_error}")
+        except Exception as index_error:
+            print(f"[패스 조회] 패스 인덱스 조회 오류: {index_error}")
         
         # 최종 중복 제거 및 정렬 (생성 시간 역순)
         unique_passes = []
@@ -804,367 +693,196 @@ def get_all_passes() -> List[Dict[str, Any]]:
         import traceback
         print(f"[패스 조회] 전체 함수 오류 세부사항: {traceback.format_exc()}")
         return []
-        
-        # 프로덕션 환경에서는 세션에서도 패스를 가져옴 (백업)
-        if is_production:
-            try:
-                from flask import session
-                session_passes = session.get('saved_passes', [])
-                print(f"[패스 조회] 세션에서 {len(session_passes)}개 패스 발견")
-                
-                for pass_data in session_passes:
-                    try:
-                        # 세션에서 가져온 패스 데이터를 처리
-                        theme_names = {
-                            'food': '맛집', 'culture': '문화', 'shopping': '쇼핑',
-                            'entertainment': '오락', 'seafood': '해산물', 'cafe': '카페',
-                            'traditional': '전통', 'retro': '레트로', 'quiet': '조용함'
-                        }
-                        
-                        pass_type_names = {
-                            'light': '라이트', 'premium': '프리미엄', 'citizen': '시민'
-                        }
-                        
-                        theme_name = theme_names.get(pass_data.get('theme', '').lower(), pass_data.get('theme', '테마'))
-                        pass_type_name = pass_type_names.get(pass_data.get('pass_type', '').lower(), pass_data.get('pass_type', '타입'))
-                        pass_name = f"{theme_name} {pass_type_name} 패스"
-                        
-                        # 유효기간 계산
-                        created_at = pass_data.get('created_at', datetime.now().isoformat())
-                        if isinstance(created_at, str):
-                            created_date = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                        else:
-                            created_date = created_at
-                            
-                        valid_until = created_date + timedelta(days=30)
-                        
-                        # 패스 가격 계산
-                        pass_type_prices = {
-                            'light': 7900, 'premium': 14900, 'citizen': 6900
-                        }
-                        total_price = pass_type_prices.get(pass_data.get('pass_type', '').lower(), 7900)
-                        
-                        stores = pass_data.get('stores', [])
-                        benefits = pass_data.get('benefits', [])
-                        
-                        passes.append({
-                            'pass_id': pass_data.get('pass_id'),
-                            'name': pass_name,
-                            'pass_type': pass_type_name,
-                            'theme': theme_name,
-                            'created_at': created_at,
-                            'valid_until': valid_until.isoformat(),
-                            'status': status,
-                            'total_places': len(stores),
-                            'visited_places': 0,
-                            'total_price': total_price,
-                            'store_count': len(stores),
-                            'benefits_count': len(benefits),
-                            'source': 'session_backup'  # 출처 표시
-                        })
-                        
-                        print(f"[패스 조회] 프로덕션 세션에서 패스 추가: {pass_data.get('pass_id')}")
-                        
-                    except Exception as pass_error:
-                        print(f"[패스 조회] 프로덕션 세션 패스 처리 오류: {pass_error}")
-                        continue
-                        
-            except Exception as session_error:
-                print(f"[패스 조회] 프로덕션 세션 접근 오류: {session_error}")
-        
-        # 쿠키에서도 패스를 가져옴 (로그아웃 후에도 유지되는 백업)
+
+# 패스 목록 페이지 크기 상한
+MAX_PASS_PAGE_SIZE = 100
+
+
+def encode_pass_cursor(created_at: str, pass_id: str) -> str:
+    """페이지 마지막 항목의 (created_at, pass_id) -> 불투명 커서 문자열"""
+    raw = json.dumps([created_at, pass_id], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_pass_cursor(cursor: str) -> Tuple[str, str]:
+    """커서 문자열 -> (created_at, pass_id), 형식이 잘못되면 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, pass_id = json.loads(raw.decode('utf-8'))
+    except Exception:
+        raise ValueError('잘못된 커서입니다.')
+    if not isinstance(created_at, str) or not isinstance(pass_id, str):
+        raise ValueError('잘못된 커서입니다.')
+    return canonical_timestamp(created_at), pass_id
+
+
+def _page_key(entry: Dict[str, Any]) -> Tuple[str, str]:
+    """정렬/커서 키 - 출처마다 다른 created_at 형식(시간대 유무)을 한 형식으로 맞춰 비교"""
+    return canonical_timestamp(entry.get('created_at')), entry['pass_id']
+
+
+def get_user_passes_page(limit: int, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    현재 사용자의 패스 목록 한 페이지 (created_at 최신순, 커서 기반)
+    Datastore(프로덕션)/세션/패스 인덱스에서 각각 커서 이후 limit+1 개만 가져와 합칩니다.
+    -> {"passes": [...], "next_cursor": str | None, "has_more": bool}
+    """
+    from flask import session
+    before = decode_pass_cursor(cursor) if cursor else None
+    limit = max(1, min(limit, MAX_PASS_PAGE_SIZE))
+    user_email = session.get('user_email')
+    candidates: List[Dict[str, Any]] = []
+
+    is_production = (
+        os.environ.get('GAE_ENV', '').startswith('standard') or 
+        os.environ.get('SERVER_SOFTWARE', '').startswith('Google App Engine/') or
+        'appspot.com' in os.environ.get('GOOGLE_CLOUD_PROJECT', '')
+    )
+    if is_production:
         try:
-            from flask import request
-            cookie_passes = request.cookies.get('user_passes')
-            if cookie_passes:
-                import json
-                cookie_pass_ids = json.loads(cookie_passes)
-                print(f"[패스 조회] 쿠키에서 {len(cookie_pass_ids)}개 패스 ID 발견")
-                
-                for pass_id in cookie_pass_ids:
-                    try:
-                        # 파일에서 패스 로드 시도
-                        pass_obj = load_pass_from_file(pass_id)
-                        if pass_obj:
-                            # 패스 이름 생성 (테마와 타입 기반)
-                            theme_names = {
-                                'food': '맛집', 'culture': '문화', 'shopping': '쇼핑',
-                                'entertainment': '오락', 'seafood': '해산물', 'cafe': '카페',
-                                'traditional': '전통', 'retro': '레트로', 'quiet': '조용함'
-                            }
-                            
-                            pass_type_names = {
-                                'light': '라이트', 'premium': '프리미엄', 'citizen': '시민'
-                            }
-                            
-                            theme_name = theme_names.get(pass_obj.theme.value, pass_obj.theme.value)
-                            pass_type_name = pass_type_names.get(pass_obj.pass_type.value, pass_obj.pass_type.value)
-                            pass_name = f"{theme_name} {pass_type_name} 패스"
-                            
-                            # 유효기간 계산
-                            try:
-                                if isinstance(pass_obj.created_at, str):
-                                    created_date = datetime.fromisoformat(pass_obj.created_at.replace('Z', '+00:00'))
-                                else:
-                                    created_date = pass_obj.created_at
-                                
-                                valid_until = created_date + timedelta(days=30)
-                                valid_until_str = valid_until.isoformat()
-                                
-                                # 패스 상태 결정
-                                now = datetime.now(timezone.utc) if created_date.tzinfo else datetime.now()
-                                status = 'expired' if now > valid_until else 'active'
-                            except Exception as date_error:
-                                print(f"쿠키 패스 날짜 처리 오류: {date_error}")
-                                valid_until_str = pass_obj.created_at
-                                status = 'active'
-                            
-                            # 패스 가격 계산
-                            pass_type_prices = {
-                                'light': 7900, 'premium': 14900, 'citizen': 6900
-                            }
-                            total_price = pass_type_prices.get(pass_obj.pass_type.value, 7900)
-                            
-                            passes.append({
-                                'pass_id': pass_obj.pass_id,
-                                'name': pass_name,
-                                'pass_type': pass_type_name,
-                                'theme': theme_name,
-                                'created_at': pass_obj.created_at,
-                                'valid_until': valid_until_str,
-                                'status': status,
-                                'total_places': len(pass_obj.stores),
-                                'visited_places': 0,
-                                'total_price': total_price,
-                                'store_count': len(pass_obj.stores),
-                                'benefits_count': len(pass_obj.benefits),
-                                'source': 'cookie'  # 출처 표시
-                            })
-                            
-                            print(f"[패스 조회] 쿠키에서 패스 추가: {pass_obj.pass_id}")
-                        else:
-                            print(f"[패스 조회] 쿠키 패스 로드 실패: {pass_id}")
-                            
-                    except Exception as pass_error:
-                        print(f"[패스 조회] 쿠키 패스 처리 오류: {pass_error}")
-                        continue
-        except Exception as cookie_error:
-            print(f"[패스 조회] 쿠키 접근 오류: {cookie_error}")
-        
-        # 파일 시스템에서도 패스를 가져옴 (로컬 또는 배포 시 포함된 파일들)
-        if os.path.exists(saved_passes_dir):
             try:
-                files = os.listdir(saved_passes_dir)
-                print(f"[패스 조회] 디렉토리 내 파일 수: {len(files)}")
-                print(f"[패스 조회] 파일 목록: {files}")
-            except Exception as list_error:
-                print(f"[패스 조회] 파일 목록 조회 실패: {list_error}")
-                files = []
-        else:
-            files = []
-        
-        for filename in files:
-            if filename.endswith('.json') and filename.startswith('pass_'):
-                pass_id = filename[5:-5]  # 'pass_'와 '.json' 제거
-                pass_obj = load_pass_from_file(pass_id)
-                if pass_obj:
-                    # 패스 이름 생성 (테마와 타입 기반)
-                    theme_names = {
-                        'food': '맛집',
-                        'culture': '문화',
-                        'shopping': '쇼핑',
-                        'entertainment': '오락',
-                        'seafood': '해산물',
-                        'cafe': '카페',
-                        'traditional': '전통',
-                        'retro': '레트로',
-                        'quiet': '조용함'
-                    }
-                    
-                    pass_type_names = {
-                        'light': '라이트',
-                        'premium': '프리미엄',
-                        'citizen': '시민'
-                    }
-                    
-                    theme_name = theme_names.get(pass_obj.theme.value, pass_obj.theme.value)
-                    pass_type_name = pass_type_names.get(pass_obj.pass_type.value, pass_obj.pass_type.value)
-                    pass_name = f"{theme_name} {pass_type_name} 패스"
-                    
-                    # 유효기간 계산 (생성일로부터 30일)
-                    try:
-                        if isinstance(pass_obj.created_at, str):
-                            created_date = datetime.fromisoformat(pass_obj.created_at.replace('Z', '+00:00'))
-                        else:
-                            created_date = pass_obj.created_at
-                        
-                        valid_until = created_date + timedelta(days=30)
-                        valid_until_str = valid_until.isoformat()
-                        
-                        # 패스 상태 결정
-                        now = datetime.now(timezone.utc) if created_date.tzinfo else datetime.now()
-                        if now > valid_until:
-                            status = 'expired'
-                        else:
-                            status = 'active'
-                    except Exception as date_error:
-                        print(f"날짜 처리 오류: {date_error}")
-                        valid_until_str = pass_obj.created_at
-                        status = 'active'
-                    
-                    # 패스 가격 계산
-                    pass_type_prices = {
-                        'light': 7900,
-                        'premium': 14900,
-                        'citizen': 6900
-                    }
-                    total_price = pass_type_prices.get(pass_obj.pass_type.value, 7900)
-                    
-                    passes.append({
-                        'pass_id': pass_obj.pass_id,
-                        'name': pass_name,
-                        'pass_type': pass_type_name,
-                        'theme': theme_name,
-                        'created_at': pass_obj.created_at,
-                        'valid_until': valid_until_str,
-                        'status': status,
-                        'total_places': len(pass_obj.stores),
-                        'visited_places': 0,  # TODO: 실제 방문 기록 추적 시 업데이트
-                        'total_price': total_price,
-                        'store_count': len(pass_obj.stores),
-                        'benefits_count': len(pass_obj.benefits)
-                    })
-        
-        # 패스 ID 기준으로 중복 제거 (세션에서 가져온 패스가 우선)
-        unique_passes = {}
-        for pass_info in passes:
-            pass_id = pass_info.get('pass_id')
-            if pass_id and pass_id not in unique_passes:
-                unique_passes[pass_id] = pass_info
-        
-        passes = list(unique_passes.values())
-        print(f"[패스 조회] 중복 제거 후 총 {len(passes)}개 패스")
-        
-        # 생성일자순 정렬 (최신순)
-        passes.sort(key=lambda x: x['created_at'], reverse=True)
-        return passes
-        
-    except Exception as e:
-        print(f"패스 목록 조회 중 오류: {e}")
-        return []
+                from src.datastore_service import get_user_passes_page_from_datastore
+            except ImportError:
+                from datastore_service import get_user_passes_page_from_datastore
+            candidates.extend(get_user_passes_page_from_datastore(
+                user_email or 'demo@jemulpogo.com', limit + 1, before))
+        except Exception as datastore_error:
+            print(f"[패스 페이지] Datastore 조회 오류: {datastore_error}")
+
+    # 세션 패스 (최대 50개, 메모리)
+    for pass_data in session.get('saved_passes', []):
+        if not pass_data.get('pass_id'):
+            continue
+        entry = summary_list_entry(summarize_pass_data(pass_data), 'session')
+        if before is None or _page_key(entry) < before:
+            candidates.append(entry)
+
+    # 파일 저장 패스 (인덱스 키셋 조회)
+    try:
+        cookie_pass_ids = _cookie_pass_ids()
+        pass_index = get_pass_index()
+        if before is None:
+            _index_missing_passes(pass_index, cookie_pass_ids)
+        if user_email or cookie_pass_ids:
+            candidates.extend(summary_list_entry(summary, 'index') for summary in pass_index.list_passes(
+                user_email=user_email, pass_ids=cookie_pass_ids, limit=limit + 1, before=before))
+    except Exception as index_error:
+        print(f"[패스 페이지] 패스 인덱스 조회 오류: {index_error}")
+
+    # 출처 우선순위(Datastore > 세션 > 인덱스)로 중복 제거 후 정렬
+    unique: Dict[str, Dict[str, Any]] = {}
+    for entry in candidates:
+        if not entry['pass_id'].startswith('test_'):
+            unique.setdefault(entry['pass_id'], entry)
+    ordered = sorted(unique.values(), key=_page_key, reverse=True)
+    page, has_more = ordered[:limit], len(ordered) > limit
+    return {
+        "passes": page,
+        "next_cursor": encode_pass_cursor(*_page_key(page[-1])) if has_more else None,
+        "has_more": has_more,
+    }
 
 def load_benefits_raw() -> List[Dict]:
     """혜택 원본 데이터 로드 (모든 필드 포함)"""
     try:
-        benefits_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'benefits.json')
-        with open(benefits_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            if 'benefits' in data:
-                return data['benefits']
-            else:
-                return data
-    except FileNotFoundError:
-        print("benefits.json 파일을 찾을 수 없습니다.")
-        return []
+        return list(get_catalog().benefits_raw)
     except Exception as e:
         print(f"혜택 데이터 로드 중 오류: {e}")
         return []
 
 def get_synergy_score(store_data: Dict) -> int:
     """상점의 상생 점수 계산 (0-100점)"""
-    base_score = 50
-    
-    # 프랜차이즈 여부 (-30점)
-    if store_data.get('is_franchise', False):
-        base_score -= 30
-    
-    # 리뷰 수 (적을수록 가점)
-    reviews = store_data.get('reviews', 0)
-    if reviews < 50:
-        base_score += 30
-    elif reviews < 100:
-        base_score += 20
-    elif reviews < 200:
-        base_score += 10
-    
-    # 지역 특성 (골목상권, 제물포시장 가점)
-    area = store_data.get('area', '')
-    if area in ["골목상권", "제물포시장"]:
-        base_score += 25
-    
-    # 0-100 범위로 제한
-    return max(0, min(100, base_score))
+    return synergy_score(store_data)
 
 def calculate_total_eco_value(benefits: List[Benefit]) -> int:
-    """혜택들의 총 경제적 가치 계산"""
-    total_value = 0
-    benefits_raw = load_benefits_raw()
-    
-    # store_id별 혜택 데이터 맵핑
-    benefit_value_map = {}
-    for benefit_data in benefits_raw:
-        store_id = benefit_data.get('store_id', '')
-        desc = benefit_data.get('desc', '')
-        eco_value = benefit_data.get('eco_value', 0)
-        benefit_value_map[f"{store_id}_{desc}"] = eco_value
-    
-    for benefit in benefits:
-        key = f"{benefit.store_name}_{benefit.description}"
-        eco_value = benefit_value_map.get(key, 3000)  # 기본값 3000원
-        total_value += eco_value
-        print(f"[가치 계산] {benefit.store_name} - {benefit.description}: {eco_value}원")
-    
+    """혜택들의 총 경제적 가치 계산 (카탈로그에 미리 계산된 값 조회)"""
+    catalog = get_catalog()
+    total_value = sum(catalog.eco_value_for(b.store_name, b.description) for b in benefits)
     print(f"[가치 계산] 총 혜택 가치: {total_value}원")
     return total_value
 
 def calculate_average_synergy_score(stores: List[Store]) -> float:
-    """상점들의 평균 상생 점수 계산"""
-    if not stores:
-        return 0.0
-    
-    stores_raw = load_stores_raw()
-    store_data_map = {store['name']: store for store in stores_raw}
-    
-    total_score = 0
-    valid_stores = 0
-    
-    for store in stores:
-        store_data = store_data_map.get(store.name)
-        if store_data:
-            synergy_score = get_synergy_score(store_data)
-            total_score += synergy_score
-            valid_stores += 1
-            print(f"[상생점수] {store.name}: {synergy_score}점")
-    
-    if valid_stores == 0:
-        return 0.0
-    
-    avg_score = total_score / valid_stores
+    """상점들의 평균 상생 점수 계산 (카탈로그에 미리 계산된 점수 조회)"""
+    avg_score = _average_synergy(get_catalog(), stores)
     print(f"[상생점수] 평균 상생점수: {avg_score:.1f}점")
     return avg_score
 
-def validate_pass_quality(pass_obj: Pass, pass_price: int) -> Dict[str, Any]:
-    """패스 품질 검증 (가치 대비 효과 150% 이상, 상생점수 70점 이상)"""
-    total_value = calculate_total_eco_value(pass_obj.benefits)
-    avg_synergy = calculate_average_synergy_score(pass_obj.stores)
-    value_ratio = (total_value / pass_price) * 100 if pass_price > 0 else 0
+def _average_synergy(catalog, stores: List[Store]) -> float:
+    """카탈로그에 있는 상점만으로 평균 상생 점수 계산"""
+    scores = [catalog.synergy_by_store_name[store.name]
+              for store in stores if store.name in catalog.synergy_by_store_name]
+    return sum(scores) / len(scores) if scores else 0.0
+
+def filter_candidate_stores(areas: Optional[List[str]] = None, exclude_franchise: bool = False,
+                            max_reviews: Optional[int] = None, min_synergy: Optional[int] = None,
+                            min_eco_value: Optional[float] = None) -> List[Store]:
+    """조건에 맞는 후보 상점 목록 (컬럼형 테이블 벡터 필터)"""
+    catalog = get_catalog()
+    if catalog.table is not None:
+        rows = catalog.table.filter_rows(areas=areas, exclude_franchise=exclude_franchise,
+                                         max_reviews=max_reviews, min_synergy=min_synergy,
+                                         min_eco_value=min_eco_value)
+        return [catalog.stores[i] for i in rows]
     
-    is_valid = value_ratio >= 150 and avg_synergy >= 70
+    # numpy 미설치 환경: 상점별 스칼라 계산
+    eco_by_store: Dict[str, float] = {}
+    for benefit_data in catalog.benefits_raw:
+        store_id = benefit_data.get('store_id', '')
+        eco_by_store[store_id] = eco_by_store.get(store_id, 0) + (benefit_data.get('eco_value', 0) or 0)
     
-    result = {
-        'is_valid': is_valid,
+    candidates = []
+    for store, store_data in zip(catalog.stores, catalog.stores_raw):
+        if areas is not None and store_data.get('area', '') not in areas:
+            continue
+        if exclude_franchise and store_data.get('is_franchise', False):
+            continue
+        if max_reviews is not None and int(store_data.get('reviews') or 0) > max_reviews:
+            continue
+        if min_synergy is not None and get_synergy_score(store_data) < min_synergy:
+            continue
+        if min_eco_value is not None and eco_by_store.get(store_data.get('id', ''), 0) < min_eco_value:
+            continue
+        candidates.append(store)
+    return candidates
+
+# 패스 품질 기준
+MIN_VALUE_RATIO = 150
+MIN_SYNERGY_SCORE = 70
+
+def _quality_result(total_value: int, avg_synergy: float, pass_price: int) -> Dict[str, Any]:
+    """품질 검증 결과 딕셔너리 구성"""
+    value_ratio = (total_value / pass_price) * 100 if pass_price > 0 else 0
+    return {
+        'is_valid': value_ratio >= MIN_VALUE_RATIO and avg_synergy >= MIN_SYNERGY_SCORE,
         'total_value': total_value,
         'value_ratio': value_ratio,
         'avg_synergy': avg_synergy,
         'pass_price': pass_price,
         'requirements': {
-            'min_value_ratio': 150,
-            'min_synergy_score': 70
+            'min_value_ratio': MIN_VALUE_RATIO,
+            'min_synergy_score': MIN_SYNERGY_SCORE
         }
     }
+
+def validate_pass_quality(pass_obj: Pass, pass_price: int) -> Dict[str, Any]:
+    """패스 품질 검증 (가치 대비 효과 150% 이상, 상생점수 70점 이상)"""
+    catalog = get_catalog()
+    total_value = sum(catalog.eco_value_for(b.store_name, b.description) for b in pass_obj.benefits)
+    result = _quality_result(total_value, _average_synergy(catalog, pass_obj.stores), pass_price)
     
-    print(f"[품질 검증] 가치 대비 효과: {value_ratio:.1f}% (최소 150%)")
-    print(f"[품질 검증] 평균 상생점수: {avg_synergy:.1f}점 (최소 70점)")
-    print(f"[품질 검증] 품질 기준 충족: {'✅' if is_valid else '❌'}")
+    print(f"[품질 검증] 가치 대비 효과: {result['value_ratio']:.1f}% (최소 {MIN_VALUE_RATIO}%), "
+          f"평균 상생점수: {result['avg_synergy']:.1f}점 (최소 {MIN_SYNERGY_SCORE}점), "
+          f"품질 기준 충족: {'✅' if result['is_valid'] else '❌'}")
     
     return result
+
+def validate_pass_quality_batch(candidates: List[Tuple[Pass, int]]) -> List[Dict[str, Any]]:
+    """여러 후보 패스를 한 번에 품질 검증 [(패스, 가격), ...] -> 결과 목록 (입력 순서 유지)"""
+    catalog = get_catalog()
+    results = []
+    for pass_obj, pass_price in candidates:
+        total_value = sum(catalog.eco_value_for(b.store_name, b.description) for b in pass_obj.benefits)
+        results.append(_quality_result(total_value, _average_synergy(catalog, pass_obj.stores), pass_price))
+    
+    print(f"[품질 검증] 일괄 검증: {sum(1 for r in results if r['is_valid'])}/{len(results)}개 기준 충족")
+    return results
@@ -0,0 +1,129 @@
+"""
+상점 좌표 공간 인덱스
+위경도 격자(grid) 버킷으로 반경 검색과 최근접 k개 검색을 처리합니다.
+"""
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+EARTH_RADIUS_M = 6371000.0
+METERS_PER_DEG_LAT = 111320.0
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """두 좌표 간 하버사인 거리 (미터)"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GridSpatialIndex:
+    """
+    고정 크기 격자 기반 공간 인덱스
+    각 항목은 (키, 위도, 경도)이며 키는 호출부가 정합니다 (예: 카탈로그 내 상점 위치).
+    """
+
+    def __init__(self, points: Iterable[Tuple[int, float, float]], cell_size_m: float = 500.0):
+        self._points: List[Tuple[int, float, float]] = [
+            (key, float(lat), float(lng)) for key, lat, lng in points
+            if lat is not None and lng is not None
+        ]
+        ref_lat = (sum(p[1] for p in self._points) / len(self._points)) if self._points else 37.47
+        self.cell_size_m = cell_size_m
+        self._cell_lat = cell_size_m / METERS_PER_DEG_LAT
+        self._cell_lng = cell_size_m / (METERS_PER_DEG_LAT * max(0.01, math.cos(math.radians(ref_lat))))
+
+        self._cells: Dict[Tuple[int, int], List[Tuple[int, float, float]]] = {}
+        for point in self._points:
+            self._cells.setdefault(self._cell_of(point[1], point[2]), []).append(point)
+
+        if self._cells:
+            rows = [c[0] for c in self._cells]
+            cols = [c[1] for c in self._cells]
+            self._bounds = (min(rows), max(rows), min(cols), max(cols))
+        else:
+            self._bounds = (0, 0, 0, 0)
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _cell_of(self, lat: float, lng: float) -> Tuple[int, int]:
+        return (int(math.floor(lat / self._cell_lat)), int(math.floor(lng / self._cell_lng)))
+
+    def _ring(self, center: Tuple[int, int], r: int) -> Iterable[Tuple[int, int]]:
+        """중심 셀로부터 체비셰프 거리 r 인 셀들"""
+        row, col = center
+        if r == 0:
+            yield center
+            return
+        for c in range(col - r, col + r + 1):
+            yield (row - r, c)
+            yield (row + r, c)
+        for rr in range(row - r + 1, row + r):
+            yield (rr, col - r)
+            yield (rr, col + r)
+
+    def _max_ring(self, center: Tuple[int, int]) -> int:
+        """중심 셀에서 모든 셀을 덮는 데 필요한 링 반경"""
+        min_row, max_row, min_col, max_col = self._bounds
+        return max(abs(center[0] - min_row), abs(center[0] - max_row),
+                   abs(center[1] - min_col), abs(center[1] - max_col))
+
+    def within_radius(self, lat: float, lng: float, radius_m: float) -> List[Tuple[float, int]]:
+        """반경 내 항목을 (거리, 키) 목록으로 가까운 순 반환"""
+        if not self._points or radius_m < 0:
+            return []
+        d_lat = radius_m / METERS_PER_DEG_LAT
+        d_lng = radius_m / (METERS_PER_DEG_LAT * max(0.01, math.cos(math.radians(lat))))
+        row_lo, col_lo = self._cell_of(lat - d_lat, lng - d_lng)
+        row_hi, col_hi = self._cell_of(lat + d_lat, lng + d_lng)
+        min_row, max_row, min_col, max_col = self._bounds
+        row_lo, row_hi = max(row_lo, min_row), min(row_hi, max_row)
+        col_lo, col_hi = max(col_lo, min_col), min(col_hi, max_col)
+
+        results = []
+        for row in range(row_lo, row_hi + 1):
+            for col in range(col_lo, col_hi + 1):
+                for key, p_lat, p_lng in self._cells.get((row, col), ()):
+                    distance = haversine_m(lat, lng, p_lat, p_lng)
+                    if distance <= radius_m:
+                        results.append((distance, key))
+        results.sort()
+        return results
+
+    def nearest(self, lat: float, lng: float, k: int,
+                max_radius_m: Optional[float] = None) -> List[Tuple[float, int]]:
+        """가까운 순서로 최대 k개 항목을 (거리, 키) 목록으로 반환"""
+        if not self._points or k <= 0:
+            return []
+        center = self._cell_of(lat, lng)
+        max_ring = self._max_ring(center)
+        # 질의 위도에서 셀의 짧은 변 길이 (링 바깥까지의 최소 거리 계산용)
+        cell_m = min(self.cell_size_m,
+                     self._cell_lng * METERS_PER_DEG_LAT * math.cos(math.radians(lat)))
+        candidates: List[Tuple[float, int]] = []
+        if (2 * max_ring + 1) ** 2 > 4 * len(self._cells):
+            # 격자 범위 밖의 먼 지점이면 빈 링을 도는 것보다 전체 계산이 싸다
+            candidates = [(haversine_m(lat, lng, p_lat, p_lng), key) for key, p_lat, p_lng in self._points]
+            max_ring = -1
+        r = 0
+        while r <= max_ring:
+            for cell in self._ring(center, r):
+                for key, p_lat, p_lng in self._cells.get(cell, ()):
+                    candidates.append((haversine_m(lat, lng, p_lat, p_lng), key))
+            # 링 r 바깥 항목은 최소 r * 셀 크기 이상 떨어져 있으므로 그 안의 k개는 확정
+            guaranteed_m = r * cell_m
+            if max_radius_m is not None and guaranteed_m >= max_radius_m:
+                break
+            if len(candidates) >= k:
+                candidates.sort()
+                if candidates[k - 1][0] <= guaranteed_m:
+                    break
+            r += 1
+
+        candidates.sort()
+        if max_radius_m is not None:
+            candidates = [c for c in candidates if c[0] <= max_radius_m]
+        return candidates[:k]
@@ -0,0 +1,25 @@
+"""
+로컬 저장소 위치 (패스 파일, 패스 인덱스, 콜드 아카이브, 혜택 사용 원장 공통)
+STORAGE_DIR 환경 변수가 있으면 그 경로를, 없으면 storage/ 를 사용합니다.
+App Engine standard 에서는 앱 디렉토리가 읽기 전용이라 /tmp 만 쓸 수 있으므로 /tmp 아래를 기본값으로 둡니다.
+이 경우 저장소는 인스턴스별 임시 저장소이며 인스턴스가 바뀌면 사라집니다.
+"""
+import os
+import tempfile
+
+
+def _on_app_engine() -> bool:
+    return (
+        os.environ.get('GAE_ENV', '').startswith('standard') or
+        os.environ.get('SERVER_SOFTWARE', '').startswith('Google App Engine/')
+    )
+
+
+def storage_dir() -> str:
+    """로컬 저장소 루트 (STORAGE_DIR -> App Engine 은 쓰기 가능한 /tmp -> storage/)"""
+    configured = os.getenv('STORAGE_DIR')
+    if configured:
+        return configured
+    if _on_app_engine():
+        return os.path.join(tempfile.gettempdir(), 'jemulpogo_storage')
+    return os.path.join(os.path.dirname(__file__), '..', 'storage')
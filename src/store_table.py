@@ -0,0 +1,137 @@
+"""
+컬럼형(NumPy) 상점 테이블
+상생 점수, 경제적 가치, 후보 필터링을 카탈로그 전체에 대해 벡터 연산으로 처리합니다.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 상생 점수 가점 대상 지역
+LOCAL_AREAS = ("골목상권", "제물포시장")
+
+
+def synergy_score(store_data: Dict) -> int:
+    """상점 한 곳의 상생 점수 계산 (0-100점) - StoreTable.compute_synergy_scores 와 동일한 규칙"""
+    base_score = 50
+    
+    # 프랜차이즈 여부 (-30점)
+    if store_data.get('is_franchise', False):
+        base_score -= 30
+    
+    # 리뷰 수 (적을수록 가점)
+    reviews = store_data.get('reviews', 0)
+    if reviews < 50:
+        base_score += 30
+    elif reviews < 100:
+        base_score += 20
+    elif reviews < 200:
+        base_score += 10
+    
+    # 지역 특성 (골목상권, 제물포시장 가점)
+    area = store_data.get('area', '')
+    if area in LOCAL_AREAS:
+        base_score += 25
+    
+    # 0-100 범위로 제한
+    return max(0, min(100, base_score))
+
+
+class StoreTable:
+    """
+    상점 원본 데이터를 컬럼 배열로 보관하는 테이블
+    행 번호는 카탈로그의 stores_raw 순서와 같습니다.
+    """
+
+    def __init__(self, stores_raw: Sequence[Dict], benefits_raw: Sequence[Dict] = ()):
+        if np is None:
+            raise ImportError("numpy 패키지가 설치되지 않았습니다.")
+
+        n = len(stores_raw)
+        self.ids: List[str] = [s.get('id', '') for s in stores_raw]
+        self.names: List[str] = [s.get('name', '') for s in stores_raw]
+        self.row_by_id: Dict[str, int] = {sid: i for i, sid in enumerate(self.ids) if sid}
+
+        self.reviews = np.fromiter((int(s.get('reviews') or 0) for s in stores_raw), dtype=np.int64, count=n)
+        self.is_franchise = np.fromiter((bool(s.get('is_franchise', False)) for s in stores_raw),
+                                        dtype=bool, count=n)
+
+        # 지역은 정수 코드로 저장
+        self.area_names: List[str] = []
+        area_code_by_name: Dict[str, int] = {}
+        codes = np.empty(n, dtype=np.int32)
+        for i, s in enumerate(stores_raw):
+            area = s.get('area', '')
+            if area not in area_code_by_name:
+                area_code_by_name[area] = len(self.area_names)
+                self.area_names.append(area)
+            codes[i] = area_code_by_name[area]
+        self.area_code = codes
+        self.area_code_by_name = area_code_by_name
+
+        self.lat = np.array([s.get('latitude') if s.get('latitude') is not None else np.nan
+                             for s in stores_raw], dtype=np.float64)
+        self.lng = np.array([s.get('longitude') if s.get('longitude') is not None else np.nan
+                             for s in stores_raw], dtype=np.float64)
+
+        # 상점별 혜택 경제적 가치 합계
+        self.eco_value = np.zeros(n, dtype=np.float64)
+        for b in benefits_raw:
+            row = self.row_by_id.get(b.get('store_id', ''))
+            if row is not None:
+                self.eco_value[row] += b.get('eco_value', 0) or 0
+
+        self.synergy = self.compute_synergy_scores()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _area_mask(self, areas: Iterable[str]):
+        codes = [self.area_code_by_name[a] for a in areas if a in self.area_code_by_name]
+        return np.isin(self.area_code, np.array(codes, dtype=np.int32))
+
+    def compute_synergy_scores(self):
+        """전체 상점의 상생 점수 (0-100점) 벡터 계산"""
+        score = np.full(len(self), 50, dtype=np.int64)
+        score -= 30 * self.is_franchise
+        score += np.select(
+            [self.reviews < 50, self.reviews < 100, self.reviews < 200],
+            [30, 20, 10],
+            default=0,
+        )
+        score += 25 * self._area_mask(LOCAL_AREAS)
+        return np.clip(score, 0, 100)
+
+    def filter_rows(self, areas: Optional[Iterable[str]] = None, exclude_franchise: bool = False,
+                    max_reviews: Optional[int] = None, min_synergy: Optional[int] = None,
+                    min_eco_value: Optional[float] = None, center: Optional[Sequence[float]] = None,
+                    radius_m: Optional[float] = None):
+        """
+        조건을 모두 만족하는 후보 상점의 행 번호 배열
+        center=(위도, 경도)와 radius_m을 주면 하버사인 거리 조건도 적용합니다.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if areas is not None:
+            mask &= self._area_mask(areas)
+        if exclude_franchise:
+            mask &= ~self.is_franchise
+        if max_reviews is not None:
+            mask &= self.reviews <= max_reviews
+        if min_synergy is not None:
+            mask &= self.synergy >= min_synergy
+        if min_eco_value is not None:
+            mask &= self.eco_value >= min_eco_value
+        if center is not None and radius_m is not None:
+            mask &= self.distances_m(center[0], center[1]) <= radius_m
+        return np.nonzero(mask)[0]
+
+    def distances_m(self, lat: float, lng: float):
+        """기준 좌표에서 모든 상점까지의 하버사인 거리 (좌표 없는 상점은 inf)"""
+        phi1 = np.radians(lat)
+        phi2 = np.radians(self.lat)
+        dphi = phi2 - phi1
+        dlmb = np.radians(self.lng - lng)
+        a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlmb / 2) ** 2
+        distances = 2 * 6371000.0 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+        return np.where(np.isnan(distances), np.inf, distances)
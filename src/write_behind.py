@@ -0,0 +1,280 @@
+"""
+패스 저장 write-behind 큐
+save_pass 는 패스를 세션과 프로세스 내 대기 버퍼(빠른 1차 저장소)에 넣고 바로 반환합니다.
+파일/Datastore 영구 저장은 백그라운드 워커 스레드가 묶음 단위로 처리하며,
+실패한 저장소만 지수 백오프로 재시도하고 프로세스 종료 시 남은 항목을 모두 내려 씁니다.
+영구 저장이 끝나기 전까지 load_pass_from_file 은 대기 버퍼의 패스를 반환합니다.
+
+기본값은 꺼짐(PASS_WRITE_BEHIND=0, 동기 저장)입니다. 켜면 save_pass 가 영구 저장 전에 성공을 반환하므로
+백그라운드 스레드와 종료 시 내려 쓰기가 보장되지 않는 환경(App Engine standard 등)에서는 켜지 마세요.
+재시도 한도를 넘긴 패스는 최근 WRITE_BEHIND_MAX_FAILED 개까지만 보관하고(조회/통계용) 오래된 것부터 버립니다.
+"""
+from collections import OrderedDict
+import atexit
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from models import Pass
+
+PASS_WRITE_BEHIND = os.getenv('PASS_WRITE_BEHIND', '0') == '1'
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv('WRITE_BEHIND_BATCH_SIZE', '20'))
+WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv('WRITE_BEHIND_FLUSH_INTERVAL', '0.2'))
+WRITE_BEHIND_MAX_ATTEMPTS = int(os.getenv('WRITE_BEHIND_MAX_ATTEMPTS', '5'))
+WRITE_BEHIND_RETRY_DELAY = float(os.getenv('WRITE_BEHIND_RETRY_DELAY', '1.0'))
+WRITE_BEHIND_DRAIN_TIMEOUT = float(os.getenv('WRITE_BEHIND_DRAIN_TIMEOUT', '10'))
+# 영구 저장에 실패한 패스를 보관할 최대 개수 (넘으면 오래된 것부터 버림)
+WRITE_BEHIND_MAX_FAILED = int(os.getenv('WRITE_BEHIND_MAX_FAILED', '100'))
+
+STATUS_PENDING = 'pending'
+STATUS_PERSISTED = 'persisted'
+STATUS_FAILED = 'failed'
+# 영구 저장이 끝난 패스 상태를 기억할 최대 개수
+STATUS_HISTORY = 1024
+
+PassWrite = Tuple[Pass, Optional[str]]
+# 저장소: 패스 묶음을 받아 저장에 실패한 pass_id 집합을 반환
+PassSink = Callable[[List[PassWrite]], Set[str]]
+
+
+def file_sink(batch: List[PassWrite]) -> Set[str]:
+    """storage/saved_passes 파일 저장 (패스 목록 인덱스도 함께 갱신)"""
+    from pass_generator import get_pass_generator
+    generator = get_pass_generator()
+    return {pass_obj.pass_id for pass_obj, user_email in batch
+            if not generator.save_pass_to_file(pass_obj, user_email)}
+
+
+def datastore_sink(batch: List[PassWrite]) -> Set[str]:
+    """Datastore put_multi 저장 (묶음 전체가 성공하거나 실패)"""
+    from datastore_service import save_passes_to_datastore
+    items = [(pass_obj, user_email or 'demo@jemulpogo.com') for pass_obj, user_email in batch]
+    if save_passes_to_datastore(items):
+        return set()
+    return {pass_obj.pass_id for pass_obj, _ in batch}
+
+
+def default_sinks() -> Dict[str, PassSink]:
+    """환경별 영구 저장소 (프로덕션에서는 Datastore 추가)"""
+    from datastore_service import is_production_environment
+    sinks: Dict[str, PassSink] = {'file': file_sink}
+    if is_production_environment():
+        sinks['datastore'] = datastore_sink
+    return sinks
+
+
+class _PendingWrite:
+    __slots__ = ('pass_obj', 'user_email', 'remaining', 'attempts', 'next_attempt_at', 'status')
+
+    def __init__(self, pass_obj: Pass, user_email: Optional[str], sinks: List[str]):
+        self.pass_obj = pass_obj
+        self.user_email = user_email
+        self.remaining = set(sinks)
+        self.attempts = 0
+        self.next_attempt_at = 0.0
+        self.status = STATUS_PENDING
+
+
+class WriteBehindQueue:
+    """
+    패스 영구 저장 대기열 (프로세스별 워커 스레드 1개)
+    워커는 첫 enqueue 때 시작하며 fork 된 자식 프로세스에서는 새로 시작합니다.
+    """
+
+    def __init__(self, sinks: Dict[str, PassSink], batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+                 flush_interval: float = WRITE_BEHIND_FLUSH_INTERVAL,
+                 max_attempts: int = WRITE_BEHIND_MAX_ATTEMPTS,
+                 retry_delay: float = WRITE_BEHIND_RETRY_DELAY,
+                 max_failed: int = WRITE_BEHIND_MAX_FAILED):
+        self.sinks = sinks
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_failed = max_failed
+        # 영구 저장을 기다리는 패스
+        self._pending: Dict[str, _PendingWrite] = {}
+        # 재시도 한도를 넘긴 패스 (최근 max_failed 개, 오래된 것부터 버림)
+        self._failed: 'OrderedDict[str, _PendingWrite]' = OrderedDict()
+        # 영구 저장이 끝난 패스 상태 (삽입 순서로 오래된 것부터 정리)
+        self._persisted: Dict[str, float] = {}
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid: Optional[int] = None
+        self._stopping = False
+        self.enqueued = 0
+        self.persisted = 0
+        self.retries = 0
+        self.failures = 0
+        self.batches = 0
+        self.dropped_failures = 0
+
+    def enqueue(self, pass_obj: Pass, user_email: Optional[str]) -> None:
+        """패스를 대기 버퍼에 넣고 바로 반환 (같은 패스를 다시 넣으면 처음부터 다시 저장)"""
+        with self._cond:
+            self._pending[pass_obj.pass_id] = _PendingWrite(pass_obj, user_email, list(self.sinks))
+            self._persisted.pop(pass_obj.pass_id, None)
+            self._failed.pop(pass_obj.pass_id, None)
+            self.enqueued += 1
+            self._ensure_worker()
+            self._cond.notify()
+
+    def get_pending(self, pass_id: str) -> Optional[Pass]:
+        """아직 영구 저장되지 않은 패스 (대기 중이거나 재시도 한도를 넘긴 패스)"""
+        with self._cond:
+            entry = self._pending.get(pass_id) or self._failed.get(pass_id)
+            return entry.pass_obj if entry else None
+
+    def status(self, pass_id: str) -> Optional[str]:
+        """pending / persisted / failed, 이 프로세스가 모르는 패스면 None"""
+        with self._cond:
+            entry = self._pending.get(pass_id) or self._failed.get(pass_id)
+            if entry:
+                return entry.status
+            return STATUS_PERSISTED if pass_id in self._persisted else None
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive() and self._worker_pid == os.getpid():
+            return
+        self._stopping = False
+        self._worker_pid = os.getpid()
+        self._worker = threading.Thread(target=self._run, name='pass-write-behind', daemon=True)
+        self._worker.start()
+
+    def _take_batch(self) -> List[_PendingWrite]:
+        now = time.monotonic()
+        batch = []
+        for entry in self._pending.values():
+            if entry.next_attempt_at <= now:
+                batch.append(entry)
+                if len(batch) >= self.batch_size:
+                    break
+        return batch
+
+    def _next_wait(self) -> float:
+        """다음 재시도까지 남은 시간 (대기 항목이 없으면 flush_interval)"""
+        retry_at = [entry.next_attempt_at for entry in self._pending.values()]
+        if not retry_at:
+            return self.flush_interval
+        return max(0.0, min(min(retry_at) - time.monotonic(), self.flush_interval))
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                batch = self._take_batch()
+                while not batch:
+                    if self._stopping:
+                        return
+                    self._cond.wait(self._next_wait())
+                    batch = self._take_batch()
+            self.flush_batch(batch)
+
+    def flush_batch(self, batch: List[_PendingWrite]) -> None:
+        """묶음을 각 저장소에 기록하고 결과에 따라 완료/재시도/실패 처리"""
+        for sink_name, sink in self.sinks.items():
+            writes = [entry for entry in batch if sink_name in entry.remaining]
+            if not writes:
+                continue
+            try:
+                failed_ids = sink([(entry.pass_obj, entry.user_email) for entry in writes])
+            except Exception as sink_error:
+                print(f"[write-behind] {sink_name} 저장 오류: {sink_error}")
+                failed_ids = {entry.pass_obj.pass_id for entry in writes}
+            for entry in writes:
+                if entry.pass_obj.pass_id not in failed_ids:
+                    entry.remaining.discard(sink_name)
+
+        with self._cond:
+            self.batches += 1
+            for entry in batch:
+                pass_id = entry.pass_obj.pass_id
+                # 처리 중에 같은 패스가 다시 저장된 경우 새 항목을 그대로 둔다
+                if self._pending.get(pass_id) is not entry:
+                    continue
+                if not entry.remaining:
+                    del self._pending[pass_id]
+                    self._persisted[pass_id] = time.time()
+                    while len(self._persisted) > STATUS_HISTORY:
+                        del self._persisted[next(iter(self._persisted))]
+                    self.persisted += 1
+                    continue
+                entry.attempts += 1
+                if entry.attempts >= self.max_attempts:
+                    # 실패 목록으로 옮겨 이 프로세스에서는 조회 가능하게 두되 개수는 제한
+                    del self._pending[pass_id]
+                    entry.status = STATUS_FAILED
+                    self._failed[pass_id] = entry
+                    self.failures += 1
+                    print(f"[write-behind] 패스 영구 저장 포기: {pass_id} (남은 저장소: {sorted(entry.remaining)})")
+                    while len(self._failed) > self.max_failed:
+                        dropped_id, _ = self._failed.popitem(last=False)
+                        self.dropped_failures += 1
+                        print(f"[write-behind] 저장 실패 패스 보관 한도 초과 - 버림: {dropped_id}")
+                else:
+                    entry.next_attempt_at = time.monotonic() + self.retry_delay * (2 ** (entry.attempts - 1))
+                    self.retries += 1
+            self._cond.notify_all()
+
+    def drain(self, timeout: float = WRITE_BEHIND_DRAIN_TIMEOUT) -> bool:
+        """대기 항목이 모두 영구 저장(또는 실패 처리)될 때까지 대기, 재시도 백오프는 무시 -> 모두 처리됐는지"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                pending = list(self._pending.values())
+                if not pending:
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    print(f"[write-behind] 종료 전 저장 미완료: {len(pending)}개")
+                    return False
+                for entry in pending:
+                    entry.next_attempt_at = 0.0
+                if self._worker is None or not self._worker.is_alive() or self._worker_pid != os.getpid():
+                    self._ensure_worker()
+                self._cond.notify_all()
+                self._cond.wait(min(remaining, self.flush_interval))
+
+    def stop(self, timeout: float = WRITE_BEHIND_DRAIN_TIMEOUT) -> bool:
+        """남은 항목을 내려 쓰고 워커 종료 (atexit)"""
+        drained = self.drain(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            worker = self._worker
+        if worker is not None and worker.is_alive() and self._worker_pid == os.getpid():
+            worker.join(timeout=1.0)
+        return drained
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'pending': len(self._pending),
+                'failed': len(self._failed),
+                # 최근 저장 실패 패스와 저장하지 못한 저장소
+                'failed_passes': [{'pass_id': pass_id, 'sinks': sorted(entry.remaining)}
+                                  for pass_id, entry in list(self._failed.items())[-10:]],
+                'dropped_failures': self.dropped_failures,
+                'sinks': list(self.sinks),
+                'enqueued': self.enqueued,
+                'persisted': self.persisted,
+                'retries': self.retries,
+                'failures': self.failures,
+                'batches': self.batches,
+                'worker_alive': bool(self._worker and self._worker.is_alive() and self._worker_pid == os.getpid()),
+            }
+
+
+# 프로세스 전역 대기열 인스턴스
+_queue_instance = None
+_queue_lock = threading.Lock()
+
+
+def get_write_behind() -> WriteBehindQueue:
+    global _queue_instance
+    if _queue_instance is None:
+        with _queue_lock:
+            if _queue_instance is None:
+                _queue_instance = WriteBehindQueue(default_sinks())
+                atexit.register(_queue_instance.stop)
+    return _queue_instance